@@ -2,6 +2,7 @@
 """
 Script to count activities across all grades (2-7).
 Counts the number of activity IDs in each grade file.
+For schema, duplicate ID and printout checks, see scripts/validate_grades.py.
 """
 
 import json
@@ -48,6 +48,7 @@ export interface GradeActivity {
   tools: string;
   groupsize: string;
   learning_goal: string;
+  learning_goal_id?: string; // e.g. "KV20-03", see CurriculumGoalTable
   content: {
     introduction: string[] | string;
     main: string[] | string;
@@ -55,6 +56,27 @@ export interface GradeActivity {
     reflection: string[] | string;
     tips: string[] | string;
     extra?: string[] | string;
+    extra_meta?: Record<string, PrintoutImageMeta>;
+  };
+}
+
+// Written by scripts/update_printouts.py for image printouts, keyed by the path in extra
+export interface PrintoutImageVariant {
+  path: string;
+  width: number;
+  height: number;
+  bytes: number;
+}
+
+export interface PrintoutImageMeta {
+  width: number;
+  height: number;
+  bytes: number;
+  variants: {
+    preview: PrintoutImageVariant;
+    preview_webp: PrintoutImageVariant;
+    thumbnail: PrintoutImageVariant;
+    thumbnail_webp: PrintoutImageVariant;
   };
 }
 
@@ -64,6 +86,70 @@ export interface GradeData {
   activities: GradeActivity[];
 }
 
+// Sharded output (--sharded): activityData/shards/<n>.summary.json, with one
+// content-hashed detail file (a GradeActivity) per activity
+export interface ActivitySummary {
+  id: string;
+  title: string;
+  time: string;
+  location: string;
+  groupsize: string;
+  learning_goal: string;
+  learning_goal_id: string; // "" when the goal text matched no curriculum goal
+  hash: string;
+  detail: string; // e.g. "activityData/shards/2/A0101.b7376079b9fc.json"
+}
+
+export interface GradeSummary {
+  grade: string;
+  total_activities: number;
+  hash: string;
+  activities: ActivitySummary[];
+}
+
+// Written by scripts/curriculum_index.py to activityData/curriculumGoals.json
+export interface CurriculumGoal {
+  id: string; // competence goal set code and goal number, e.g. "KV20-03"
+  number: number;
+  text: string;
+}
+
+export interface CurriculumGoalTable {
+  version: number;
+  curriculum: string;
+  grades: {
+    [grade: string]: {
+      code: string;
+      title: string;
+      uri: string;
+      goals: CurriculumGoal[];
+    };
+  };
+}
+
+// Written by scripts/activity_pictures.py to activityData/activityPictures.json
+export interface PictureVariant {
+  path: string; // e.g. "activityPictures/variants/bingo.320.webp"
+  type: string; // "image/webp", "image/jpeg" or "image/png"
+  width: number;
+  height: number;
+  bytes: number;
+}
+
+export interface PictureMetadata {
+  width: number;
+  height: number;
+  bytes: number;
+  placeholder: string; // tiny WebP as a data URI
+  variants: PictureVariant[];
+}
+
+export interface PictureMetadataTable {
+  version: number;
+  widths: number[];
+  pictures: { [path: string]: PictureMetadata };
+}
+
 export type CombinedActivity = Activity &
   ActivityTask & {
     learningGoals: string[]; // Use learningGoals to match ActivityTask
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Indexed merge engine for grade activity files.
+
+Compares activities parsed from CSV files against the activities already stored
+in a grade JSON file and returns a structured changeset. Both sides are indexed
+by activity ID once, so merging is linear in the number of activities.
+
+Usage:
+    from activity_merge import build_changeset
+
+    changeset = build_changeset(existing_activities, csv_activities)
+    print(changeset.summary())
+    grade_data["activities"] = changeset.final_activities
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+TOP_LEVEL_FIELDS = ['title', 'time', 'location', 'tools', 'groupsize', 'learning_goal', 'learning_goal_id', 'image']
+CONTENT_FIELDS = ['introduction', 'main', 'examples', 'reflection', 'tips', 'extra']
+
+@dataclass
+class ChangeSet:
+    """Result of merging incoming activities into the existing activities of one grade."""
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    # (old, new) pairs for activities whose data changed
+    updated: List[Tuple[Dict[str, Any], Dict[str, Any]]] = field(default_factory=list)
+    deleted: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged: List[Dict[str, Any]] = field(default_factory=list)
+    # Incoming activities dropped because an earlier row used the same ID
+    duplicates: List[Dict[str, Any]] = field(default_factory=list)
+    # Existing activities whose ID already appeared earlier in the grade file (kept in place)
+    existing_duplicates: List[Dict[str, Any]] = field(default_factory=list)
+    final_activities: List[Dict[str, Any]] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "updated": len(self.updated),
+            "deleted": len(self.deleted),
+            "unchanged": len(self.unchanged),
+            "duplicates": len(self.duplicates),
+            "existing_duplicates": len(self.existing_duplicates),
+            "total": len(self.final_activities),
+        }
+
+def index_by_id(activities: Iterable[Dict[str, Any]],
+                duplicates: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """Index activities by ID. The first activity wins; later ones go to `duplicates`."""
+    index: Dict[str, Dict[str, Any]] = {}
+    for activity in activities:
+        activity_id = activity["id"]
+        if activity_id in index:
+            if duplicates is not None:
+                duplicates.append(activity)
+            continue
+        index[activity_id] = activity
+    return index
+
+def diff_activity(old_activity: Dict[str, Any], new_activity: Dict[str, Any]) -> List[Tuple[str, Any, Any]]:
+    """Return (field, old, new) for every top-level or content field that differs."""
+    changes = []
+    for name in TOP_LEVEL_FIELDS:
+        old_value = old_activity.get(name, '')
+        new_value = new_activity.get(name, '')
+        if old_value != new_value:
+            changes.append((name, old_value, new_value))
+
+    old_content = old_activity.get('content', {})
+    new_content = new_activity.get('content', {})
+    for name in CONTENT_FIELDS:
+        old_value = old_content.get(name, [])
+        new_value = new_content.get(name, [])
+        if old_value != new_value:
+            changes.append((f"content.{name}", old_value, new_value))
+    return changes
+
+def build_changeset(existing_activities: List[Dict[str, Any]],
+                    incoming_activities: List[Dict[str, Any]],
+                    present_ids: Optional[Set[str]] = None,
+                    allow_deletion: bool = True) -> ChangeSet:
+    """
+    Merge incoming activities into existing ones.
+
+    `present_ids` are IDs that exist in the source but were not re-parsed
+    (e.g. unchanged rows in an incremental sync); they are kept as-is and never
+    deleted. The final order keeps existing activities in place and appends new
+    ones in incoming order.
+
+    Existing activities that repeat an ID are not dropped: every occurrence is
+    kept, updated or deleted like the first one and listed in
+    `existing_duplicates`. Only the first occurrence is counted in
+    `updated` and `unchanged`.
+    """
+    changeset = ChangeSet()
+    incoming_by_id = index_by_id(incoming_activities, changeset.duplicates)
+    keep_ids = present_ids or set()
+    existing_ids: Set[str] = set()
+
+    for existing in existing_activities:
+        activity_id = existing["id"]
+        first = activity_id not in existing_ids
+        if first:
+            existing_ids.add(activity_id)
+        else:
+            changeset.existing_duplicates.append(existing)
+        incoming = incoming_by_id.get(activity_id)
+        if incoming is None:
+            if allow_deletion and activity_id not in keep_ids:
+                changeset.deleted.append(existing)
+                continue
+            if first:
+                changeset.unchanged.append(existing)
+            changeset.final_activities.append(existing)
+        elif incoming == existing:
+            if first:
+                changeset.unchanged.append(existing)
+            changeset.final_activities.append(existing)
+        else:
+            if first:
+                changeset.updated.append((existing, incoming))
+            changeset.final_activities.append(incoming)
+
+    for activity_id, incoming in incoming_by_id.items():
+        if activity_id not in existing_ids:
+            changeset.added.append(incoming)
+            changeset.final_activities.append(incoming)
+
+    return changeset
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Responsive variants and inline placeholders for the activity cover pictures.
+
+The pictures in public/activityPictures are full-size PNGs (around 1024x1536),
+while a card in the grid is at most 320 px wide. For every picture this writes,
+into public/activityPictures/variants:
+- {name}.{width}.webp and a fallback {name}.{width}.jpg for each width in
+  PICTURE_WIDTHS (a PNG instead of a JPEG when the picture has transparent
+  pixels; pictures narrower than a width are not scaled up)
+
+and a tiny preview (PLACEHOLDER_WIDTH px wide, WebP) that is stored inline as
+a data URI. The metadata is written to public/activityData/activityPictures.json,
+keyed by the picture path:
+
+    "activityPictures/bingo.png": {
+      "width": 1024, "height": 1536, "bytes": 2345678,
+      "placeholder": "data:image/webp;base64,UklGR...",
+      "variants": [
+        {"path": "activityPictures/variants/bingo.320.webp", "type": "image/webp",
+         "width": 320, "height": 480, "bytes": 14321},
+        {"path": "activityPictures/variants/bingo.320.jpg", "type": "image/jpeg", ...},
+        ...
+      ]
+    }
+
+ImagePreloader shows the placeholder right away and lets the browser pick
+the variant for the rendered size (srcset/sizes). Pictures are only rendered
+again when their content hash changes (cache in variants/.variants_cache.json),
+changed pictures are rendered in worker processes (--jobs), and variants of removed
+pictures are deleted. Requires Pillow (pip install Pillow).
+
+Run command in terminal: python3 scripts/activity_pictures.py
+                          python3 scripts/activity_pictures.py --jobs 0 --metrics-json metrics.json
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+import instrumentation
+from json_writer import write_json_atomic
+from parallel_ingest import ordered_map, resolve_jobs
+from printout_images import (
+    Image, RASTER_EXTENSIONS, has_transparency, save_image_atomic, save_options,
+    hash_file, image_support_available,
+)
+
+PICTURES_DIR = "public/activityPictures"
+METADATA_FILE = "public/activityData/activityPictures.json"
+VARIANTS_DIRNAME = "variants"
+CACHE_FILENAME = ".variants_cache.json"
+CACHE_VERSION = 1
+
+# Widths of the variants in pixels: a 320 px card at 1x, 2x and 3x pixel density
+PICTURE_WIDTHS = [320, 640, 960]
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+MIME_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg", "PNG": "image/png"}
+
+def variant_widths(width: int) -> List[int]:
+    """The variant widths for a picture of this width, without scaling up."""
+    return sorted({min(target, width) for target in PICTURE_WIDTHS})
+
+def placeholder_data_uri(image) -> str:
+    """Encode a tiny, low-quality WebP of the image as a data URI."""
+    tiny = image.resize((PLACEHOLDER_WIDTH, max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))),
+                        Image.BILINEAR)
+    buffer = io.BytesIO()
+    tiny.save(buffer, "WEBP", quality=PLACEHOLDER_QUALITY, method=6)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def render_picture(task: Tuple[str, str, str]) -> Dict[str, Any]:
+    """
+    Render the variants and placeholder of one picture. Takes (source_path,
+    variants_dir, relative_dir) and returns its metadata. Runs in worker processes.
+    """
+    source_path, variants_dir, relative_dir = task
+    name = os.path.splitext(os.path.basename(source_path))[0]
+
+    with Image.open(source_path) as original:
+        original.load()
+        metadata = {
+            "width": original.width,
+            "height": original.height,
+            "bytes": os.path.getsize(source_path),
+            "placeholder": "",
+            "variants": [],
+        }
+        if has_transparency(original):
+            image_format, extension = "PNG", ".png"
+            original = original.convert("RGBA")
+        else:
+            image_format, extension = "JPEG", ".jpg"
+            original = original.convert("RGB")
+
+        metadata["placeholder"] = placeholder_data_uri(original)
+        for width in variant_widths(original.width):
+            height = max(1, round(original.height * width / original.width))
+            resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+            # WebP first: the frontend lists sources in this order
+            for fmt, ext in (("WEBP", ".webp"), (image_format, extension)):
+                filename = f"{name}.{width}{ext}"
+                path = os.path.join(variants_dir, filename)
+                save_image_atomic(resized, path, fmt, **save_options(fmt))
+                metadata["variants"].append({
+                    "path": f"{relative_dir}/{VARIANTS_DIRNAME}/{filename}",
+                    "type": MIME_TYPES[fmt],
+                    "width": width,
+                    "height": height,
+                    "bytes": os.path.getsize(path),
+                })
+    return metadata
+
+def _variants_exist(metadata: Dict[str, Any], public_dir: str) -> bool:
+    return all(os.path.exists(os.path.join(public_dir, variant["path"])) for variant in metadata["variants"])
+
+def load_cache(cache_path: str) -> Dict[str, Any]:
+    """Load the hash cache, or return an empty one if it is missing or was built with other settings."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if (cache.get("version") != CACHE_VERSION or cache.get("widths") != PICTURE_WIDTHS
+            or cache.get("placeholder_width") != PLACEHOLDER_WIDTH):
+        return {}
+    return cache.get("pictures", {})
+
+def build_activity_pictures(pictures_dir: str = PICTURES_DIR, metadata_file: str = METADATA_FILE,
+                            jobs: int = 1) -> Dict[str, Any]:
+    """
+    Build variants and placeholders for all activity pictures, re-rendering
+    only pictures whose content changed, and write the metadata file.
+    Returns the metadata.
+    """
+    public_dir = os.path.dirname(os.path.abspath(pictures_dir))
+    relative_dir = os.path.basename(os.path.abspath(pictures_dir))
+    variants_dir = os.path.join(pictures_dir, VARIANTS_DIRNAME)
+    os.makedirs(variants_dir, exist_ok=True)
+    cache_path = os.path.join(variants_dir, CACHE_FILENAME)
+    cache = load_cache(cache_path)
+
+    pictures: Dict[str, Dict[str, Any]] = {}
+    to_render: List[Tuple[str, str]] = []
+    with instrumentation.stage("hash"):
+        for filename in sorted(os.listdir(pictures_dir)):
+            source_path = os.path.join(pictures_dir, filename)
+            if not filename.lower().endswith(RASTER_EXTENSIONS) or not os.path.isfile(source_path):
+                continue
+            digest = hash_file(source_path)
+            cached = cache.get(filename)
+            if cached and cached.get("sha256") == digest and _variants_exist(cached["metadata"], public_dir):
+                pictures[filename] = cached
+                instrumentation.count("pictures_cached")
+            else:
+                to_render.append((filename, digest))
+
+    if to_render:
+        print(f"🖼️  Rendering variants for {len(to_render)} picture(s), {len(pictures)} unchanged")
+    tasks = [(os.path.join(pictures_dir, filename), variants_dir, relative_dir) for filename, _ in to_render]
+    with instrumentation.stage("render"):
+        for (filename, digest), metadata in zip(to_render, ordered_map(render_picture, tasks, jobs)):
+            pictures[filename] = {"sha256": digest, "metadata": metadata}
+            instrumentation.count("pictures_rendered")
+            smallest = metadata["variants"][0]
+            print(f"   ✅ {filename}: {metadata['width']}x{metadata['height']} ({metadata['bytes'] / 1024:.0f} KB), "
+                  f"{smallest['width']} px webp {smallest['bytes'] / 1024:.0f} KB")
+
+    # Remove variants whose source picture was deleted or renamed
+    expected = {os.path.basename(variant["path"])
+                for entry in pictures.values() for variant in entry["metadata"]["variants"]}
+    with instrumentation.stage("prune"):
+        for filename in os.listdir(variants_dir):
+            if filename not in expected and not filename.startswith('.'):
+                os.remove(os.path.join(variants_dir, filename))
+                instrumentation.count("variants_removed")
+
+    pictures = dict(sorted(pictures.items()))
+    write_json_atomic(cache_path, {
+        "version": CACHE_VERSION,
+        "widths": PICTURE_WIDTHS,
+        "placeholder_width": PLACEHOLDER_WIDTH,
+        "pictures": pictures,
+    }, compact=True)
+    metadata = {
+        "version": CACHE_VERSION,
+        "widths": PICTURE_WIDTHS,
+        "pictures": {f"{relative_dir}/{filename}": entry["metadata"] for filename, entry in pictures.items()},
+    }
+    write_json_atomic(metadata_file, metadata)
+    return metadata
+
+def main():
+    parser = argparse.ArgumentParser(description='Build responsive variants and placeholders for the activity pictures')
+    parser.add_argument('--pictures-dir', default=PICTURES_DIR, help=f'Picture folder (default: {PICTURES_DIR})')
+    parser.add_argument('--output', default=METADATA_FILE, help=f'Metadata file to write (default: {METADATA_FILE})')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Render in N worker processes (0 = one per CPU core, default: 1)')
+    instrumentation.add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    if not image_support_available():
+        print("❌ Pillow with WebP support is required (pip install Pillow)")
+        sys.exit(1)
+
+    metadata = instrumentation.run_instrumented(
+        "activity_pictures", args, build_activity_pictures,
+        args.pictures_dir, args.output, resolve_jobs(args.jobs)
+    )
+    pictures = metadata["pictures"].values()
+    original = sum(picture["bytes"] for picture in pictures)
+    card = sum(picture["variants"][0]["bytes"] for picture in pictures)
+    print(f"📐 {len(metadata['pictures'])} pictures in {args.output}: "
+          f"{original / 1024 / 1024:.1f} MB originals, {card / 1024:.0f} KB for the smallest WebP variants")
+
+if __name__ == "__main__":
+    main()
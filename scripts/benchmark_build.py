@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the content build scripts.
+
+For every size in --sizes, synthetic sheets are generated (see
+generate_benchmark_data.py) and each case runs in a fresh Python process,
+so peak RSS is measured per case:
+
+- convert          csv_to_grade_json: sheets -> grade files (one sheet per grade)
+- sync             update_activities_from_csv: resync all sheets into existing grade files
+- printouts        update_printouts.update_grade_file on every grade file (1 in 10 activities has printouts)
+- count            count_activities.count_activities()
+- catalog_queries  grade_activity_helper: load an ActivityCatalog and run filter queries
+
+Each case reports seconds (best of --repeat runs), rows per second and
+peak RSS. With --save-baseline the results are stored in the baseline file;
+later runs compare against it and exit with status 1 if a case got slower
+or bigger than the baseline by more than --tolerance (ignoring differences
+of a few milliseconds or megabytes).
+
+Run command in terminal: python3 scripts/benchmark_build.py
+                          python3 scripts/benchmark_build.py --sizes 100,1000,10000,100000 --save-baseline
+                          python3 scripts/benchmark_build.py --cases convert,sync --repeat 5
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+
+CASES = ["convert", "sync", "printouts", "count", "catalog_queries"]
+DEFAULT_SIZES = "100,1000,10000"
+DEFAULT_BASELINE = os.path.join(SCRIPTS_DIR, "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+# Differences below these are timer/allocator noise, not regressions
+MIN_SECONDS_DELTA = 0.02
+MIN_RSS_DELTA_MB = 2.0
+# Every n-th activity gets printouts in the printouts case
+PRINTOUT_EVERY = 10
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def convert_sheets(sheets: List[str], output_dir: str) -> None:
+    """Convert each grade sheet with its grade forced, as the npm convert-csv scripts do."""
+    from csv_to_grade_json import convert_csv_to_grade_json
+    from grade_detection import GRADE_NAMES
+    for sheet in sheets:
+        grade_number = int(os.path.basename(sheet).split('-')[-1].split('.')[0])
+        convert_csv_to_grade_json(sheet, output_dir, force_grade=GRADE_NAMES[grade_number])
+
+def copy_grades(data_dir: str, work_dir: str) -> str:
+    """Copy the prepared grade files into the work directory and return the grades path."""
+    grades_dir = os.path.join(work_dir, "public", "activityData", "grades")
+    shutil.copytree(os.path.join(data_dir, "grades"), grades_dir)
+    return grades_dir
+
+def run_case(case: str, data_dir: str, work_dir: str) -> Dict[str, Any]:
+    """Set up and time one case in this process. Only the measured call is timed."""
+    sys.path.insert(0, SCRIPTS_DIR)
+    sys.path.insert(0, REPO_ROOT)
+    sheets = sorted(glob.glob(os.path.join(data_dir, "sheets", "*.tsv")))
+
+    if case == "convert":
+        output_dir = os.path.join(work_dir, "grades")
+        measured = lambda: convert_sheets(sheets, output_dir)
+    elif case == "sync":
+        from update_activities_from_csv import update_activities_from_csv
+        grades_dir = copy_grades(data_dir, work_dir)
+        measured = lambda: update_activities_from_csv(sheets, grades_dir)
+    elif case == "printouts":
+        from update_printouts import update_grade_file
+        grades_dir = copy_grades(data_dir, work_dir)
+        grade_files = sorted(glob.glob(os.path.join(grades_dir, "*.json")))
+        mapping = {}
+        for grade_file in grade_files:
+            with open(grade_file, 'r', encoding='utf-8') as f:
+                activities = json.load(f)["activities"]
+            for activity in activities[::PRINTOUT_EVERY]:
+                mapping[activity["id"]] = [f"printOuts/{activity['id']}.png", f"printOuts/{activity['id']}_ark.docx"]
+        measured = lambda: [update_grade_file(grade_file, mapping) for grade_file in grade_files]
+    elif case == "count":
+        from count_activities import count_activities
+        copy_grades(data_dir, work_dir)
+        os.chdir(work_dir)
+        measured = count_activities
+    elif case == "catalog_queries":
+        from grade_activity_helper import ActivityCatalog
+        grades_dir = copy_grades(data_dir, work_dir)
+        def measured():
+            catalog = ActivityCatalog.from_directory(grades_dir)
+            query = catalog.query()
+            for grade in catalog.by_grade:
+                len(query.grade(grade).max_minutes(15))
+            len(query.learning_goal("tal"))
+            len(query.location("Ute").minutes_between(10, 30))
+            [catalog.get(record.id) for record in catalog.records[::100]]
+    else:
+        raise ValueError(f"Unknown benchmark case: {case}")
+
+    # The scripts print progress for every activity; keep it out of the measurement output
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        measured()
+        seconds = time.perf_counter() - started
+    return {"seconds": seconds, "peak_rss_mb": peak_rss_mb()}
+
+def prepare_data(rows: int, data_dir: str) -> None:
+    """Generate the sheets for one size and convert them once for the cases that need grade files."""
+    from generate_benchmark_data import write_grade_sheets
+    sheets = write_grade_sheets(os.path.join(data_dir, "sheets"), rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        convert_sheets(sheets, os.path.join(data_dir, "grades"))
+
+def measure(case: str, rows: int, data_dir: str, repeat: int) -> Dict[str, Any]:
+    """Run a case `repeat` times in fresh processes; keep the best time and the highest peak RSS."""
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="bench-work-") as work_dir:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-case", case,
+                 "--data-dir", data_dir, "--work-dir", work_dir],
+                check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+    seconds = min(run["seconds"] for run in runs)
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds) if seconds else None,
+        "peak_rss_mb": round(max(run["peak_rss_mb"] for run in runs), 1),
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Return a message for every case that is slower or uses more memory than its baseline."""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric, min_delta in (("seconds", MIN_SECONDS_DELTA), ("peak_rss_mb", MIN_RSS_DELTA_MB)):
+            if result[metric] > previous[metric] * (1 + tolerance) and result[metric] - previous[metric] > min_delta:
+                regressions.append(f"{key}: {metric} {previous[metric]} → {result[metric]} "
+                                   f"(+{(result[metric] / previous[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the content build scripts on synthetic data')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                       help=f'Comma-separated total row counts (default: {DEFAULT_SIZES})')
+    parser.add_argument('--cases', default=','.join(CASES),
+                       help=f'Comma-separated cases to run (default: all of {", ".join(CASES)})')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the best time is kept (default: 3)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                       help=f'Baseline file to compare against (default: {DEFAULT_BASELINE})')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                       help=f'Allowed slowdown/growth over the baseline, as a fraction (default: {DEFAULT_TOLERANCE})')
+    # Internal: run a single case in this (fresh) process
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.data_dir, args.work_dir)))
+        return
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    cases = [case for case in args.cases.split(',') if case]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        print(f"❌ Unknown case(s): {', '.join(unknown)} (choose from {', '.join(CASES)})")
+        sys.exit(2)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'case':<18}{'rows':>8}{'seconds':>10}{'rows/s':>11}{'peak RSS':>11}")
+    for rows in sizes:
+        with tempfile.TemporaryDirectory(prefix="bench-data-") as data_dir:
+            prepare_data(rows, data_dir)
+            for case in cases:
+                result = measure(case, rows, data_dir, args.repeat)
+                results[f"{case}@{rows}"] = result
+                print(f"{case:<18}{rows:>8}{result['seconds']:>10.3f}{result['rows_per_sec'] or 0:>11}"
+                      f"{result['peak_rss_mb']:>8.1f} MB")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get("results", {})
+
+    if args.save_baseline:
+        from json_writer import write_json_atomic
+        write_json_atomic(args.baseline, {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": {**baseline, **results},
+        })
+        print(f"\n💾 Baseline saved: {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"\nℹ️  No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over the baseline (tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"   - {regression}")
+        sys.exit(1)
+    print(f"\n✅ No regressions over the baseline (tolerance {args.tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
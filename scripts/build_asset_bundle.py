@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Build a content-hashed, precompressed bundle of the static activity data.
+
+The grade files, activity pictures and printouts are served under fixed
+names, so a CDN has to revalidate them on every deploy. This stage copies
+them into public/bundle/ under names that contain a hash of their content:
+
+    public/activityData/grades/2.grade.json -> public/bundle/activityData/grades/2.grade.3f2a9c1b7d4e.json
+    public/activityPictures/tallinje.png    -> public/bundle/activityPictures/tallinje.8be0f1a2c3d4.png
+
+and writes .gz (and .br, if the brotli package is installed) siblings for
+text formats such as JSON, SVG and HTML. Hashed files never change, so they
+can be served with "Cache-Control: public, max-age=31536000, immutable".
+
+public/bundle/manifest.json maps each logical path to its hashed file:
+
+    "activityData/grades/2.grade.json": {
+      "path": "bundle/activityData/grades/2.grade.3f2a9c1b7d4e.json",
+      "bytes": 47211,
+      "integrity": "sha384-...",              # Subresource Integrity digest
+      "encodings": {"gzip": {"path": ".../2.grade.3f2a9c1b7d4e.json.gz", "bytes": 11020}}
+    }
+
+The manifest itself keeps a fixed name and must be revalidated; the app
+resolves asset URLs through it (src/utils/assetManifest.ts) and falls back to
+the original paths when there is no bundle. Bundle files no longer in the
+manifest are removed. The docx previews (printOuts/previews) are not bundled,
+as their relative image links would break.
+
+Files are only hashed again when their size or modification time changes (or
+their modification time has whole-second resolution). An edit that keeps both
+size and modification time, e.g. after "touch -r", is not noticed; run with
+--rehash to hash every file again, as a release build should.
+
+Run command in terminal: python3 scripts/build_asset_bundle.py
+                          python3 scripts/build_asset_bundle.py --jobs 0 --no-brotli
+                          python3 scripts/build_asset_bundle.py --rehash
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import instrumentation
+from json_writer import write_json_atomic
+from parallel_ingest import ordered_map, resolve_jobs
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only .gz files are written
+    brotli = None
+
+PUBLIC_DIR = "public"
+BUNDLE_DIRNAME = "bundle"
+MANIFEST_FILENAME = "manifest.json"
+CACHE_FILENAME = ".bundle_cache.json"
+MANIFEST_VERSION = 1
+# Folders under public/ that are bundled (recursively; dotfiles are skipped)
+ASSET_DIRS = ["activityData/grades", "activityPictures", "printOuts"]
+# Folders left out of the bundle: the docx previews link their images by
+# relative path, which would not resolve between hashed file names
+EXCLUDED_DIRS = ["printOuts/previews"]
+# Hex characters of the sha256 digest in hashed file names
+HASH_LENGTH = 12
+# Already-compressed formats (images, .docx, .pdf) are not worth precompressing
+COMPRESSIBLE_EXTENSIONS = ('.json', '.svg', '.html', '.txt', '.css', '.js')
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+def find_assets(public_dir: str, asset_dirs: List[str], excluded_dirs: List[str] = EXCLUDED_DIRS) -> List[str]:
+    """Return the logical paths (relative to public/) of all files to bundle, sorted."""
+    assets = []
+    excluded = {os.path.normpath(os.path.join(public_dir, d)) for d in excluded_dirs}
+    for asset_dir in asset_dirs:
+        root_dir = os.path.join(public_dir, asset_dir)
+        for root, dirs, files in os.walk(root_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.')
+                             and os.path.normpath(os.path.join(root, d)) not in excluded)
+            for filename in files:
+                if not filename.startswith('.'):
+                    assets.append(os.path.relpath(os.path.join(root, filename), public_dir).replace(os.sep, '/'))
+    return sorted(assets)
+
+def hashed_name(logical_path: str, digest: str) -> str:
+    """activityData/grades/2.grade.json -> activityData/grades/2.grade.<digest>.json"""
+    stem, extension = os.path.splitext(logical_path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{extension}"
+
+def _write_bytes_atomic(path: str, payload: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def bundle_asset(task: Tuple[str, str, Optional[Dict[str, Any]], bool]) -> Dict[str, Any]:
+    """
+    Copy one asset to its hashed name and write its compressed siblings.
+    Takes (logical_path, public_dir, cached_entry, use_brotli) and
+    returns the manifest entry. Runs in worker processes.
+    """
+    logical_path, public_dir, cached, use_brotli = task
+    source = os.path.join(public_dir, logical_path)
+    stat = os.stat(source)
+
+    if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime_ns and has_fine_mtime(stat):
+        entry = cached["entry"]
+        if all(os.path.exists(os.path.join(public_dir, path))
+               for path in [entry["path"]] + [e["path"] for e in entry["encodings"].values()]):
+            return {**entry, "size": cached["size"], "mtime": cached["mtime"], "cached": True}
+
+    with open(source, 'rb') as f:
+        payload = f.read()
+    digest = hashlib.sha256(payload).hexdigest()
+    relative = f"{BUNDLE_DIRNAME}/{hashed_name(logical_path, digest)}"
+    target = os.path.join(public_dir, relative)
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+
+    encodings = {}
+    if logical_path.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+        compressors = [("gzip", ".gz", lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0))]
+        if use_brotli and brotli is not None:
+            compressors.append(("br", ".br", lambda data: brotli.compress(data, quality=BROTLI_QUALITY)))
+        for name, suffix, compress in compressors:
+            compressed_path = target + suffix
+            if not os.path.exists(compressed_path):
+                _write_bytes_atomic(compressed_path, compress(payload))
+            encodings[name] = {"path": relative + suffix, "bytes": os.path.getsize(compressed_path)}
+
+    integrity = "sha384-" + base64.b64encode(hashlib.sha384(payload).digest()).decode('ascii')
+    return {"path": relative, "bytes": len(payload), "integrity": integrity, "encodings": encodings,
+            "size": stat.st_size, "mtime": stat.st_mtime_ns, "cached": False}
+
+def has_fine_mtime(stat: os.stat_result) -> bool:
+    """
+    False for whole-second modification times (FAT, some network shares and
+    archive extractions), where an edit within the same second and of the same
+    size would go unnoticed; such files are always hashed again.
+    """
+    return stat.st_mtime_ns % 1_000_000_000 != 0
+
+def load_cache(cache_path: str) -> Dict[str, Any]:
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get("version") == MANIFEST_VERSION:
+                return cache.get("assets", {})
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {}
+
+def prune_bundle(bundle_dir: str, public_dir: str, referenced: set) -> int:
+    """Remove bundle files that the manifest no longer references. Returns the number removed."""
+    removed = 0
+    for root, _, files in os.walk(bundle_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, public_dir).replace(os.sep, '/')
+            if filename in (MANIFEST_FILENAME, CACHE_FILENAME) and root == bundle_dir:
+                continue
+            if relative not in referenced:
+                os.remove(path)
+                removed += 1
+    return removed
+
+def build_asset_bundle(public_dir: str = PUBLIC_DIR, asset_dirs: List[str] = ASSET_DIRS,
+                       jobs: int = 1, use_brotli: bool = True, rehash: bool = False) -> Dict[str, Any]:
+    """Bundle all assets and write the manifest (rehash: ignore the skip cache). Returns the manifest."""
+    bundle_dir = os.path.join(public_dir, BUNDLE_DIRNAME)
+    os.makedirs(bundle_dir, exist_ok=True)
+    cache_path = os.path.join(bundle_dir, CACHE_FILENAME)
+    cache = {} if rehash else load_cache(cache_path)
+
+    with instrumentation.stage("scan"):
+        assets = find_assets(public_dir, asset_dirs)
+    tasks = [(path, public_dir, cache.get(path), use_brotli) for path in assets]
+
+    manifest_assets: Dict[str, Any] = {}
+    new_cache: Dict[str, Any] = {}
+    with instrumentation.stage("bundle"):
+        for logical_path, result in zip(assets, ordered_map(bundle_asset, tasks, jobs)):
+            instrumentation.count("assets_cached" if result["cached"] else "assets_hashed")
+            entry = {key: result[key] for key in ("path", "bytes", "integrity", "encodings")}
+            manifest_assets[logical_path] = entry
+            new_cache[logical_path] = {"size": result["size"], "mtime": result["mtime"], "entry": entry}
+
+    referenced = set()
+    for entry in manifest_assets.values():
+        referenced.add(entry["path"])
+        referenced.update(encoding["path"] for encoding in entry["encodings"].values())
+    with instrumentation.stage("prune"):
+        removed = prune_bundle(bundle_dir, public_dir, referenced)
+    instrumentation.count("files_removed", removed)
+
+    manifest = {"version": MANIFEST_VERSION, "assets": manifest_assets}
+    write_json_atomic(os.path.join(bundle_dir, MANIFEST_FILENAME), manifest)
+    write_json_atomic(cache_path, {"version": MANIFEST_VERSION, "assets": new_cache}, compact=True)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the content-hashed, precompressed asset bundle')
+    parser.add_argument('--public-dir', default=PUBLIC_DIR, help=f'Public folder (default: {PUBLIC_DIR})')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Hash and compress in N worker processes (0 = one per CPU core, default: 1)')
+    parser.add_argument('--no-brotli', action='store_true', help='Only write .gz files, even if brotli is installed')
+    parser.add_argument('--rehash', action='store_true',
+                       help='Hash every file again instead of trusting unchanged size and modification time')
+    instrumentation.add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    use_brotli = not args.no_brotli
+    if use_brotli and brotli is None:
+        print("ℹ️  brotli is not installed (pip install brotli); writing .gz files only")
+
+    manifest = instrumentation.run_instrumented(
+        "build_asset_bundle", args, build_asset_bundle,
+        args.public_dir, ASSET_DIRS, resolve_jobs(args.jobs), use_brotli, args.rehash
+    )
+    assets = manifest["assets"].values()
+    total = sum(entry["bytes"] for entry in assets)
+    compressed = sum(1 for entry in assets if entry["encodings"])
+    print(f"📦 Bundled {len(manifest['assets'])} assets ({total / 1024 / 1024:.1f} MB, "
+          f"{compressed} precompressed) into {os.path.join(args.public_dir, BUNDLE_DIRNAME)}")
+
+if __name__ == "__main__":
+    main()
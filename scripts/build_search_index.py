@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Build a compact search index from the grade JSON files.
+
+Reads public/activityData/grades/*.grade.json and writes
+public/activityData/searchIndex.json, so the search box can fetch one small
+file instead of every grade file with all activity text.
+
+Index format:
+{
+  "version": 1,
+  "fields": ["title", "description", ...],     # field order for the bit masks
+  "weights": [10, 8, ...],                      # same weights as ActivitySearch
+  "learning_goals": ["...", ...],               # shared string table
+  "activities": [                               # one summary record per activity
+    {"id": "A0101", "title": "...", "grade": "Andre årstrinn", "time": "15",
+     "location": "Inne / ute", "tools": "Ingen", "goal": 0}
+  ],
+  "postings": {                                 # sorted token -> flat pairs
+    "maurtu": [activity_gap, field_mask, ...]
+  }
+}
+
+Activity indices in a posting list are delta-encoded (each gap is added to the
+previous index, starting from 0). The score of a posting follows from its field
+mask: every matching field adds weight * 1.5 (every index hit is a whole-word
+match) and a title match adds the title weight once more, as in ActivitySearch.
+
+Tokens are normalized the same way for documents and queries: lowercase,
+accents removed except for æ/ø/å (ä/ö are folded to æ/ø), split on anything
+that is not a letter or digit, common stopwords dropped, and common Norwegian
+suffixes stripped ("tallene" -> "tall", "figurer" -> "figur"). A query
+term is looked up with normalize_query() and, for search-as-you-type, by
+prefix over the sorted token keys.
+
+Run command in terminal: python3 scripts/build_search_index.py
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import unicodedata
+from typing import Any, Dict, List, Tuple
+
+from grade_encoding import decode_grade_data
+from json_writer import write_json_atomic
+
+# (field, weight) in the same order and with the same weights as ActivitySearch.tsx
+SEARCH_FIELDS = [
+    ("title", 10),
+    ("description", 8),
+    ("learning_goal", 6),
+    ("tools", 5),
+    ("location", 3),
+    ("grade", 2),
+    ("introduction", 4),
+    ("main", 4),
+    ("examples", 3),
+    ("tips", 3),
+    ("reflection", 2),
+    ("extra", 2),
+]
+
+CONTENT_FIELDS = ["introduction", "main", "examples", "tips", "reflection", "extra"]
+
+STOPWORDS = {
+    "og", "i", "på", "å", "en", "ei", "et", "som", "til", "med", "for", "av",
+    "de", "dei", "det", "den", "er", "at", "seg", "skal", "kan", "om", "så",
+    "har", "fra", "frå", "eller", "the", "a", "an", "of", "to", "in",
+}
+
+# Longest first; a suffix is only removed if at least MIN_STEM_LENGTH characters remain
+SUFFIXES = sorted([
+    "hetenes", "hetene", "hetens", "heten", "heter", "endes", "ande", "ende",
+    "edes", "enes", "erte", "ede", "ane", "ene", "ens", "ers", "ets", "het",
+    "ast", "ert", "en", "ar", "er", "as", "es", "et", "a", "e",
+], key=len, reverse=True)
+MIN_STEM_LENGTH = 3
+# Letters after which a plural/genitive "s" may be stripped
+S_ENDING_PRECEDERS = set("bcdfghjlmnoprtvyz")
+
+TOKEN_PATTERN = re.compile(r'[0-9a-zæøå]+')
+LETTER_FOLDS = {"ä": "æ", "ö": "ø"}
+
+def fold_characters(text: str) -> str:
+    """Lowercase and strip accents, keeping the Norwegian letters æ, ø and å."""
+    folded = []
+    for char in unicodedata.normalize("NFC", text.lower()):
+        char = LETTER_FOLDS.get(char, char)
+        if char in "æøå" or char.isascii():
+            folded.append(char)
+            continue
+        folded.append(''.join(c for c in unicodedata.normalize("NFD", char) if not unicodedata.combining(c)))
+    return ''.join(folded)
+
+def stem(token: str) -> str:
+    """Strip one common Norwegian suffix."""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            return token[:-len(suffix)]
+    if token.endswith("s") and len(token) - 1 >= MIN_STEM_LENGTH and token[-2] in S_ENDING_PRECEDERS:
+        return token[:-1]
+    return token
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized, stemmed tokens (stopwords removed)."""
+    return [stem(token) for token in TOKEN_PATTERN.findall(fold_characters(text)) if token not in STOPWORDS]
+
+def normalize_query(query: str) -> List[str]:
+    """Normalize a search query into the tokens used as index keys."""
+    return tokenize(query)
+
+def get_field_text(activity: Dict[str, Any], grade: str, field: str) -> str:
+    """Return the searchable text of one field, mirroring what ActivitySearch searches."""
+    if field == "description":
+        return activity.get("learning_goal", "")
+    if field == "grade":
+        return grade
+    if field in CONTENT_FIELDS:
+        value = activity.get("content", {}).get(field, [])
+        return ' '.join(value) if isinstance(value, list) else str(value)
+    return str(activity.get(field, ""))
+
+def load_grade_files(grades_dir: str) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Return (grade, activities) for every grade file, in file name order."""
+    grades = []
+    for grade_file in sorted(glob.glob(os.path.join(grades_dir, "*.grade.json"))):
+        with open(grade_file, 'r', encoding='utf-8') as f:
+            data = decode_grade_data(json.load(f))
+        grades.append((data.get("grade", ""), data.get("activities", [])))
+    return grades
+
+def build_search_index(grades: List[Tuple[str, List[Dict[str, Any]]]]) -> Dict[str, Any]:
+    """Build the inverted index and summary records for all activities."""
+    learning_goals: List[str] = []
+    goal_index: Dict[str, int] = {}
+    summaries: List[Dict[str, Any]] = []
+    # token -> activity index -> field mask
+    postings: Dict[str, Dict[int, int]] = {}
+
+    for grade, activities in grades:
+        for activity in activities:
+            doc = len(summaries)
+            goal = activity.get("learning_goal", "")
+            if goal not in goal_index:
+                goal_index[goal] = len(learning_goals)
+                learning_goals.append(goal)
+            summaries.append({
+                "id": activity.get("id", ""),
+                "title": activity.get("title", ""),
+                "grade": grade,
+                "time": activity.get("time", ""),
+                "location": activity.get("location", ""),
+                "tools": activity.get("tools", ""),
+                "goal": goal_index[goal],
+            })
+
+            for bit, (field, _) in enumerate(SEARCH_FIELDS):
+                for token in set(tokenize(get_field_text(activity, grade, field))):
+                    masks = postings.setdefault(token, {})
+                    masks[doc] = masks.get(doc, 0) | 1 << bit
+
+    flat_postings = {}
+    for token in sorted(postings):
+        flat = []
+        previous = 0
+        for doc, mask in sorted(postings[token].items()):
+            flat.extend((doc - previous, mask))
+            previous = doc
+        flat_postings[token] = flat
+
+    return {
+        "version": 1,
+        "fields": [field for field, _ in SEARCH_FIELDS],
+        "weights": [weight for _, weight in SEARCH_FIELDS],
+        "learning_goals": learning_goals,
+        "activities": summaries,
+        "postings": flat_postings,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a compact search index from the grade JSON files')
+    parser.add_argument('--grades-dir', default='./public/activityData/grades',
+                       help='Directory containing grade JSON files (default: ./public/activityData/grades)')
+    parser.add_argument('--output', default='./public/activityData/searchIndex.json',
+                       help='Index file to write (default: ./public/activityData/searchIndex.json)')
+    args = parser.parse_args()
+
+    grades = load_grade_files(args.grades_dir)
+    if not grades:
+        print(f"❌ No grade files found in {args.grades_dir}")
+        return
+
+    index = build_search_index(grades)
+    changed = write_json_atomic(args.output, index, compact=True)
+
+    source_size = sum(os.path.getsize(path) for path in glob.glob(os.path.join(args.grades_dir, "*.grade.json")))
+    index_size = os.path.getsize(args.output)
+    print(f"🔎 Indexed {len(index['activities'])} activities, {len(index['postings'])} tokens")
+    print(f"   📦 {args.output}: {index_size / 1024:.1f} KB (grade files: {source_size / 1024:.1f} KB)")
+    if not changed:
+        print(f"   ⏭️  Index unchanged")
+
+if __name__ == "__main__":
+    main()
@@ -12,42 +12,43 @@ Text formatting:
 """
 
 import csv
+import itertools
 import json
 import os
-import re
 import argparse
-from typing import Dict, List, Any
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-def parse_text_content(text: str) -> List[str]:
-    """
-    Parse text content and convert to appropriate format:
-    - Split on "-" for bullet points
-    - Split on numbered patterns (1., 2., 3., etc.) for numbered lists
-    - Return as array of strings
-    """
-    if not text or text.strip() == "":
-        return []
-    
-    text = text.strip()
-    
-    # Check if text contains numbered list pattern (1. 2. 3. etc.)
-    numbered_pattern = r'\d+\.\s+'
-    if re.search(numbered_pattern, text):
-        # Split on numbered patterns and clean up
-        items = re.split(numbered_pattern, text)
-        # Remove empty first element (text before first number)
-        items = [item.strip() for item in items if item.strip()]
-        return items
-    
-    # Check if text contains bullet points (-)
-    elif '-' in text:
-        # Split on dash and clean up
-        items = [item.strip() for item in text.split('-') if item.strip()]
-        return items
-    
-    # Single item text
-    else:
-        return [text]
+import instrumentation
+from curriculum_index import match_learning_goal, with_learning_goal_id
+from grade_detection import detect_grade_in_text
+from grade_encoding import ENCODING, StringTable
+from grade_shards import GradeShardWriter, default_shards_dir, refresh_grade_shards
+from json_writer import AtomicWriter, serialize_json
+from parallel_ingest import chunked, ordered_map, resolve_jobs
+from text_parsing import parse_text_content
+
+# Number of characters used to sniff the delimiter
+SNIFF_SAMPLE_SIZE = 2048
+
+# Canonical activity fields and the column names accepted for them, in priority order
+COLUMN_ALIASES = {
+    'id': ['ID', 'Id', 'id'],
+    'learning_goal': ['Learning goal', 'Kompetansemål'],
+    'title': ['Title', 'Tittel'],
+    'time': ['Time'],
+    'location': ['Location'],
+    'tools': ['Tools'],
+    'groupsize': ['Groupsize'],
+    'introduction': ['Introduction'],
+    'main': ['Main'],
+    'examples': ['Examples', 'Example'],
+    'reflection': ['Reflection'],
+    'tips': ['Tips'],
+    'extra': ['Extra'],
+    'grade': ['Grade'],
+}
 
 def extract_grade_from_learning_goal(learning_goal: str, grade_column: str = None) -> str:
     """
@@ -57,32 +58,10 @@ def extract_grade_from_learning_goal(learning_goal: str, grade_column: str = Non
     if grade_column and grade_column.strip():
         return grade_column.strip()
     
-    # Common Norwegian grade patterns
-    grade_patterns = {
-        'andre': 'Andre årstrinn',
-        'tredje': 'Tredje årstrinn', 
-        'fjerde': 'Fjerde årstrinn',
-        'femte': 'Femte årstrinn',
-        'sjette': 'Sjette årstrinn',
-        'syvende': 'Syvende årstrinn',
-        '2': 'Andre årstrinn',
-        '3': 'Tredje årstrinn',
-        '4': 'Fjerde årstrinn', 
-        '5': 'Femte årstrinn',
-        '6': 'Sjette årstrinn',
-        '7': 'Syvende årstrinn',
-        'år 2': 'Andre årstrinn',
-        'år 3': 'Tredje årstrinn',
-        'år 4': 'Fjerde årstrinn',
-        'år 5': 'Femte årstrinn',
-        'år 6': 'Sjette årstrinn',
-        'år 7': 'Syvende årstrinn'
-    }
-    
-    learning_goal_lower = learning_goal.lower()
-    for pattern, grade in grade_patterns.items():
-        if pattern in learning_goal_lower:
-            return grade
+    # Look for an explicit grade marker ("2. trinn", "år 3", "femte årstrinn", ...)
+    grade = detect_grade_in_text(learning_goal)
+    if grade:
+        return grade
     
     # Default fallback - you might want to handle this differently
     return "Generelt"
@@ -94,13 +73,20 @@ def detect_delimiter(file_path: str) -> str:
     """
     with open(file_path, 'r', encoding='utf-8') as f:
         # Read first few lines to detect delimiter
-        sample = f.read(2048)
-        
+        sample = f.read(SNIFF_SAMPLE_SIZE)
+    
+    return sniff_delimiter(sample)
+
+def sniff_delimiter(sample: str) -> str:
+    """
+    Detect the delimiter from a sample of CSV/TSV text.
+    """
     # Use csv.Sniffer to detect delimiter
     sniffer = csv.Sniffer()
     try:
         delimiter = sniffer.sniff(sample, delimiters=',;\t').delimiter
-        print(f"🔍 Detected delimiter: {'TAB' if delimiter == '\\t' else repr(delimiter)}")
+        delimiter_label = 'TAB' if delimiter == '\t' else repr(delimiter)
+        print(f"🔍 Detected delimiter: {delimiter_label}")
         return delimiter
     except:
         # Fallback: manually check for common patterns
@@ -114,172 +100,344 @@ def detect_delimiter(file_path: str) -> str:
             print("🔍 Detected delimiter: , (default)")
             return ','
 
-def convert_csv_to_grade_json(csv_file_path: str, output_dir: str = "./public/activityData/grades", force_grade: str = None, delimiter: str = None):
+def compile_row_extractor(fieldnames: List[str]) -> Callable[[List[str]], Optional[Dict[str, str]]]:
     """
-    Convert CSV file to grade-based JSON files
+    Resolve a header row into a function that maps raw rows to canonical fields.
+    
+    Column names are matched against COLUMN_ALIASES once per file (exact match
+    first, then case-insensitive), so each row is extracted by index. The
+    returned function gives a dict with every canonical field (missing columns
+    become ''), or None for rows without content in any named column.
     """
-    # Ensure output directory exists
-    os.makedirs(output_dir, exist_ok=True)
+    # Index per column name; like csv.DictReader the last of duplicate names wins
+    column_index: Dict[str, int] = {}
+    for index, name in enumerate(fieldnames):
+        name = name.strip() if name else name
+        if name:
+            column_index[name] = index
+    lowercase_index: Dict[str, int] = {}
+    for name, index in column_index.items():
+        lowercase_index.setdefault(name.lower(), index)
     
-    # Auto-detect delimiter if not specified
-    if delimiter is None:
-        delimiter = detect_delimiter(csv_file_path)
+    # Column index per canonical field, or None if the sheet lacks that column
+    columns: List[Tuple[str, Optional[int]]] = []
+    for field, aliases in COLUMN_ALIASES.items():
+        index = None
+        for alias in aliases:
+            index = column_index.get(alias, lowercase_index.get(alias.lower()))
+            if index is not None:
+                break
+        columns.append((field, index))
     
-    # Dictionary to store activities by grade
-    activities_by_grade: Dict[str, List[Dict[str, Any]]] = {}
+    named_indices = sorted(set(column_index.values()))
+    width = len(fieldnames)
     
-    # Read and process CSV
+    def extract(row: List[str]) -> Optional[Dict[str, str]]:
+        # Short rows are padded, extra cells beyond the header are ignored
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        if not any(row[index].strip() for index in named_indices):
+            return None
+        return {field: row[index].strip() if index is not None else '' for field, index in columns}
+    
+    return extract
+
+def build_activity_from_row(fields: Dict[str, str], force_grade: str = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Build an activity from canonical row fields and determine its grade.
+    Returns (grade, activity), or None for rows missing ID or Title.
+    """
+    activity_id = fields['id']
+    learning_goal = fields['learning_goal']
+    title = fields['title']
+    time = fields['time']
+    location = fields['location']
+    tools = fields['tools']
+    groupsize = fields['groupsize']
+    introduction = parse_text_content(fields['introduction'])
+    main = parse_text_content(fields['main'])
+    examples = parse_text_content(fields['examples'])
+    reflection = parse_text_content(fields['reflection'])
+    tips = parse_text_content(fields['tips'])
+    extra = parse_text_content(fields['extra'])
+    
+    # Skip rows with missing essential data
+    if not activity_id or not title:
+        return None
+    
+    # Determine grade
+    if force_grade:
+        grade = force_grade
+    else:
+        # Determine grade from learning goal or dedicated Grade column
+        grade = extract_grade_from_learning_goal(learning_goal, fields['grade'])
+    
+    # Create activity object
+    activity = {
+        "id": activity_id,
+        "title": title,
+        "time": time,
+        "location": location,
+        "tools": tools,
+        "groupsize": groupsize,
+        "learning_goal": learning_goal,
+        "content": {
+            "introduction": introduction,
+            "main": main,
+            "examples": examples,
+            "reflection": reflection,
+            "tips": tips,
+            "extra": extra
+        }
+    }
+    
+    return grade, with_learning_goal_id(activity, match_learning_goal(grade, learning_goal))
+
+def process_row_chunk(task: Tuple[List[Dict[str, str]], str]) -> List[Tuple[str, Any]]:
+    """
+    Build activities for a chunk of extracted rows.
+    
+    May run in a worker process, so messages are returned instead of printed:
+    each result is ("activity", (grade, activity)) or ("message", text).
+    """
+    rows, force_grade = task
+    results = []
+    for fields in rows:
+        try:
+            built = build_activity_from_row(fields, force_grade)
+            if built is None:
+                results.append(("message", f"Skipping row with missing ID or Title: {fields}"))
+            else:
+                results.append(("activity", built))
+        except Exception as e:
+            results.append(("message", f"Error processing row: {e}\nRow data: {fields}"))
+    return results
+
+def iter_non_empty_lines(csvfile: Iterable[str]) -> Iterator[str]:
+    """Yield lines that contain more than whitespace and tabs."""
+    for line in csvfile:
+        if line.strip() and not all(c in '\t\n\r ' for c in line):
+            yield line
+
+def read_cleaned_rows(csv_file_path: str, delimiter: str = None) -> Iterator[Dict[str, str]]:
+    """
+    Stream non-empty rows from a CSV/TSV file as canonical field dicts.
+    
+    Only one row is held in memory at a time. If no delimiter is given it is
+    sniffed from the first block of non-empty lines. The header is compiled
+    into a row extractor once per file (see compile_row_extractor).
+    """
     with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-        # Read all lines and skip initial empty lines
-        lines = csvfile.readlines()
+        lines = iter_non_empty_lines(csvfile)
         
-        # Find the first non-empty line (should contain headers)
-        non_empty_lines = []
-        for line in lines:
-            if line.strip() and not all(c in '\t\n\r ' for c in line):
-                non_empty_lines.append(line)
+        # Auto-detect delimiter from the first block of non-empty lines
+        if delimiter is None:
+            first_block = []
+            block_size = 0
+            for line in lines:
+                first_block.append(line)
+                block_size += len(line)
+                if block_size >= SNIFF_SAMPLE_SIZE:
+                    break
+            with instrumentation.stage("sniff"):
+                delimiter = sniff_delimiter(''.join(first_block)[:SNIFF_SAMPLE_SIZE])
+            lines = itertools.chain(first_block, lines)
         
-        # Create a new file-like object from non-empty lines
-        from io import StringIO
-        cleaned_csv = StringIO(''.join(non_empty_lines))
-        
-        reader = csv.DictReader(cleaned_csv, delimiter=delimiter)
-        
-        # Clean up column names (remove extra whitespace)
-        reader.fieldnames = [field.strip() if field else field for field in reader.fieldnames]
+        reader = csv.reader(lines, delimiter=delimiter)
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return
+        extract = compile_row_extractor(fieldnames)
         
         for row in reader:
-            # Create a cleaned row dictionary with trimmed keys
-            cleaned_row = {key.strip(): value for key, value in row.items() if key}
+            fields = extract(row)
             
             # Skip completely empty rows
-            if not cleaned_row or all(not str(value).strip() for value in cleaned_row.values()):
+            if fields is None:
                 continue
             
-            # Create case-insensitive lookup for common variations
-            def get_field(field_name, variations=None):
-                if variations is None:
-                    variations = [field_name]
-                for var in variations:
-                    if var in cleaned_row:
-                        return cleaned_row[var].strip()
-                    # Try case-insensitive match
-                    for key in cleaned_row.keys():
-                        if key.lower() == var.lower():
-                            return cleaned_row[key].strip()
-                return ''
+            yield fields
+
+def get_grade_filename(grade: str) -> str:
+    """Return the output filename for a grade, matching the existing convention."""
+    grade_filename_map = {
+        "Andre årstrinn": "2.grade.json",
+        "Tredje årstrinn": "3.grade.json",
+        "Fjerde årstrinn": "4.grade.json",
+        "Femte årstrinn": "5.grade.json",
+        "Sjette årstrinn": "6.grade.json",
+        "Syvende årstrinn": "7.grade.json",
+    }
+    
+    # Use mapped filename or create safe filename for other grades
+    if grade in grade_filename_map:
+        return grade_filename_map[grade]
+    safe_grade = grade.lower().replace(' ', '_').replace('å', 'aa')
+    return f"{safe_grade}.json"
+
+class GradeJsonStreamWriter:
+    """
+    Write grade JSON files incrementally, one activity at a time.
+    
+    Activities are serialized as soon as they arrive into a temporary part file
+    per grade, so memory use does not grow with the input. close() wraps each
+    part file in the grade header; the result is byte-identical to
+    json_writer.serialize_json(grade_data, compact), or with encoded=True to
+    serialize_json(grade_encoding.encode_grade_data(grade_data), compact).
+    Grade files are replaced atomically and left untouched when their content
+    is unchanged.
+    """
+    
+    def __init__(self, output_dir: str, compact: bool = False, encoded: bool = False):
+        self.output_dir = output_dir
+        self.compact = compact
+        self.encoded = encoded
+        self.parts: Dict[str, Any] = {}
+        self.counts: Dict[str, int] = {}
+        self.string_tables: Dict[str, StringTable] = {}
+    
+    def add(self, grade: str, activity: Dict[str, Any]) -> None:
+        if grade not in self.parts:
+            self.parts[grade] = tempfile.TemporaryFile(mode='w+', encoding='utf-8', dir=self.output_dir)
+            self.counts[grade] = 0
+            self.string_tables[grade] = StringTable()
+        if self.encoded:
+            activity = self.string_tables[grade].encode_activity(activity)
+        part = self.parts[grade]
+        serialized = serialize_json(activity, self.compact)
+        if self.compact:
+            part.write(',' + serialized if self.counts[grade] else serialized)
+        else:
+            if self.counts[grade]:
+                part.write(',\n')
+            part.write('    ' + serialized.replace('\n', '\n    '))
+        self.counts[grade] += 1
+    
+    def close(self) -> Dict[str, int]:
+        """Write the final grade files and return the activity count per grade."""
+        for grade, part in self.parts.items():
+            filepath = os.path.join(self.output_dir, get_grade_filename(grade))
+            count = self.counts[grade]
+            grade_json = json.dumps(grade, ensure_ascii=False)
+            
+            # The string table is complete only now, so it goes in the header
+            table = ""
+            if self.encoded:
+                strings = serialize_json(self.string_tables[grade].strings, self.compact)
+                if self.compact:
+                    table = f'"encoding":"{ENCODING}","strings":{strings},'
+                else:
+                    table = f'  "encoding": "{ENCODING}",\n  "strings": ' + strings.replace('\n', '\n  ') + ',\n'
             
-            try:
-                # Extract and clean data with better error handling
-                activity_id = get_field('ID', ['ID', 'Id', 'id'])
-                learning_goal = get_field('Learning goal', ['Learning goal', 'Kompetansemål'])
-                title = get_field('Title', ['Title', 'Tittel'])
-                time = get_field('Time')
-                location = get_field('Location')
-                tools = get_field('Tools')
-                groupsize = get_field('Groupsize')
-                introduction = parse_text_content(get_field('Introduction'))
-                main = parse_text_content(get_field('Main'))
-                examples = parse_text_content(get_field('Examples', ['Examples', 'Example']))
-                reflection = parse_text_content(get_field('Reflection'))
-                tips = parse_text_content(get_field('Tips'))
-                extra = parse_text_content(get_field('Extra'))
-                
-                # Skip rows with missing essential data
-                if not activity_id or not title:
-                    print(f"Skipping row with missing ID or Title: {cleaned_row}")
-                    continue
-                
-                # Determine grade
-                if force_grade:
-                    grade = force_grade
+            writer = AtomicWriter(filepath)
+            with writer as jsonfile:
+                if self.compact:
+                    jsonfile.write(f'{{"grade":{grade_json},"total_activities":{count},{table}"activities":[')
                 else:
-                    # Check if there's a dedicated Grade column
-                    grade_column = get_field('Grade')
-                    # Determine grade from learning goal or grade column
-                    grade = extract_grade_from_learning_goal(learning_goal, grade_column)
-                
-                # Create activity object
-                activity = {
-                    "id": activity_id,
-                    "title": title,
-                    "time": time,
-                    "location": location,
-                    "tools": tools,
-                    "groupsize": groupsize,
-                    "learning_goal": learning_goal,
-                    "content": {
-                        "introduction": introduction,
-                        "main": main,
-                        "examples": examples,
-                        "reflection": reflection,
-                        "tips": tips,
-                        "extra": extra
-                    }
-                }
-                
-                # Add to grade-based collection
-                if grade not in activities_by_grade:
-                    activities_by_grade[grade] = []
-                
-                activities_by_grade[grade].append(activity)
-                
-            except Exception as e:
-                print(f"Error processing row: {e}")
-                print(f"Row data: {cleaned_row}")
+                    jsonfile.write('{\n')
+                    jsonfile.write(f'  "grade": {grade_json},\n')
+                    jsonfile.write(f'  "total_activities": {count},\n')
+                    jsonfile.write(table)
+                    jsonfile.write('  "activities": [\n')
+                part.seek(0)
+                shutil.copyfileobj(part, jsonfile)
+                jsonfile.write(']}' if self.compact else '\n  ]\n}')
+            part.close()
+            
+            if writer.changed:
+                print(f"Created {filepath} with {count} activities")
+            else:
+                print(f"Unchanged {filepath} with {count} activities")
+        
+        self.parts = {}
+        self.string_tables = {}
+        return dict(self.counts)
+
+def convert_csv_to_grade_json(csv_file_path: str, output_dir: str = "./public/activityData/grades", force_grade: str = None, delimiter: str = None, jobs: int = 1, compact: bool = False, shards_dir: Optional[str] = None, encoded: bool = False):
+    """
+    Convert CSV file to grade-based JSON files
+    """
+    convert_csv_files_to_grade_json([csv_file_path], output_dir, force_grade, delimiter, jobs, compact, shards_dir, encoded)
+
+def convert_csv_files_to_grade_json(csv_file_paths: List[str], output_dir: str = "./public/activityData/grades", force_grade: str = None, delimiter: str = None, jobs: int = 1, compact: bool = False, shards_dir: Optional[str] = None, encoded: bool = False):
+    """
+    Convert one or more CSV files to grade-based JSON files.
+    
+    Activities from all files are combined per grade in file order. With jobs > 1
+    rows are built in a process pool and merged back in order, so the output
+    matches a serial run byte for byte. With compact=True grade files are
+    written without indentation, for deployment builds. With shards_dir set,
+    a summary per grade and a detail file per activity are written there too,
+    for every grade file in output_dir (see grade_shards.py). With encoded=True repeated fields are stored in a
+    string table per file (see grade_encoding.py).
+    """
+    # Ensure output directory exists
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Activities are streamed to the grade files as they are built
+    writer = GradeJsonStreamWriter(output_dir, compact, encoded)
+    shard_writer = GradeShardWriter(shards_dir, compact) if shards_dir else None
+    
+    def iter_tasks():
+        for csv_file_path in csv_file_paths:
+            rows = instrumentation.timed_iter("read", read_cleaned_rows(csv_file_path, delimiter))
+            for chunk in chunked(rows):
+                instrumentation.count("rows", len(chunk))
+                yield chunk, force_grade
+    
+    # Read and process CSV
+    for results in instrumentation.timed_iter("parse", ordered_map(process_row_chunk, iter_tasks(), jobs)):
+        for kind, value in results:
+            if kind == "message":
+                print(value)
+                instrumentation.count("rows_skipped")
                 continue
+            
+            grade, activity = value
+            with instrumentation.stage("serialize"):
+                writer.add(grade, activity)
+            if shard_writer:
+                with instrumentation.stage("shards"):
+                    shard_writer.add(get_grade_filename(grade), grade, activity)
+            instrumentation.count("activities")
     
     # Write JSON files for each grade
-    for grade, activities in activities_by_grade.items():
-        # Create filename based on grade name to match existing convention
-        grade_filename_map = {
-            "Andre årstrinn": "2.grade.json",
-            "Tredje årstrinn": "3.grade.json",
-            "Fjerde årstrinn": "4.grade.json",
-            "Femte årstrinn": "5.grade.json",
-            "Sjette årstrinn": "6.grade.json",
-            "Syvende årstrinn": "7.grade.json",
-        }
-        
-        # Use mapped filename or create safe filename for other grades
-        if grade in grade_filename_map:
-            filename = grade_filename_map[grade]
-        else:
-            safe_grade = grade.lower().replace(' ', '_').replace('å', 'aa')
-            filename = f"{safe_grade}.json"
-            
-        filepath = os.path.join(output_dir, filename)
-        
-        # Create grade object
-        grade_data = {
-            "grade": grade,
-            "total_activities": len(activities),
-            "activities": activities
-        }
-        
-        # Write to file
-        with open(filepath, 'w', encoding='utf-8') as jsonfile:
-            json.dump(grade_data, jsonfile, ensure_ascii=False, indent=2)
-        
-        print(f"Created {filepath} with {len(activities)} activities")
+    with instrumentation.stage("write"):
+        counts_by_grade = writer.close()
+        if shard_writer:
+            shard_writer.close()
+            # Grade files in output_dir that this run did not write keep up-to-date shards too
+            refresh_grade_shards(output_dir, shards_dir, compact,
+                                 {get_grade_filename(grade) for grade in counts_by_grade})
     
-    print(f"\\nConversion completed! Created {len(activities_by_grade)} grade files.")
-    print(f"Grades processed: {', '.join(activities_by_grade.keys())}")
+    print(f"\\nConversion completed! Created {len(counts_by_grade)} grade files.")
+    print(f"Grades processed: {', '.join(counts_by_grade.keys())}")
 
 def main():
     parser = argparse.ArgumentParser(description='Convert CSV activities to grade-based JSON files')
-    parser.add_argument('csv_file', help='Path to the CSV file')
+    parser.add_argument('csv_files', nargs='+', help='Path to the CSV file(s)')
     parser.add_argument('--output-dir', default='./public/activityData/grades', 
                        help='Output directory for JSON files (default: ./public/activityData/grades)')
     parser.add_argument('--force-grade', help='Force all activities to use this grade level (e.g., "Andre årstrinn")')
     parser.add_argument('--delimiter', choices=[',', ';', 'tab'], 
                        help='Specify delimiter: comma (,), semicolon (;), or tab. Auto-detected if not specified.')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Build activities in N worker processes (0 = one per CPU core, default: 1)')
+    parser.add_argument('--compact', action='store_true',
+                       help='Write grade files without indentation or spaces (for deployment builds)')
+    parser.add_argument('--sharded', action='store_true',
+                       help='Also write a summary per grade and a content-hashed detail file per activity '
+                            '(to the shards folder next to the output directory)')
+    parser.add_argument('--encoded', action='store_true',
+                       help='Store learning goal, location, tools and groupsize in a string table per grade file')
+    instrumentation.add_instrumentation_arguments(parser)
     
     args = parser.parse_args()
     
-    if not os.path.exists(args.csv_file):
-        print(f"Error: CSV file '{args.csv_file}' not found!")
-        return
+    for csv_file in args.csv_files:
+        if not os.path.exists(csv_file):
+            print(f"Error: CSV file '{csv_file}' not found!")
+            return
     
     # Convert delimiter argument
     delimiter = None
@@ -289,8 +447,13 @@ def main():
         else:
             delimiter = args.delimiter
     
-    print(f"Converting {args.csv_file} to grade-based JSON files...")
-    convert_csv_to_grade_json(args.csv_file, args.output_dir, args.force_grade, delimiter)
+    print(f"Converting {', '.join(args.csv_files)} to grade-based JSON files...")
+    instrumentation.run_instrumented(
+        "csv_to_grade_json", args,
+        convert_csv_files_to_grade_json,
+        args.csv_files, args.output_dir, args.force_grade, delimiter, resolve_jobs(args.jobs), args.compact,
+        default_shards_dir(args.output_dir) if args.sharded else None, args.encoded
+    )
 
 if __name__ == "__main__":
     main()
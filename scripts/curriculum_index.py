@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Curriculum index: stable learning goal IDs and goal matching for activities.
+
+public/MAT01-05.json (the Udir curriculum for mathematics 1-10) names one
+competence goal set per grade, e.g. KV20 "Kompetansemål og vurdering 2. trinn".
+The goals of each grade are listed, in order, in learning_goals_by_grade.json
+(bokmål). Together they give every goal a stable ID: the set code and the goal
+number, e.g. "KV20-03" for goal 3 of grade 2.
+
+The activity sheets write goals in nynorsk ("Ordne tal, mengder ... frå
+eigenskapar") while learning_goals_by_grade.json is in bokmål ("Ordne tall,
+mengder ... fra egenskaper"), so goals are matched on normalized tokens rather
+than exact text. Tokens are normalized as in the search index (lowercase,
+accents folded, stopwords dropped, common suffixes stripped), double
+consonants are collapsed ("tall"/"tal", "sammen"/"saman"), and each token is
+split into character trigrams. Trigrams of all goals of a grade are indexed
+once. A text is matched to the goal with the highest Dice overlap, if that is
+at least MIN_MATCH_SCORE.
+
+The converters write the matched ID into each activity as learning_goal_id.
+This script also writes the goal table for the frontend and adds or updates
+learning_goal_id in existing grade files.
+
+Run command in terminal: python3 scripts/curriculum_index.py
+                          python3 scripts/curriculum_index.py --no-grades    # only write the goal table
+
+Usage from other scripts:
+    from curriculum_index import match_learning_goal
+    match_learning_goal("Andre årstrinn", "Ordne tal, mengder og former ...")  # 'KV20-01'
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
+
+from build_search_index import tokenize
+from grade_detection import detect_grade_in_text
+from grade_encoding import decode_grade_data, encode_grade_data, is_encoded
+from json_writer import is_compact_json, write_json_atomic
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CURRICULUM_FILE = os.path.join(os.path.dirname(SCRIPTS_DIR), "public", "MAT01-05.json")
+LEARNING_GOALS_FILE = os.path.join(SCRIPTS_DIR, "learning_goals_by_grade.json")
+GOAL_TABLE_FILE = "public/activityData/curriculumGoals.json"
+GRADES_GLOB = "public/activityData/grades/*.json"
+
+# Lowest Dice overlap of trigram sets accepted as a match; unrelated goals score below 0.3
+MIN_MATCH_SCORE = 0.45
+DOUBLE_CONSONANT_PATTERN = re.compile(r'([bcdfghjklmnprstvz])\1')
+
+def goal_trigrams(text: str) -> Set[str]:
+    """Character trigrams of the normalized tokens of a goal text."""
+    trigrams = set()
+    for token in tokenize(text):
+        padded = " " + DOUBLE_CONSONANT_PATTERN.sub(r'\1', token) + " "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+def load_goal_sets(curriculum_path: str) -> Dict[str, Dict[str, str]]:
+    """Read the competence goal set of each grade from the curriculum: grade -> {code, title, uri}."""
+    with open(curriculum_path, 'r', encoding='utf-8') as f:
+        curriculum = json.load(f)
+    goal_sets = {}
+    for goal_set in curriculum["kompetansemaal-kapittel"]["kompetansemaalsett"]:
+        grade = detect_grade_in_text(goal_set.get("tittel", ""))
+        if grade:
+            goal_sets[grade] = {"code": goal_set["kode"], "title": goal_set["tittel"], "uri": goal_set.get("uri", "")}
+    return goal_sets
+
+class CurriculumIndex:
+    """Goal table per grade and a trigram index for matching goal texts to goal IDs."""
+
+    def __init__(self, goal_sets: Dict[str, Dict[str, str]], goals_by_grade: Dict[str, List[str]]):
+        self.curriculum = ""
+        self.grades: Dict[str, Dict[str, Any]] = {}
+        # grade -> trigram -> goal positions
+        self._postings: Dict[str, Dict[str, List[int]]] = {}
+        self._sizes: Dict[str, List[int]] = {}
+
+        for grade, goals in goals_by_grade.items():
+            goal_set = goal_sets.get(grade)
+            if goal_set is None:
+                continue
+            self.grades[grade] = {
+                **goal_set,
+                "goals": [{"id": f"{goal_set['code']}-{number:02d}", "number": number, "text": text}
+                          for number, text in enumerate(goals, 1)],
+            }
+            postings: Dict[str, List[int]] = {}
+            sizes = []
+            for position, text in enumerate(goals):
+                trigrams = goal_trigrams(text)
+                sizes.append(len(trigrams))
+                for trigram in trigrams:
+                    postings.setdefault(trigram, []).append(position)
+            self._postings[grade] = postings
+            self._sizes[grade] = sizes
+
+    @classmethod
+    def from_files(cls, curriculum_path: str = CURRICULUM_FILE,
+                   goals_path: str = LEARNING_GOALS_FILE) -> "CurriculumIndex":
+        with open(goals_path, 'r', encoding='utf-8') as f:
+            goals_by_grade = json.load(f)
+        index = cls(load_goal_sets(curriculum_path), goals_by_grade)
+        index.curriculum = os.path.splitext(os.path.basename(curriculum_path))[0]
+        return index
+
+    def match(self, grade: str, text: str) -> Optional[str]:
+        """Return the ID of the goal of this grade that the text names, or None."""
+        postings = self._postings.get(grade)
+        if not postings or not text:
+            return None
+        trigrams = goal_trigrams(text)
+        shared = Counter(position for trigram in trigrams for position in postings.get(trigram, ()))
+        if not shared:
+            return None
+        sizes = self._sizes[grade]
+        position, score = max(((position, 2 * count / (len(trigrams) + sizes[position]))
+                               for position, count in shared.items()), key=lambda item: item[1])
+        if score < MIN_MATCH_SCORE:
+            return None
+        return self.grades[grade]["goals"][position]["id"]
+
+    def goal_table(self) -> Dict[str, Any]:
+        return {"version": 1, "curriculum": self.curriculum, "grades": self.grades}
+
+@lru_cache(maxsize=1)
+def get_curriculum_index() -> CurriculumIndex:
+    """The index built from the default files, loaded once per process."""
+    return CurriculumIndex.from_files()
+
+@lru_cache(maxsize=1024)
+def match_learning_goal(grade: str, text: str) -> Optional[str]:
+    """Return the goal ID for a learning goal text of a grade, or None. Cached, as goals repeat."""
+    return get_curriculum_index().match(grade, text)
+
+def with_learning_goal_id(activity: Dict[str, Any], goal_id: Optional[str]) -> Dict[str, Any]:
+    """Return the activity with learning_goal_id set right after learning_goal (or removed)."""
+    updated = {}
+    for key, value in activity.items():
+        if key == "learning_goal_id":
+            continue
+        updated[key] = value
+        if key == "learning_goal" and goal_id:
+            updated["learning_goal_id"] = goal_id
+    return updated
+
+def annotate_grade_file(grade_file: str, index: CurriculumIndex) -> Dict[str, int]:
+    """Set learning_goal_id on every activity of a grade file; rewrite it only if something changed."""
+    with open(grade_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    data = json.loads(text)
+    # Keep the file's format: compact (--compact) and/or encoded (--encoded)
+    compact = is_compact_json(text)
+    encoded = is_encoded(data)
+    data = decode_grade_data(data)
+    stats = {"matched": 0, "unmatched": 0}
+    activities = []
+    for activity in data.get("activities", []):
+        goal_id = index.match(data.get("grade", ""), activity.get("learning_goal", ""))
+        stats["matched" if goal_id else "unmatched"] += 1
+        activities.append(with_learning_goal_id(activity, goal_id))
+    data["activities"] = activities
+    stats["written"] = int(write_json_atomic(grade_file, encode_grade_data(data) if encoded else data, compact))
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the curriculum goal table and add goal IDs to the grade files')
+    parser.add_argument('--curriculum', default=CURRICULUM_FILE, help=f'Curriculum JSON (default: {CURRICULUM_FILE})')
+    parser.add_argument('--learning-goals', default=LEARNING_GOALS_FILE,
+                       help=f'Learning goals per grade (default: {LEARNING_GOALS_FILE})')
+    parser.add_argument('--output', default=GOAL_TABLE_FILE, help=f'Goal table to write (default: {GOAL_TABLE_FILE})')
+    parser.add_argument('--grades-glob', default=GRADES_GLOB, help=f'Grade files to annotate (default: {GRADES_GLOB})')
+    parser.add_argument('--no-grades', action='store_true', help='Only write the goal table')
+    args = parser.parse_args()
+
+    index = CurriculumIndex.from_files(args.curriculum, args.learning_goals)
+    changed = write_json_atomic(args.output, index.goal_table())
+    goal_count = sum(len(grade["goals"]) for grade in index.grades.values())
+    print(f"{'✅ Wrote' if changed else '⏭️  Unchanged'} {args.output} ({goal_count} goals in {len(index.grades)} grades)")
+
+    if args.no_grades:
+        return
+    for grade_file in sorted(glob.glob(args.grades_glob)):
+        stats = annotate_grade_file(grade_file, index)
+        status = "✅ Updated" if stats["written"] else "⏭️  Unchanged"
+        print(f"{status} {grade_file}: {stats['matched']} activities matched"
+              + (f", ⚠️  {stats['unmatched']} without a matching goal" if stats["unmatched"] else ""))
+
+if __name__ == "__main__":
+    main()
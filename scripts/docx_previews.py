@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+HTML previews of the .docx printouts.
+
+A .docx file is a zip archive of XML parts, so the text, headings, lists,
+tables and embedded images are read with zipfile and ElementTree only (no
+LibreOffice or Word needed). For every public/printOuts/{name}.docx this writes
+
+    public/printOuts/previews/{name}.html        # lightweight, self-contained page
+    public/printOuts/previews/{name}/image1.png  # images embedded in the document
+
+Previews are rendered in a process pool and only when the .docx content hash
+changes (cached in previews/.previews_cache.json). Documents that cannot be
+read are skipped with a warning, Word lock files (~$name.docx) are ignored,
+and previews of removed documents are deleted. update_printouts.py adds the
+preview path to the activity's extra list right after the .docx path.
+
+Usage:
+    from docx_previews import build_docx_previews
+
+    previews = build_docx_previews("public/printOuts", jobs=4)
+    # {'printOuts/A0603.docx': 'printOuts/previews/A0603.html', ...}
+"""
+
+import html
+import json
+import os
+import posixpath
+import shutil
+import zipfile
+from typing import Dict, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+
+from json_writer import hash_file, write_json_atomic, write_text_atomic
+from parallel_ingest import ordered_map
+
+PREVIEWS_DIRNAME = "previews"
+CACHE_FILENAME = ".previews_cache.json"
+# Bump when the HTML output changes, so cached previews are rendered again
+RENDERER_VERSION = 1
+
+NAMESPACES = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "v": "urn:schemas-microsoft-com:vml",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+W = "{%s}" % NAMESPACES["w"]
+R = "{%s}" % NAMESPACES["r"]
+
+# Word keeps a hidden "~$name.docx" lock file next to a document while it is open
+LOCK_FILE_PREFIX = "~$"
+
+# Image types a browser can show; others (EMF/WMF) are left out of the preview
+WEB_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.bmp')
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="no">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ font-family: system-ui, sans-serif; max-width: 50rem; margin: 2rem auto; padding: 0 1rem; line-height: 1.5; color: #222; }}
+table {{ border-collapse: collapse; margin: 1rem 0; }}
+td {{ border: 1px solid #bbb; padding: 0.3rem 0.6rem; vertical-align: top; }}
+img {{ max-width: 100%; height: auto; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+def is_lock_file(filename: str) -> bool:
+    """Return True for the lock files Office writes next to open documents."""
+    return filename.startswith(LOCK_FILE_PREFIX)
+
+def _read_xml(archive: zipfile.ZipFile, name: str) -> Optional[ElementTree.Element]:
+    try:
+        return ElementTree.fromstring(archive.read(name))
+    except KeyError:
+        return None
+
+def read_relationships(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """Return relationship ID -> archive path for word/document.xml (images, links)."""
+    root = _read_xml(archive, "word/_rels/document.xml.rels")
+    if root is None:
+        return {}
+    targets = {}
+    for relationship in root.findall("rel:Relationship", NAMESPACES):
+        if relationship.get("TargetMode") == "External":
+            continue
+        targets[relationship.get("Id")] = posixpath.normpath(posixpath.join("word", relationship.get("Target", "")))
+    return targets
+
+def read_heading_styles(archive: zipfile.ZipFile) -> Dict[str, int]:
+    """Return style ID -> heading level, using the style names ("heading 1", "Title")."""
+    root = _read_xml(archive, "word/styles.xml")
+    levels = {}
+    if root is None:
+        return levels
+    for style in root.findall("w:style", NAMESPACES):
+        name_element = style.find("w:name", NAMESPACES)
+        name = (name_element.get(W + "val") if name_element is not None else "").lower()
+        if name == "title":
+            levels[style.get(W + "styleId")] = 1
+        elif name.startswith("heading ") and name[8:].isdigit():
+            levels[style.get(W + "styleId")] = min(int(name[8:]) + 1, 6)
+    return levels
+
+# Inline wrappers whose runs belong to the paragraph (links, tracked insertions)
+RUN_CONTAINERS = {W + "hyperlink", W + "ins", W + "smartTag"}
+
+def _paragraph_runs(paragraph: ElementTree.Element) -> List[ElementTree.Element]:
+    # Direct runs only: runs of text boxes nested inside a drawing are rendered with that drawing
+    runs = []
+    for child in paragraph:
+        if child.tag == W + "r":
+            runs.append(child)
+        elif child.tag in RUN_CONTAINERS:
+            runs.extend(child.findall("w:r", NAMESPACES))
+    return runs
+
+def _is_on(toggle: Optional[ElementTree.Element]) -> bool:
+    # <w:b/> switches bold on, <w:b w:val="0"/> switches it off
+    return toggle is not None and toggle.get(W + "val", "true") not in ("0", "false", "off")
+
+class DocxRenderer:
+    """Turns the body of word/document.xml into HTML, collecting the images it uses."""
+
+    def __init__(self, relationships: Dict[str, str], heading_styles: Dict[str, int]):
+        self.relationships = relationships
+        self.heading_styles = heading_styles
+        # Archive paths of the images referenced by the rendered HTML, in order
+        self.images: List[str] = []
+
+    def image_html(self, relationship_id: Optional[str], image_dir: str) -> str:
+        target = self.relationships.get(relationship_id or "")
+        if not target or not target.lower().endswith(WEB_IMAGE_EXTENSIONS):
+            return ""
+        if target not in self.images:
+            self.images.append(target)
+        src = f"{image_dir}/{posixpath.basename(target)}"
+        return f'<img src="{html.escape(src)}" alt="">'
+
+    def run_html(self, run: ElementTree.Element, image_dir: str) -> str:
+        parts = []
+        for child in run.iter():
+            if child.tag == W + "t":
+                parts.append(html.escape(child.text or ""))
+            elif child.tag == W + "tab":
+                parts.append(" ")
+            elif child.tag in (W + "br", W + "cr"):
+                parts.append("<br>")
+            elif child.tag == "{%s}blip" % NAMESPACES["a"]:
+                parts.append(self.image_html(child.get(R + "embed"), image_dir))
+            elif child.tag == "{%s}imagedata" % NAMESPACES["v"]:
+                parts.append(self.image_html(child.get(R + "id"), image_dir))
+        text = "".join(parts)
+        properties = run.find("w:rPr", NAMESPACES)
+        if text.strip() and properties is not None:
+            if _is_on(properties.find("w:b", NAMESPACES)):
+                text = f"<strong>{text}</strong>"
+            if _is_on(properties.find("w:i", NAMESPACES)):
+                text = f"<em>{text}</em>"
+        return text
+
+    def paragraph_html(self, paragraph: ElementTree.Element, image_dir: str) -> Tuple[str, bool]:
+        """Return the paragraph as HTML and whether it is a list item."""
+        content = "".join(self.run_html(run, image_dir) for run in _paragraph_runs(paragraph))
+        properties = paragraph.find("w:pPr", NAMESPACES)
+        is_list_item = properties is not None and properties.find("w:numPr", NAMESPACES) is not None
+        if not content.strip():
+            return "", False
+        if is_list_item:
+            return f"<li>{content}</li>", True
+        style = properties.find("w:pStyle", NAMESPACES) if properties is not None else None
+        level = self.heading_styles.get(style.get(W + "val")) if style is not None else None
+        if level:
+            return f"<h{level}>{content}</h{level}>", False
+        return f"<p>{content}</p>", False
+
+    def table_html(self, table: ElementTree.Element, image_dir: str) -> str:
+        rows = []
+        for row in table.findall("w:tr", NAMESPACES):
+            cells = []
+            for cell in row.findall("w:tc", NAMESPACES):
+                cells.append(f"<td>{self.blocks_html(cell, image_dir)}</td>")
+            rows.append(f"<tr>{''.join(cells)}</tr>")
+        return f"<table>{''.join(rows)}</table>"
+
+    def blocks_html(self, container: ElementTree.Element, image_dir: str) -> str:
+        """Render the paragraphs and tables of a body or table cell in document order."""
+        blocks = []
+        list_items: List[str] = []
+        for child in container:
+            if child.tag == W + "p":
+                block, is_list_item = self.paragraph_html(child, image_dir)
+                if is_list_item:
+                    list_items.append(block)
+                    continue
+            elif child.tag == W + "tbl":
+                block = self.table_html(child, image_dir)
+            else:
+                continue
+            if list_items:
+                blocks.append(f"<ul>{''.join(list_items)}</ul>")
+                list_items = []
+            if block:
+                blocks.append(block)
+        if list_items:
+            blocks.append(f"<ul>{''.join(list_items)}</ul>")
+        return "\n".join(blocks)
+
+def render_docx_preview(task: Tuple[str, str]) -> Dict[str, object]:
+    """
+    Render one .docx into {previews_dir}/{name}.html plus its images.
+    Takes (docx_path, previews_dir) and returns a summary, or {"error": ...}
+    if the file is not a readable .docx. Runs in worker processes.
+    """
+    docx_path, previews_dir = task
+    try:
+        return _render_docx_preview(docx_path, previews_dir)
+    except (zipfile.BadZipFile, ElementTree.ParseError) as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+def _render_docx_preview(docx_path: str, previews_dir: str) -> Dict[str, object]:
+    name = os.path.splitext(os.path.basename(docx_path))[0]
+    image_dir = os.path.join(previews_dir, name)
+
+    with zipfile.ZipFile(docx_path) as archive:
+        document = _read_xml(archive, "word/document.xml")
+        body = document.find("w:body", NAMESPACES) if document is not None else None
+        renderer = DocxRenderer(read_relationships(archive), read_heading_styles(archive))
+        body_html = renderer.blocks_html(body, name) if body is not None else ""
+
+        # Replace the image folder so images removed from the document disappear
+        shutil.rmtree(image_dir, ignore_errors=True)
+        if renderer.images:
+            os.makedirs(image_dir)
+            for image in renderer.images:
+                with open(os.path.join(image_dir, posixpath.basename(image)), 'wb') as f:
+                    f.write(archive.read(image))
+
+    page = PAGE_TEMPLATE.format(title=html.escape(name), body=body_html)
+    write_text_atomic(os.path.join(previews_dir, f"{name}.html"), page)
+    return {"images": len(renderer.images), "bytes": len(page.encode('utf-8'))}
+
+def load_previews_cache(cache_path: str) -> Dict[str, str]:
+    """Return file name -> content hash of the previews rendered by this renderer version."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != RENDERER_VERSION:
+        return {}
+    return cache.get("documents", {})
+
+def prune_previews(previews_dir: str, keep: Set[str], names: Optional[Set[str]] = None) -> int:
+    """
+    Delete the preview page and image folder of every document name not in
+    keep (only of those in names, if given). Returns the number deleted.
+    """
+    removed = 0
+    for entry in sorted(os.listdir(previews_dir)):
+        path = os.path.join(previews_dir, entry)
+        if entry.startswith('.'):
+            continue
+        if os.path.isdir(path):
+            name = entry
+        elif entry.endswith('.html'):
+            name = entry[:-len('.html')]
+        else:
+            continue
+        if name in keep or (names is not None and name not in names):
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+        removed += 1
+    return removed
+
+def build_docx_previews(printouts_dir: str = "public/printOuts", jobs: int = 1,
+                        filenames: Optional[Set[str]] = None) -> Dict[str, str]:
+    """
+    Render previews for all .docx printouts whose content changed and return
+    "printOuts/{name}.docx" -> "printOuts/previews/{name}.html" for every document.
+
+    With filenames, only those files are hashed (and rendered if changed);
+    the cache entries of all other documents are kept and returned as they are.
+    Documents that fail to render are left out of the result and the cache.
+    """
+    relative_dir = os.path.basename(os.path.abspath(printouts_dir))
+    previews_dir = os.path.join(printouts_dir, PREVIEWS_DIRNAME)
+    os.makedirs(previews_dir, exist_ok=True)
+    cache_path = os.path.join(previews_dir, CACHE_FILENAME)
+    cache = load_previews_cache(cache_path)
+
+    if filenames is None:
+        hashes: Dict[str, str] = {}
+        candidates = sorted(os.listdir(printouts_dir))
+    else:
+        hashes = {filename: digest for filename, digest in cache.items() if filename not in filenames}
+        candidates = sorted(filenames)
+    to_render: List[str] = []
+    for filename in candidates:
+        path = os.path.join(printouts_dir, filename)
+        if not filename.lower().endswith('.docx') or is_lock_file(filename) or not os.path.isfile(path):
+            continue
+        hashes[filename] = hash_file(path)
+        preview_path = os.path.join(previews_dir, f"{os.path.splitext(filename)[0]}.html")
+        if cache.get(filename) != hashes[filename] or not os.path.exists(preview_path):
+            to_render.append(filename)
+
+    if to_render:
+        print(f"📄 Rendering previews for {len(to_render)} document(s), {len(hashes) - len(to_render)} unchanged")
+    tasks = [(os.path.join(printouts_dir, filename), previews_dir) for filename in to_render]
+    for filename, result in zip(to_render, ordered_map(render_docx_preview, tasks, jobs)):
+        if "error" in result:
+            # Not cached, so the document is tried again once it is saved properly
+            print(f"   ⚠️  {filename}: skipped, not a readable .docx ({result['error']})")
+            del hashes[filename]
+            continue
+        print(f"   ✅ {filename}: {result['bytes'] / 1024:.0f} KB HTML, {result['images']} image(s)")
+
+    # Remove previews whose document was deleted, renamed or can no longer be read
+    keep = {os.path.splitext(filename)[0] for filename in hashes}
+    names = None if filenames is None else {os.path.splitext(filename)[0] for filename in filenames}
+    removed = prune_previews(previews_dir, keep, names)
+    if removed:
+        print(f"   🗑️  Removed {removed} outdated preview file(s)")
+
+    write_json_atomic(cache_path, {"version": RENDERER_VERSION, "documents": dict(sorted(hashes.items()))})
+    return {
+        f"{relative_dir}/{filename}": f"{relative_dir}/{PREVIEWS_DIRNAME}/{os.path.splitext(filename)[0]}.html"
+        for filename in sorted(hashes)
+    }
@@ -1,88 +1,107 @@
-import os
+"""
+Generate task files and activities.json entries from scripts/activity_input.json.
+
+For every input activity a task file with 9 tasks per learning goal is written
+to public/activityData/tasks/<id>.json (tasks for all of the activity's grades
+and goals, with the stable IDs from generateActivityTask, and the input's
+number_of_tasks as totalTasks), and the activity is added to
+or updated in activities.json, without learning_goals. Questions and answers
+already filled in are kept, and files whose content is unchanged are not
+rewritten.
+
+Run command in terminal: python3 scripts/generateActivitiesAuto.py
+                          python3 scripts/generateActivitiesAuto.py --input other_input.json --jobs 4
+
+Usage from other scripts:
+    from generateActivitiesAuto import generate_activities
+    generate_activities("scripts/activity_input.json")
+"""
+
+import argparse
 import json
+import os
+
+from generateActivityTask import save_task_files
+from json_writer import write_json_atomic
+from parallel_ingest import resolve_jobs
 
 # === KONFIGURASJON ===
 ACTIVITIES_FILE = "./public/activityData/activities.json"
 TASKS_FOLDER = "./public/activityData/tasks"
 INPUT_FILE = "scripts/activity_input.json"
-# Sørg for at mappen finnes
-os.makedirs(TASKS_FOLDER, exist_ok=True)
-
-# === Last inn input-aktiviteter fra JSON ===
-with open(INPUT_FILE, "r", encoding="utf-8") as file:
-    input_activities = json.load(file)
+# Fields copied from an input activity to activities.json
+ACTIVITY_FIELDS = ["id", "title", "description", "time", "image", "tools", "location", "grade", "number_of_tasks"]
 
+def load_json_list(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
 
-# === Genererer 3 oppgaver per nivå for et trinn og læringsmål ===
-def generate_tasks(activity_id, grade, goal):
-    tasks = {"easy": [], "medium": [], "hard": []}
-    for level in tasks:
-        for i in range(1, 4):
-            tasks[level].append({
-                "id": f"{activity_id}_{grade.lower().replace(' ', '_')}_{level}_{i}",
-                "difficulty": level,
-                "grade": grade,
-                "learningGoal": goal,
-                "question": "",
-                "answer": ""
-            })
-    return tasks
+def task_jobs(input_activities, tasks_folder):
+    """
+    Arguments for save_task_file, one per activity ID: all learning goals of
+    all grades the activity is listed under (an ID may appear once per grade).
+    totalTasks is the number_of_tasks of the first entry, like in activities.json.
+    """
+    jobs = {}
+    for activity in input_activities:
+        activity_id = activity["id"]
+        if activity_id not in jobs:
+            jobs[activity_id] = (os.path.join(tasks_folder, f"{activity_id}.json"), activity_id, activity["title"], {},
+                                 activity.get("number_of_tasks"))
+        goals = jobs[activity_id][3].setdefault(activity["grade"], [])
+        goals.extend(goal for goal in activity["learning_goals"] if goal not in goals)
+    return list(jobs.values())
 
-# === Last eksisterende aktiviteter ===
-if os.path.exists(ACTIVITIES_FILE):
-    with open(ACTIVITIES_FILE, "r", encoding="utf-8") as f:
-        existing_activities = json.load(f)
-else:
-    existing_activities = []
+def upsert_activities(existing_activities, input_activities):
+    """
+    Add new activities to existing_activities and update changed ones in place,
+    looking them up in an ID index. The first input entry of an ID is used.
+    Returns (added, updated) counts.
+    """
+    index = {activity["id"]: position for position, activity in enumerate(existing_activities)}
+    seen = set()
+    added = updated = 0
+    for activity in input_activities:
+        if activity["id"] in seen:
+            continue
+        seen.add(activity["id"])
+        entry = {field: activity[field] for field in ACTIVITY_FIELDS}
+        position = index.get(entry["id"])
+        if position is None:
+            index[entry["id"]] = len(existing_activities)
+            existing_activities.append(entry)
+            added += 1
+        elif existing_activities[position] != {**existing_activities[position], **entry}:
+            existing_activities[position].update(entry)
+            updated += 1
+    return added, updated
 
-# === Hovedløp ===
-for activity in input_activities:
-    activity_id = activity["id"]
-    title = activity["title"]
-    description = activity["description"]
-    time = activity["time"]
-    image = activity["image"]
-    tools = activity["tools"]
-    location = activity["location"]
-    grade = activity["grade"]
-    learning_goals = activity["learning_goals"]
-    num_tasks = activity["number_of_tasks"]
+def generate_activities(input_file=INPUT_FILE, activities_file=ACTIVITIES_FILE, tasks_folder=TASKS_FOLDER, jobs=1):
+    """Write task files for all input activities and upsert them into activities.json."""
+    input_activities = load_json_list(input_file)
+    os.makedirs(tasks_folder, exist_ok=True)
 
     # === Lag TASK JSON ===
-    grades_obj = {}
-    for goal in learning_goals:
-        grades_obj[grade] = generate_tasks(activity_id, grade, goal)
-
-    task_data = {
-        "activityId": activity_id,
-        "activityTitle": title,
-        "totalTasks": num_tasks,
-        "tasksPerGrade": 9,
-        "supportedGrades": [grade],
-        "grades": grades_obj
-    }
-
-    task_path = os.path.join(TASKS_FOLDER, f"{activity_id}.json")
-    with open(task_path, "w", encoding="utf-8") as f:
-        json.dump(task_data, f, indent=2, ensure_ascii=False)
-    print(f"✅ Lagret oppgaver til: {task_path}")
+    save_task_files(task_jobs(input_activities, tasks_folder), jobs)
 
-    # === Oppdater activities.json hvis aktivitet ikke finnes fra før ===
-    if not any(a["id"] == activity_id for a in existing_activities):
-        existing_activities.append({
-            "id": activity_id,
-            "title": title,
-            "description": description,
-            "time": time,
-            "image": image,
-            "tools": tools,
-            "location": location,
-            "grade": grade,
-            "number_of_tasks": num_tasks
-        })
+    # === Oppdater activities.json ===
+    existing_activities = load_json_list(activities_file)
+    added, updated = upsert_activities(existing_activities, input_activities)
+    if write_json_atomic(activities_file, existing_activities):
+        print(f"📝 Oppdatert activities.json uten learning_goals ({added} nye, {updated} endret)")
+    else:
+        print("⏭️  activities.json er uendret")
 
-# === Lagre activities.json ===
-with open(ACTIVITIES_FILE, "w", encoding="utf-8") as f:
-    json.dump(existing_activities, f, indent=2, ensure_ascii=False)
+def main():
+    parser = argparse.ArgumentParser(description="Lag oppgavefiler og activities.json fra activity_input.json")
+    parser.add_argument("--input", default=INPUT_FILE, help=f"Input-aktiviteter (standard: {INPUT_FILE})")
+    parser.add_argument("--activities-file", default=ACTIVITIES_FILE, help=f"(standard: {ACTIVITIES_FILE})")
+    parser.add_argument("--tasks-folder", default=TASKS_FOLDER, help=f"(standard: {TASKS_FOLDER})")
+    parser.add_argument("--jobs", type=int, default=1, help="Antall prosesser (0 = én per CPU-kjerne, standard: 1)")
+    args = parser.parse_args()
+    generate_activities(args.input, args.activities_file, args.tasks_folder, resolve_jobs(args.jobs))
 
-print("📝 Oppdatert activities.json uten learning_goals")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
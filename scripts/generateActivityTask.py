@@ -1,19 +1,42 @@
+import argparse
+import glob
+import hashlib
 import os
 import json
 
+from grade_detection import goal_number_from_id
+from json_writer import write_json_atomic
+from parallel_ingest import ordered_map, resolve_jobs
+
 LEARNING_GOALS_PATH = os.path.join(os.path.dirname(__file__), "learning_goals_by_grade.json")
+OUTPUT_DIR = "public/activityData/tasks"
+GRADES_GLOB = "public/activityData/grades/*.json"
+LEVELS = ["easy", "medium", "hard"]
+TASKS_PER_LEVEL = 3
+# Hex characters of the sha256 digest kept in task IDs (48 bits)
+TASK_ID_DIGEST_LENGTH = 12
+# Filled-in task fields kept when a task file is regenerated
+PRESERVED_TASK_FIELDS = ["question", "answer"]
 
 def load_learning_goals():
     with open(LEARNING_GOALS_PATH, encoding="utf-8") as f:
         return json.load(f)
 
-def create_task_template(activity_id, title, grades_with_goals):
-    total_tasks = sum(len(goals) * 9 for goals in grades_with_goals.values())
+def task_id(activity_id, grade, goal, level, index):
+    # Derived from the content only, so the same task gets the same ID on every run
+    digest = hashlib.sha256(f"{grade}\n{goal}\n{level}\n{index}".encode("utf-8")).hexdigest()
+    return f"{activity_id}_{grade.lower().replace(' ', '_')}_{level}_{index}_{digest[:TASK_ID_DIGEST_LENGTH]}"
+
+def create_task_template(activity_id, title, grades_with_goals, total_tasks=None):
+    # totalTasks is the planned number of tasks when given (number_of_tasks in activity_input.json),
+    # otherwise the number of generated task slots
+    if total_tasks is None:
+        total_tasks = sum(len(goals) * len(LEVELS) * TASKS_PER_LEVEL for goals in grades_with_goals.values())
     data = {
         "activityId": activity_id,
         "activityTitle": title,
         "totalTasks": total_tasks,
-        "tasksPerGrade": 9,
+        "tasksPerGrade": len(LEVELS) * TASKS_PER_LEVEL,
         "supportedGrades": list(grades_with_goals.keys()),
         "grades": {}
     }
@@ -28,10 +51,10 @@ def create_task_template(activity_id, title, grades_with_goals):
             "hard": []
         }
         for goal in goals:
-            for level in ["easy", "medium", "hard"]:
-                for i in range(1, 4):
+            for level in LEVELS:
+                for i in range(1, TASKS_PER_LEVEL + 1):
                     task = {
-                        "id": f"{activity_id}_{grade.lower().replace(' ', '_')}_{level}_{i}_{abs(hash(goal))%10000}",
+                        "id": task_id(activity_id, grade, goal, level, i),
                         "difficulty": level,
                         "grade": grade,
                         "learningGoal": goal,
@@ -41,6 +64,152 @@ def create_task_template(activity_id, title, grades_with_goals):
                     data["grades"][grade_key][level].append(task)
     return data
 
+def iter_tasks(data):
+    for grade_data in data.get("grades", {}).values():
+        for level in LEVELS:
+            yield from grade_data.get(level, [])
+
+def legacy_task_keys(data):
+    """Map (grade, goal, level, number) -> task, for files written with the old per-run IDs."""
+    keys = {}
+    counts = {}
+    for task in iter_tasks(data):
+        position = (task.get("grade"), task.get("learningGoal"), task.get("difficulty"))
+        counts[position] = counts.get(position, 0) + 1
+        keys[position + (counts[position],)] = task
+    return keys
+
+def is_filled(task):
+    return any(task.get(field) for field in PRESERVED_TASK_FIELDS)
+
+def merge_existing_tasks(new_data, existing_data):
+    """
+    Copy filled-in questions, answers, tips and reflections from an existing task
+    file into a freshly generated one. Tasks are matched by ID, or by grade, goal,
+    level and number for files with the old IDs. Returns (kept, dropped): the number
+    of filled-in tasks carried over and the number that no longer have a place.
+    """
+    existing_by_id = {task.get("id"): task for task in iter_tasks(existing_data)}
+    existing_by_key = legacy_task_keys(existing_data)
+    matched = set()
+
+    for key, task in legacy_task_keys(new_data).items():
+        old_task = existing_by_id.get(task["id"]) or existing_by_key.get(key)
+        if old_task is None:
+            continue
+        matched.add(id(old_task))
+        for field in PRESERVED_TASK_FIELDS:
+            if old_task.get(field):
+                task[field] = old_task[field]
+
+    for grade, grade_data in new_data["grades"].items():
+        old_grade = existing_data.get("grades", {}).get(grade, {})
+        for field in ("tips", "reflection"):
+            if old_grade.get(field):
+                grade_data[field] = old_grade[field]
+
+    kept = sum(1 for task in iter_tasks(new_data) if is_filled(task))
+    dropped = sum(1 for task in iter_tasks(existing_data) if is_filled(task) and id(task) not in matched)
+    return kept, dropped
+
+def grades_with_goals_from_file(data):
+    """Read the grades and learning goals a task file was generated for, in file order."""
+    grades_with_goals = {}
+    for grade in data.get("supportedGrades", []):
+        goals = grades_with_goals.setdefault(grade, [])
+        grade_data = data.get("grades", {}).get(grade, {})
+        for level in LEVELS:
+            for task in grade_data.get(level, []):
+                if task.get("learningGoal") not in goals:
+                    goals.append(task.get("learningGoal"))
+    return grades_with_goals
+
+def save_task_file(task):
+    """
+    Write a task template for (output_path, activity_id, title, grades_with_goals,
+    total_tasks), keeping filled-in content if the file already exists. Runs in worker processes
+    in batch mode; returns what happened instead of printing.
+    """
+    output_path, activity_id, title, grades_with_goals, total_tasks = task
+    output_data = create_task_template(activity_id, title, grades_with_goals, total_tasks)
+    kept = dropped = 0
+    existed = os.path.exists(output_path)
+    if existed:
+        with open(output_path, "r", encoding="utf-8") as f:
+            kept, dropped = merge_existing_tasks(output_data, json.load(f))
+    changed = write_json_atomic(output_path, output_data)
+    return {"path": output_path, "existed": existed, "changed": changed, "kept": kept, "dropped": dropped}
+
+def report_saved(result):
+    status = "⏭️  Uendret" if not result["changed"] else "✅ Oppdatert" if result["existed"] else "✅ Laget"
+    details = f" (beholdt {result['kept']} utfylte oppgaver)" if result["kept"] else ""
+    print(f"{status}: {result['path']}{details}")
+    if result["dropped"]:
+        print(f"⚠️  {result['dropped']} utfylte oppgaver hører til trinn/læringsmål som ikke lenger er valgt og ble fjernet")
+
+def save_task_files(tasks, jobs):
+    """Save many task files in a worker pool and print a summary."""
+    results = list(ordered_map(save_task_file, tasks, min(jobs, max(len(tasks), 1))))
+    for result in results:
+        if result["changed"] or result["dropped"]:
+            report_saved(result)
+    changed = sum(1 for result in results if result["changed"])
+    print(f"\n✅ {len(results)} oppgavefiler: {changed} skrevet, {len(results) - changed} uendret")
+    return results
+
+def regenerate(paths, jobs=1):
+    """Rebuild existing task files with stable IDs, keeping their questions and answers."""
+    tasks = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        tasks.append((path, data["activityId"], data.get("activityTitle", ""), grades_with_goals_from_file(data),
+                      data.get("totalTasks")))
+    return save_task_files(tasks, jobs)
+
+def load_manifest(path):
+    """
+    Read a batch manifest: a JSON list of
+    {"activityId": ..., "activityTitle": ..., "grades": {"Andre årstrinn": [goal, ...]}},
+    with an optional "totalTasks".
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    for entry in entries:
+        if not entry.get("activityId") or not isinstance(entry.get("grades"), dict):
+            raise ValueError(f"Manifest entry needs activityId and grades: {entry}")
+    return entries
+
+def manifest_from_grades(grade_files, learning_goals_by_grade):
+    """
+    Build a manifest from the grade files: one entry per activity, with the
+    learning goal its ID points to (A0301 -> goal 3 of the grade) as the
+    goal text from learning_goals_by_grade.json.
+    """
+    entries = []
+    for grade_file in grade_files:
+        with open(grade_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        goals = learning_goals_by_grade.get(data.get("grade"), [])
+        for activity in data.get("activities", []):
+            goal_number = goal_number_from_id(activity["id"])
+            if goal_number is None or goal_number > len(goals):
+                print(f"⚠️  Hopper over {activity['id']}: fant ikke læringsmålet i {LEARNING_GOALS_PATH}")
+                continue
+            entries.append({
+                "activityId": activity["id"],
+                "activityTitle": activity.get("title", ""),
+                "grades": {data["grade"]: [goals[goal_number - 1]]},
+            })
+    return entries
+
+def batch(entries, output_dir, jobs):
+    """Generate task files for all manifest entries without prompts."""
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(os.path.join(output_dir, f"{entry['activityId']}.json"), entry["activityId"],
+              entry.get("activityTitle", ""), entry["grades"], entry.get("totalTasks")) for entry in entries]
+    return save_task_files(tasks, jobs)
+
 def prompt_select_from_list(options, prompt_text):
     print(prompt_text)
     for idx, opt in enumerate(options, 1):
@@ -58,6 +227,26 @@ def prompt_select_from_list(options, prompt_text):
     return selected
 
 def main():
+    parser = argparse.ArgumentParser(description="Lag oppgavemal for en aktivitet")
+    parser.add_argument("--regenerate", nargs="+", metavar="FILE",
+                        help="Generer eksisterende oppgavefiler på nytt med stabile ID-er og behold utfylte oppgaver")
+    parser.add_argument("--manifest", help="Lag oppgavefiler for alle aktiviteter i en manifest-fil (JSON), uten spørsmål")
+    parser.add_argument("--from-grades", action="store_true",
+                        help=f"Lag oppgavefiler for alle aktiviteter i {GRADES_GLOB}, uten spørsmål")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help=f"Mappe for oppgavefiler (standard: {OUTPUT_DIR})")
+    parser.add_argument("--jobs", type=int, default=1, help="Antall prosesser (0 = én per CPU-kjerne, standard: 1)")
+    args = parser.parse_args()
+    jobs = resolve_jobs(args.jobs)
+    if args.regenerate:
+        regenerate(args.regenerate, jobs)
+        return
+    if args.manifest:
+        batch(load_manifest(args.manifest), args.output_dir, jobs)
+        return
+    if args.from_grades:
+        batch(manifest_from_grades(sorted(glob.glob(GRADES_GLOB)), load_learning_goals()), args.output_dir, jobs)
+        return
+
     learning_goals_by_grade = load_learning_goals()
 
     activity_id = input("Aktivitets-ID (f.eks. lærKlokka): ").strip()
@@ -90,16 +279,17 @@ def main():
         print("Ingen trinn med læringsmål valgt. Avslutter.")
         return
 
-    output_dir = "public/activityData/tasks"
+    output_dir = OUTPUT_DIR
     if not os.path.exists(output_dir):
         print(f"❌ Mappen '{output_dir}' finnes ikke. Lag den først og prøv igjen.")
         return
 
-    output_data = create_task_template(activity_id, title, grades_with_goals)
     output_path = os.path.join(output_dir, f"{activity_id}.json")
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    result = save_task_file((output_path, activity_id, title, grades_with_goals, None))
+    if result["kept"]:
+        print(f"♻️  Beholdt {result['kept']} utfylte oppgaver fra eksisterende fil")
+    if result["dropped"]:
+        print(f"⚠️  {result['dropped']} utfylte oppgaver hører til trinn/læringsmål som ikke lenger er valgt og ble fjernet")
 
     print(f"\n✅ Fil lagret: {output_path}")
 
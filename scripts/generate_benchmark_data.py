@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic activity sheets for benchmarking the build scripts.
+
+Writes leker-Json-{2..7}.trinn.tsv files with the same columns as the real
+sheets (ID, Learning goal, Title, Time, Location, Tools, Groupsize,
+Introduction, Main, Examples, Reflection, Tips, Extra). Rows are built from
+the real sheets in scripts/, so text lengths, list formats and repeated
+learning goals look like real data; titles and introductions get a unique
+suffix so caches do not see every row as a repeat.
+
+Output is deterministic for a given --rows and --seed.
+
+Run command in terminal: python3 scripts/generate_benchmark_data.py --rows 10000 --output-dir /tmp/bench-sheets
+"""
+
+import argparse
+import csv
+import glob
+import os
+import random
+from typing import Dict, List
+
+from grade_detection import GRADE_BY_ID_PREFIX
+from update_activities_from_csv import read_csv_rows
+
+SHEET_COLUMNS = ["ID", "Learning goal", "Title", "Time", "Location", "Tools", "Groupsize",
+                 "Introduction", "Main", "Examples", "Reflection", "Tips", "Extra"]
+TEMPLATE_PATTERN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "leker-Json-*.trinn.tsv")
+# Activity ID prefix per grade number (2 -> "A" ... 7 -> "F")
+ID_PREFIX_BY_GRADE = {grade: prefix for prefix, grade in GRADE_BY_ID_PREFIX.items()}
+
+def load_templates(pattern: str = TEMPLATE_PATTERN) -> List[Dict[str, str]]:
+    """Load the rows of the real sheets to build synthetic rows from."""
+    templates = []
+    for sheet in sorted(glob.glob(pattern)):
+        templates.extend(row for row in read_csv_rows(sheet) if row.get('ID') and row.get('Title'))
+    if not templates:
+        raise FileNotFoundError(f"No template sheets found matching {pattern}")
+    return templates
+
+def generate_grade_rows(grade: int, count: int, templates: List[Dict[str, str]],
+                        rng: random.Random) -> List[Dict[str, str]]:
+    """Build `count` rows for one grade, grouped under repeated learning goals."""
+    goals = sorted({row.get('Learning goal', '') for row in templates})
+    goals_per_grade = min(len(goals), 12)
+    grade_goals = rng.sample(goals, goals_per_grade)
+    per_goal = -(-count // goals_per_grade)
+    # IDs keep the AXXYY shape while they fit, and get a wider index beyond 99 rows per goal
+    index_width = max(2, len(str(per_goal)))
+    prefix = ID_PREFIX_BY_GRADE[grade]
+
+    rows = []
+    for number in range(count):
+        goal_number, index = divmod(number, per_goal)
+        template = rng.choice(templates)
+        row = {column: template.get(column, '') for column in SHEET_COLUMNS}
+        row['ID'] = f"{prefix}{goal_number + 1:02d}{index + 1:0{index_width}d}"
+        row['Learning goal'] = grade_goals[goal_number]
+        row['Title'] = f"{template['Title']} {number + 1}"
+        row['Introduction'] = f"{template.get('Introduction', '')} (variant {number + 1})".strip()
+        rows.append(row)
+    return rows
+
+def write_grade_sheets(output_dir: str, total_rows: int, seed: int = 0) -> List[str]:
+    """Write total_rows activities spread evenly over the six grade sheets. Returns the sheet paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    templates = load_templates()
+    rng = random.Random(seed)
+    grades = sorted(ID_PREFIX_BY_GRADE)
+    paths = []
+
+    for position, grade in enumerate(grades):
+        count = total_rows // len(grades) + (1 if position < total_rows % len(grades) else 0)
+        path = os.path.join(output_dir, f"leker-Json-{grade}.trinn.tsv")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SHEET_COLUMNS, delimiter='\t')
+            writer.writeheader()
+            writer.writerows(generate_grade_rows(grade, count, templates, rng))
+        paths.append(path)
+
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic activity sheets for benchmarks')
+    parser.add_argument('--rows', type=int, default=1000, help='Total number of activities (default: 1000)')
+    parser.add_argument('--output-dir', required=True, help='Directory to write the .tsv sheets to')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    paths = write_grade_sheets(args.output_dir, args.rows, args.seed)
+    size = sum(os.path.getsize(path) for path in paths)
+    print(f"✅ Wrote {args.rows} activities to {len(paths)} sheets in {args.output_dir} ({size / 1024 / 1024:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,19 @@ and provides utilities for common operations.
 
 import json
 import os
-from typing import Dict, List, Any
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, FrozenSet, Iterator, List, Any, Optional, Union
+
+from grade_encoding import decode_grade_data, intern_repeated_fields
+
+MINUTES_PATTERN = re.compile(r'\d+')
 
 def load_grade_activities(grade_dir: str = "./public/activityData/grades") -> Dict[str, Any]:
-    """Load all grade-based activity files"""
+    """
+    Load all grade-based activity files (plain or encoded). Repeated values of
+    learning_goal, location, tools and groupsize share one string object.
+    """
     grades = {}
     
     if not os.path.exists(grade_dir):
@@ -22,42 +31,192 @@ def load_grade_activities(grade_dir: str = "./public/activityData/grades") -> Di
         if filename.endswith('.json'):
             grade_file = os.path.join(grade_dir, filename)
             with open(grade_file, 'r', encoding='utf-8') as f:
-                grade_data = json.load(f)
+                grade_data = intern_repeated_fields(decode_grade_data(json.load(f)))
                 grades[grade_data['grade']] = grade_data
     
     return grades
 
-def get_activities_by_learning_goal(grades: Dict[str, Any], learning_goal_keyword: str) -> List[Dict]:
-    """Find activities that match a learning goal keyword"""
-    matching_activities = []
+def parse_minutes(time_str: str) -> Optional[int]:
+    """
+    Return the duration in minutes from a time string ("45 minutter" -> 45).
+    For alternatives such as "5,15" the longest duration is used, so time
+    filters never include an activity that may not fit. None if there is no number.
+    """
+    numbers = MINUTES_PATTERN.findall(time_str or '')
+    if not numbers:
+        return None
+    return max(int(number) for number in numbers)
+
+def normalize_location(location: str) -> str:
+    """Normalize a location for lookups ("Inne / ute" and "inne/ute" are the same)."""
+    return ''.join(location.lower().split())
+
+class ActivityRecord:
+    """One activity in an ActivityCatalog. Shares its data with the loaded grade file."""
+    __slots__ = ('position', 'id', 'title', 'grade', 'time', 'minutes', 'location',
+                 'tools', 'groupsize', 'learning_goal', 'data')
     
-    for grade_name, grade_data in grades.items():
-        for activity in grade_data['activities']:
-            if learning_goal_keyword.lower() in activity['learning_goal'].lower():
-                activity_with_grade = activity.copy()
-                activity_with_grade['grade'] = grade_name
-                matching_activities.append(activity_with_grade)
+    def __init__(self, position: int, grade: str, data: Dict[str, Any]):
+        self.position = position
+        self.id = data.get('id', '')
+        self.title = data.get('title', '')
+        self.grade = grade
+        self.time = data.get('time', '')
+        self.minutes = parse_minutes(self.time)
+        self.location = data.get('location', '')
+        self.tools = data.get('tools', '')
+        self.groupsize = data.get('groupsize', '')
+        self.learning_goal = data.get('learning_goal', '')
+        self.data = data
+    
+    @property
+    def content(self) -> Dict[str, Any]:
+        return self.data.get('content', {})
     
-    return matching_activities
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a copy of the activity with its grade added (the old helper format)."""
+        activity = self.data.copy()
+        activity['grade'] = self.grade
+        return activity
+    
+    def __repr__(self) -> str:
+        return f"ActivityRecord({self.id!r}, {self.title!r}, {self.grade!r})"
 
-def get_activities_by_time(grades: Dict[str, Any], max_minutes: int) -> List[Dict]:
-    """Find activities that fit within a time limit"""
-    matching_activities = []
+class ActivityCatalog:
+    """
+    In-memory catalog of all activities, loaded once and indexed for queries.
     
-    for grade_name, grade_data in grades.items():
-        for activity in grade_data['activities']:
-            time_str = activity['time'].lower()
-            # Extract minutes from time string (e.g., "45 minutter" -> 45)
-            try:
-                minutes = int(''.join(filter(str.isdigit, time_str)))
-                if minutes <= max_minutes:
-                    activity_with_grade = activity.copy()
-                    activity_with_grade['grade'] = grade_name
-                    matching_activities.append(activity_with_grade)
-            except ValueError:
-                continue
-    
-    return matching_activities
+    Indexes: by ID, grade, learning goal and (normalized) location, plus a
+    sorted array of minutes for time range queries. Queries return
+    ActivityView objects that can be narrowed further without copying data:
+    
+        catalog = ActivityCatalog.from_directory()
+        short = catalog.query().grade("Andre årstrinn").max_minutes(15)
+        for activity in short.learning_goal("tal"):
+            print(activity.id, activity.title)
+    """
+    
+    def __init__(self, grades: Dict[str, Any]):
+        self.records: List[ActivityRecord] = []
+        self.by_id: Dict[str, ActivityRecord] = {}
+        self.by_grade: Dict[str, List[int]] = {}
+        self.by_learning_goal: Dict[str, List[int]] = {}
+        self.by_location: Dict[str, List[int]] = {}
+        
+        for grade_name, grade_data in grades.items():
+            for activity in grade_data.get('activities', []):
+                record = ActivityRecord(len(self.records), grade_name, activity)
+                self.records.append(record)
+                self.by_id.setdefault(record.id, record)
+                self.by_grade.setdefault(grade_name, []).append(record.position)
+                self.by_learning_goal.setdefault(record.learning_goal, []).append(record.position)
+                self.by_location.setdefault(normalize_location(record.location), []).append(record.position)
+        
+        # Activities with a known duration, sorted by minutes for bisect range queries
+        timed = sorted((r.minutes, r.position) for r in self.records if r.minutes is not None)
+        self.sorted_minutes = [minutes for minutes, _ in timed]
+        self.positions_by_minutes = [position for _, position in timed]
+        # Lowercased distinct learning goals, for keyword search
+        self.learning_goals_lower = {goal: goal.lower() for goal in self.by_learning_goal}
+    
+    @classmethod
+    def from_directory(cls, grade_dir: str = "./public/activityData/grades") -> 'ActivityCatalog':
+        """Load all grade files in a directory into a catalog."""
+        return cls(load_grade_activities(grade_dir))
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def get(self, activity_id: str) -> Optional[ActivityRecord]:
+        return self.by_id.get(activity_id)
+    
+    def query(self) -> 'ActivityView':
+        """Return a view of all activities, to be narrowed with filters."""
+        return ActivityView(self, None)
+
+class ActivityView:
+    """
+    A filtered selection of catalog activities.
+    
+    Holds only a set of record positions; every filter returns a new view and
+    leaves this one untouched, so filters can be chained and reused.
+    Iterating yields ActivityRecord objects in catalog order.
+    """
+    __slots__ = ('catalog', 'positions')
+    
+    def __init__(self, catalog: ActivityCatalog, positions: Optional[FrozenSet[int]]):
+        self.catalog = catalog
+        # None means "all activities"
+        self.positions = positions
+    
+    def _narrow(self, positions) -> 'ActivityView':
+        positions = frozenset(positions)
+        if self.positions is not None:
+            positions &= self.positions
+        return ActivityView(self.catalog, positions)
+    
+    def grade(self, *grade_names: str) -> 'ActivityView':
+        """Keep activities in any of the given grades."""
+        return self._narrow(p for name in grade_names for p in self.catalog.by_grade.get(name, []))
+    
+    def learning_goal(self, keyword: str) -> 'ActivityView':
+        """Keep activities whose learning goal contains the keyword (case-insensitive)."""
+        keyword = keyword.lower()
+        goals = [goal for goal, lower in self.catalog.learning_goals_lower.items() if keyword in lower]
+        return self._narrow(p for goal in goals for p in self.catalog.by_learning_goal[goal])
+    
+    def location(self, location: str) -> 'ActivityView':
+        """Keep activities at the given location ("Inne / ute", "Ute", ...)."""
+        return self._narrow(self.catalog.by_location.get(normalize_location(location), []))
+    
+    def minutes_between(self, min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> 'ActivityView':
+        """Keep activities whose duration lies in the inclusive range (unknown durations are dropped)."""
+        sorted_minutes = self.catalog.sorted_minutes
+        start = 0 if min_minutes is None else bisect_left(sorted_minutes, min_minutes)
+        end = len(sorted_minutes) if max_minutes is None else bisect_right(sorted_minutes, max_minutes)
+        return self._narrow(self.catalog.positions_by_minutes[start:end])
+    
+    def max_minutes(self, max_minutes: int) -> 'ActivityView':
+        """Keep activities that fit within a time limit."""
+        return self.minutes_between(None, max_minutes)
+    
+    def ids(self) -> List[str]:
+        return [record.id for record in self]
+    
+    def __iter__(self) -> Iterator[ActivityRecord]:
+        records = self.catalog.records
+        if self.positions is None:
+            return iter(records)
+        return (records[p] for p in sorted(self.positions))
+    
+    def __len__(self) -> int:
+        return len(self.catalog.records) if self.positions is None else len(self.positions)
+
+# The grades object the last catalog was built from, and that catalog
+_catalog_cache: Optional[tuple] = None
+
+def get_catalog(grades: Union[Dict[str, Any], ActivityCatalog]) -> ActivityCatalog:
+    """
+    Return the catalog for loaded grade data, building it only once per grades
+    object (the last one is kept). A catalog passed in is returned as is.
+    The cache goes by object identity, so build a new catalog with
+    ActivityCatalog(grades) after changing the grade data in place.
+    """
+    global _catalog_cache
+    if isinstance(grades, ActivityCatalog):
+        return grades
+    if _catalog_cache is None or _catalog_cache[0] is not grades:
+        _catalog_cache = (grades, ActivityCatalog(grades))
+    return _catalog_cache[1]
+
+def get_activities_by_learning_goal(grades: Union[Dict[str, Any], ActivityCatalog],
+                                    learning_goal_keyword: str) -> List[Dict]:
+    """Find activities that match a learning goal keyword"""
+    return [record.to_dict() for record in get_catalog(grades).query().learning_goal(learning_goal_keyword)]
+
+def get_activities_by_time(grades: Union[Dict[str, Any], ActivityCatalog], max_minutes: int) -> List[Dict]:
+    """Find activities that fit within a time limit"""
+    return [record.to_dict() for record in get_catalog(grades).query().max_minutes(max_minutes)]
 
 def export_to_old_format(grades: Dict[str, Any], output_file: str = "activities_old_format.json"):
     """Convert new format back to old format for compatibility"""
@@ -107,6 +266,13 @@ def main():
     for activity in short_activities:
         print(f"- {activity['title']} ({activity['time']}, {activity['grade']})")
     
+    print("\\n" + "="*50)
+    print("EXAMPLE: Combining filters with the activity catalog")
+    catalog = get_catalog(grades)
+    outdoor_short = catalog.query().location("Ute").minutes_between(10, 30)
+    for record in outdoor_short:
+        print(f"- {record.title} ({record.time}, {record.grade})")
+    
     print("\\n" + "="*50)
     print("EXAMPLE: Exporting to old format for compatibility")
     export_to_old_format(grades, "test_old_format.json")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Grade detection shared by the CSV converters.
+
+Grades are recognised from explicit grade markers only, such as "2. trinn",
+"år 3", "trinn 4", "femte årstrinn" or "6. klasse". A digit or a word like
+"andre" ("other") on its own is not enough, so learning goals such as
+"Ordne tal 1-10 ... på andre måtar" are not mistaken for a grade.
+
+All markers are matched by one compiled pattern, and results are cached per
+text because the same learning goals repeat across all rows of a grade.
+
+Usage:
+    from grade_detection import detect_grade_in_text, grade_from_activity_id
+
+    detect_grade_in_text("Kompetansemål etter 4. trinn")  # 'Fjerde årstrinn'
+    grade_from_activity_id("C0201")                       # 'Fjerde årstrinn'
+    goal_number_from_id("C0201")                          # 2
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+import instrumentation
+
+GRADE_NAMES = {
+    2: "Andre årstrinn",
+    3: "Tredje årstrinn",
+    4: "Fjerde årstrinn",
+    5: "Femte årstrinn",
+    6: "Sjette årstrinn",
+    7: "Syvende årstrinn",
+}
+
+# Ordinal words (bokmål and nynorsk) that name a grade when followed by trinn/klasse
+GRADE_WORDS = {
+    "andre": 2,
+    "tredje": 3,
+    "fjerde": 4,
+    "femte": 5,
+    "sjette": 6,
+    "syvende": 7,
+    "sjuende": 7,
+    "sjuande": 7,
+}
+
+# Activity ID prefixes used in the activity sheets (A0101 is grade 2, F0101 grade 7)
+GRADE_BY_ID_PREFIX = {
+    "A": 2,
+    "B": 3,
+    "C": 4,
+    "D": 5,
+    "E": 6,
+    "F": 7,
+}
+
+# Learning goals 10-13 are written as a letter after the grade prefix ("BA01" is goal 10)
+GOAL_NUMBER_LETTERS = {"A": 10, "B": 11, "C": 12, "D": 13}
+
+_LEVEL = r'(?:års)?(?:trinn|klasse)'
+GRADE_MARKER_PATTERN = re.compile(
+    r'\b(?:'
+    rf'(?P<word>{"|".join(GRADE_WORDS)})\s+{_LEVEL}'   # "femte årstrinn", "andre klasse"
+    rf'|(?P<before>[2-7])\s*\.?\s*{_LEVEL}'            # "2. trinn", "3.trinn", "4 klasse"
+    rf'|(?:år|{_LEVEL})\s*(?P<after>[2-7])(?!\d)'      # "år 2", "trinn 5", "klasse 6"
+    r')',
+    re.IGNORECASE,
+)
+
+GRADE_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=GRADE_CACHE_SIZE)
+def detect_grade_in_text(text: str) -> Optional[str]:
+    """Return the grade named by the first grade marker in the text, or None."""
+    if not text:
+        return None
+    instrumentation.count("regex_calls")
+    match = GRADE_MARKER_PATTERN.search(text)
+    if match is None:
+        return None
+    if match.group('word'):
+        return GRADE_NAMES[GRADE_WORDS[match.group('word').lower()]]
+    return GRADE_NAMES[int(match.group('before') or match.group('after'))]
+
+def grade_from_activity_id(activity_id: str) -> Optional[str]:
+    """Return the grade encoded in an activity ID such as "A0101", or None."""
+    if len(activity_id) >= 5 and activity_id[0] in GRADE_BY_ID_PREFIX:
+        return GRADE_NAMES[GRADE_BY_ID_PREFIX[activity_id[0]]]
+    return None
+
+def goal_number_from_id(activity_id: str) -> Optional[int]:
+    """Return the learning goal number encoded in an activity ID (as GetActivity.tsx reads it), or None."""
+    if len(activity_id) < 4 or activity_id[0] not in GRADE_BY_ID_PREFIX:
+        return None
+    if activity_id[1] in GOAL_NUMBER_LETTERS:
+        return GOAL_NUMBER_LETTERS[activity_id[1]]
+    digits = activity_id[1:3]
+    if digits.isdigit() and 1 <= int(digits) <= 15:
+        return int(digits)
+    return None
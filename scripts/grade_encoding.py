@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Dictionary-encoded grade files.
+
+The same learning goal sentence is repeated in every activity of a goal, and
+values like "Inne / ute" and "Ingen" repeat across almost all activities. In
+the encoded format (--encoded in the converters) these fields are stored once
+per file in a string table, and activities reference them by index:
+
+{
+  "grade": "Andre årstrinn",
+  "total_activities": 48,
+  "encoding": "string-table/1",
+  "strings": ["Inne / ute", "Ingen", "3-5", "Ordne tal, mengder ...", ...],
+  "activities": [
+    {"id": "A0101", "title": "...", "time": "15", "location": 0, "tools": 1,
+     "groupsize": 2, "learning_goal": 3, "content": {...}}
+  ]
+}
+
+decode_grade_data() turns either format into the plain GradeData format
+(src/utils/decodeGradeData.ts does the same in the app). Decoded activities
+share one string object per table entry, and intern_repeated_fields() does
+the same for plain files, so repeated values are held in memory once.
+
+Usage:
+    from grade_encoding import decode_grade_data, encode_grade_data
+
+    encoded = encode_grade_data(grade_data)
+    assert decode_grade_data(encoded) == grade_data
+"""
+
+import sys
+from typing import Any, Dict, List
+
+ENCODING = "string-table/1"
+# Activity fields stored in the string table
+ENCODED_FIELDS = ["learning_goal", "location", "tools", "groupsize"]
+
+class StringTable:
+    """Assigns each distinct string an index, in order of first use."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+    def encode_activity(self, activity: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of the activity with the encoded fields replaced by table indices."""
+        return {key: self.add(value) if key in ENCODED_FIELDS and isinstance(value, str) else value
+                for key, value in activity.items()}
+
+def is_encoded(grade_data: Dict[str, Any]) -> bool:
+    return grade_data.get("encoding") == ENCODING
+
+def encode_grade_data(grade_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Encode a plain grade file."""
+    table = StringTable()
+    activities = [table.encode_activity(activity) for activity in grade_data["activities"]]
+    return {
+        "grade": grade_data["grade"],
+        "total_activities": grade_data.get("total_activities", len(activities)),
+        "encoding": ENCODING,
+        "strings": table.strings,
+        "activities": activities,
+    }
+
+def decode_grade_data(grade_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the plain grade data of an encoded file; plain files are returned unchanged."""
+    if not is_encoded(grade_data):
+        return grade_data
+    strings = grade_data["strings"]
+    activities = []
+    for activity in grade_data["activities"]:
+        activities.append({key: strings[value] if key in ENCODED_FIELDS and isinstance(value, int) else value
+                           for key, value in activity.items()})
+    return {"grade": grade_data["grade"], "total_activities": grade_data["total_activities"], "activities": activities}
+
+def intern_repeated_fields(grade_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Intern the encoded fields of a plain grade file in place, so repeated values share one object."""
+    for activity in grade_data.get("activities", []):
+        for field in ENCODED_FIELDS:
+            value = activity.get(field)
+            if isinstance(value, str):
+                activity[field] = sys.intern(value)
+    return grade_data
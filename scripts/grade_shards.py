@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Sharded grade output: a small summary per grade plus one detail file per activity.
+
+The grade pages and search only need the card fields of each activity, while
+GetActivity needs the full content of one. In sharded mode the converters
+write, next to the grades folder:
+
+    activityData/shards/2.summary.json          grade, hash and card fields per activity
+    activityData/shards/2/A0101.<hash>.json     the full activity (GradeActivity)
+
+Detail file names contain a hash of their content, so they never change once
+written and can be cached immutably; an edited activity gets a new file and
+its summary entry points to it. The summary carries a hash of its activity
+list for cache validation. Detail files no longer referenced by a summary are
+removed when the grade is written. With --sharded the converters also write
+the shards of grade files they did not change (refresh_grade_shards), so every
+grade has a summary.
+
+Usage:
+    from grade_shards import GradeShardWriter, default_shards_dir
+
+    writer = GradeShardWriter(default_shards_dir("public/activityData/grades"))
+    writer.add("2.grade.json", "Andre årstrinn", activity)
+    writer.close()
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List
+
+import instrumentation
+from grade_encoding import decode_grade_data
+from json_writer import serialize_json, write_json_atomic, write_text_atomic
+
+SHARDS_DIRNAME = "shards"
+# Fields of GradeActivity copied into the grade summary (what the cards show)
+SUMMARY_FIELDS = ["id", "title", "time", "location", "groupsize", "learning_goal", "learning_goal_id"]
+# Hex characters of the sha256 digest used in file names and summaries
+HASH_LENGTH = 12
+
+def default_shards_dir(grades_dir: str) -> str:
+    """activityData/grades -> activityData/shards"""
+    return os.path.join(os.path.dirname(os.path.normpath(grades_dir)), SHARDS_DIRNAME)
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+def shard_key(grade_filename: str) -> str:
+    """2.grade.json -> 2"""
+    return grade_filename.split('.')[0]
+
+def safe_filename(activity_id: str) -> str:
+    return re.sub(r'[^\w-]', '_', activity_id)
+
+class GradeShardWriter:
+    """
+    Write detail files as activities arrive and the grade summaries on close().
+
+    Detail files that already exist are not rewritten (the name is the content
+    hash). The public path of each detail file is relative to the folder above
+    the shards folder (public/), like the printout paths in content.extra.
+    """
+
+    def __init__(self, shards_dir: str, compact: bool = False):
+        self.shards_dir = shards_dir
+        self.compact = compact
+        self.public_prefix = os.path.basename(os.path.dirname(os.path.normpath(shards_dir)))
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.detail_files: Dict[str, set] = {}
+
+    def add_grade(self, grade_filename: str, grade: str) -> str:
+        """Start the summary of a grade (also for a grade without activities). Returns its shard key."""
+        key = shard_key(grade_filename)
+        if key not in self.summaries:
+            self.summaries[key] = {"grade": grade, "activities": []}
+            self.detail_files[key] = set()
+            os.makedirs(os.path.join(self.shards_dir, key), exist_ok=True)
+        return key
+
+    def add(self, grade_filename: str, grade: str, activity: Dict[str, Any]) -> None:
+        key = self.add_grade(grade_filename, grade)
+
+        serialized = serialize_json(activity, self.compact)
+        digest = content_hash(serialized)
+        filename = f"{safe_filename(activity['id'])}.{digest}.json"
+        detail_path = os.path.join(self.shards_dir, key, filename)
+        if os.path.exists(detail_path):
+            instrumentation.count("shards_unchanged")
+        else:
+            write_text_atomic(detail_path, serialized)
+        self.detail_files[key].add(filename)
+
+        entry = {field: activity.get(field, "") for field in SUMMARY_FIELDS}
+        entry["hash"] = digest
+        entry["detail"] = f"{self.public_prefix}/{SHARDS_DIRNAME}/{key}/{filename}"
+        self.summaries[key]["activities"].append(entry)
+
+    def close(self) -> Dict[str, int]:
+        """Write the summaries, remove unreferenced detail files and return the activity count per grade."""
+        counts = {}
+        for key, summary in self.summaries.items():
+            activities: List[Dict[str, Any]] = summary["activities"]
+            write_json_atomic(os.path.join(self.shards_dir, f"{key}.summary.json"), {
+                "grade": summary["grade"],
+                "total_activities": len(activities),
+                "hash": content_hash(serialize_json(activities, compact=True)),
+                "activities": activities,
+            }, self.compact)
+
+            grade_dir = os.path.join(self.shards_dir, key)
+            for filename in os.listdir(grade_dir):
+                if filename.endswith('.json') and filename not in self.detail_files[key]:
+                    os.remove(os.path.join(grade_dir, filename))
+                    instrumentation.count("shards_removed")
+            counts[summary["grade"]] = len(activities)
+
+        print(f"🧩 Sharded output written to {self.shards_dir} ({sum(counts.values())} activities)")
+        self.summaries = {}
+        self.detail_files = {}
+        return counts
+
+def write_grade_shards(grade_data: Dict[str, Any], grade_filename: str, shards_dir: str,
+                       compact: bool = False) -> Dict[str, int]:
+    """Write the summary and detail files of one complete grade."""
+    writer = GradeShardWriter(shards_dir, compact)
+    writer.add_grade(grade_filename, grade_data["grade"])
+    for activity in grade_data["activities"]:
+        writer.add(grade_filename, grade_data["grade"], activity)
+    return writer.close()
+
+def refresh_grade_shards(grades_dir: str, shards_dir: str, compact: bool = False,
+                         written: Iterable[str] = ()) -> Dict[str, int]:
+    """
+    Write the shards of every grade file in grades_dir whose file name is not
+    in `written` (the grades already sharded in this run), so the shards
+    folder always covers all grades. Existing detail files are not rewritten.
+    """
+    written = set(written)
+    counts = {}
+    writer = GradeShardWriter(shards_dir, compact)
+    for grade_file in sorted(glob.glob(os.path.join(grades_dir, "*.json"))):
+        grade_filename = os.path.basename(grade_file)
+        if grade_filename in written:
+            continue
+        with open(grade_file, 'r', encoding='utf-8') as f:
+            grade_data = decode_grade_data(json.load(f))
+        writer.add_grade(grade_filename, grade_data["grade"])
+        for activity in grade_data.get("activities", []):
+            writer.add(grade_filename, grade_data["grade"], activity)
+    if writer.summaries:
+        counts = writer.close()
+    return counts
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Stage timers, counters and profiling shared by the build scripts.
+
+The scripts record where time goes (reading, sniffing, parsing, merging,
+serializing, writing) and what they did (rows, files skipped, bytes written,
+regex calls) into one Metrics object per run. Stage times are exclusive: time
+spent in a nested stage is not counted again in the enclosing one, so the
+stages add up to at most the total.
+
+Counting is cheap and always on. Counters incremented in worker processes
+(--jobs > 1) are not collected; the main process still times the stages.
+
+Usage:
+    import instrumentation
+
+    with instrumentation.stage("parse"):
+        ...
+    instrumentation.count("rows")
+    for row in instrumentation.timed_iter("read", reader):
+        ...
+
+    # in main(): adds --profile/--profile-output/--metrics-json and prints the stage summary
+    instrumentation.add_instrumentation_arguments(parser)
+    instrumentation.run_instrumented("update_printouts", args, run, args)
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+# Lines of cProfile/tracemalloc output printed after a profiled run
+PROFILE_TOP = 20
+
+class Metrics:
+    """Stage timings and counters of one script run."""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_calls: Dict[str, int] = {}
+        self.counters: Dict[str, float] = {}
+        # Open stages: [name, seconds spent in nested stages]
+        self._stack: List[List[Any]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block under a stage name (exclusive of nested stages)."""
+        frame = [name, 0.0]
+        self._stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stack.pop()
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + elapsed - frame[1]
+            self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def count(self, name: str, amount: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.total_seconds()
+        report = {
+            "script": self.name,
+            "started_at": self.started_at,
+            "argv": sys.argv[1:],
+            "total_seconds": round(total, 6),
+            "stages": {
+                name: {"seconds": round(seconds, 6), "calls": self.stage_calls[name]}
+                for name, seconds in self.stage_seconds.items()
+            },
+            "counters": dict(self.counters),
+            "rates": {},
+        }
+        if total > 0:
+            for counter in ("rows", "activities", "bytes_written"):
+                if counter in self.counters:
+                    report["rates"][f"{counter}_per_sec"] = round(self.counters[counter] / total, 1)
+        return report
+
+    def print_summary(self) -> None:
+        total = self.total_seconds()
+        print(f"\n⏱️  {self.name or 'Run'} finished in {total:.3f}s")
+        for name, seconds in sorted(self.stage_seconds.items(), key=lambda item: -item[1]):
+            share = seconds / total * 100 if total else 0
+            print(f"   {name:<12} {seconds:8.3f}s {share:5.1f}%  ({self.stage_calls[name]} calls)")
+        if self.counters:
+            print("   " + ", ".join(f"{name}={_format_count(value)}" for name, value in sorted(self.counters.items())))
+
+def _format_count(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.2f}"
+
+_metrics = Metrics()
+
+def get_metrics() -> Metrics:
+    """Return the metrics of the current run."""
+    return _metrics
+
+def reset(name: str = "") -> Metrics:
+    """Start a new run; later stage() and count() calls record into it."""
+    global _metrics
+    _metrics = Metrics(name)
+    return _metrics
+
+def stage(name: str):
+    """Time a block under a stage name in the current run."""
+    return _metrics.stage(name)
+
+def count(name: str, amount: float = 1) -> None:
+    """Increment a counter of the current run."""
+    _metrics.count(name, amount)
+
+def timed_iter(name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+    """Yield from an iterable, recording the time spent producing each item as a stage."""
+    iterator = iter(iterable)
+    while True:
+        with _metrics.stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+def add_instrumentation_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --profile, --profile-output and --metrics-json to a script's arguments."""
+    parser.add_argument('--profile', choices=['cpu', 'memory'],
+                       help='Profile the run with cProfile (cpu) or tracemalloc (memory)')
+    parser.add_argument('--profile-output',
+                       help='Where to save the profile (default: <script>.prof or <script>.tracemalloc)')
+    parser.add_argument('--metrics-json',
+                       help='Write stage timings and counters of the run to this JSON file')
+
+def run_instrumented(name: str, args: argparse.Namespace, func: Callable[..., Any], *func_args, **func_kwargs) -> Any:
+    """
+    Run a script's work with fresh metrics, optionally under a profiler, then
+    print the stage summary and write --metrics-json if requested.
+    """
+    metrics = reset(name)
+    profile = getattr(args, 'profile', None)
+    profile_output = getattr(args, 'profile_output', None)
+    profiler = None
+
+    if profile == 'cpu':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif profile == 'memory':
+        tracemalloc.start(25)
+
+    try:
+        return func(*func_args, **func_kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            path = profile_output or f"{name}.prof"
+            profiler.dump_stats(path)
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(PROFILE_TOP)
+            print(stream.getvalue())
+            print(f"🔬 CPU profile saved: {path} (open with python3 -m pstats {path})")
+        elif profile == 'memory':
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            metrics.count("peak_traced_mb", round(peak / 1024 / 1024, 2))
+            path = profile_output or f"{name}.tracemalloc"
+            snapshot.dump(path)
+            print(f"\n🔬 Top allocations (peak traced memory {peak / 1024 / 1024:.1f} MB):")
+            for statistic in snapshot.statistics('lineno')[:PROFILE_TOP]:
+                print(f"   {statistic}")
+            print(f"🔬 Memory snapshot saved: {path} (load with tracemalloc.Snapshot.load)")
+
+        metrics.print_summary()
+        metrics_json = getattr(args, 'metrics_json', None)
+        if metrics_json:
+            directory = os.path.dirname(os.path.abspath(metrics_json))
+            os.makedirs(directory, exist_ok=True)
+            with open(metrics_json, 'w', encoding='utf-8') as f:
+                json.dump(metrics.to_dict(), f, ensure_ascii=False, indent=2)
+            print(f"📈 Metrics written: {metrics_json}")
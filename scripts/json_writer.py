@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Atomic JSON writer shared by the scripts that produce grade files.
+
+Files are written to a temporary file in the same directory, fsync'd and
+renamed over the target, so a crash never leaves a truncated grade file
+behind. Writes are skipped when the serialized bytes are unchanged, which
+keeps file timestamps (and deployed cache entries) stable.
+
+Usage:
+    from json_writer import write_json_atomic
+
+    changed = write_json_atomic("public/activityData/grades/2.grade.json", data)
+    changed = write_json_atomic(path, data, compact=True)  # for deployment builds
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Optional, TextIO
+
+import instrumentation
+
+# Separators for --compact output: no indentation and no spaces
+COMPACT_SEPARATORS = (',', ':')
+
+def serialize_json(data: Any, compact: bool = False) -> str:
+    """Serialize data the way the grade files are stored (indented, or compact)."""
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+def is_compact_json(text: str) -> bool:
+    """Return True if JSON text was written compact (serialize_json never indents those)."""
+    return '\n' not in text.strip()
+
+def is_compact_file(file_path: str) -> bool:
+    """Return True if the JSON file exists and was written compact."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return is_compact_json(f.read())
+    except OSError:
+        return False
+
+def hash_file(file_path: str) -> str:
+    """Return the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def has_content(file_path: str, payload: bytes) -> bool:
+    """Return True if the file exists and holds exactly these bytes."""
+    try:
+        if os.path.getsize(file_path) != len(payload):
+            return False
+        with open(file_path, 'rb') as f:
+            return f.read() == payload
+    except OSError:
+        return False
+
+def _files_equal(path_a: str, path_b: str, chunk_size: int = 65536) -> bool:
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+        with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+            while True:
+                chunk_a = a.read(chunk_size)
+                if chunk_a != b.read(chunk_size):
+                    return False
+                if not chunk_a:
+                    return True
+    except OSError:
+        return False
+
+def _fsync_directory(directory: str) -> None:
+    # Persist the rename itself; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class AtomicWriter:
+    """
+    Context manager that writes text to a temporary file and renames it over `path`.
+
+    On an exception the target is left untouched. With skip_unchanged, a result
+    identical to the existing file is discarded. `changed` tells whether the
+    target was replaced.
+    """
+
+    def __init__(self, path: str, skip_unchanged: bool = True):
+        self.path = path
+        self.skip_unchanged = skip_unchanged
+        self.changed = False
+        self._file: Optional[TextIO] = None
+        self._temp_path: Optional[str] = None
+
+    def __enter__(self) -> TextIO:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self._temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.path)}.", suffix=".tmp", dir=directory)
+        self._file = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        return self._file
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+
+            if exc_type is not None or (self.skip_unchanged and _files_equal(self._temp_path, self.path)):
+                os.remove(self._temp_path)
+                if exc_type is None:
+                    instrumentation.count("files_unchanged")
+                return
+
+            # mkstemp creates files readable by the owner only; use the usual mode
+            if os.path.exists(self.path):
+                os.chmod(self._temp_path, os.stat(self.path).st_mode & 0o777)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(self._temp_path, 0o666 & ~umask)
+
+            size = os.path.getsize(self._temp_path)
+            os.replace(self._temp_path, self.path)
+            _fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+            self.changed = True
+            instrumentation.count("files_written")
+            instrumentation.count("bytes_written", size)
+        except BaseException:
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+            raise
+
+def write_text_atomic(file_path: str, text: str) -> bool:
+    """Atomically write text unless the file already has this content. Returns True if written."""
+    with instrumentation.stage("write"):
+        if has_content(file_path, text.encode('utf-8')):
+            instrumentation.count("files_unchanged")
+            return False
+        writer = AtomicWriter(file_path, skip_unchanged=False)
+        with writer as f:
+            f.write(text)
+        return writer.changed
+
+def write_json_atomic(file_path: str, data: Any, compact: bool = False) -> bool:
+    """Atomically write data as JSON unless the file already has these bytes. Returns True if written."""
+    with instrumentation.stage("serialize"):
+        text = serialize_json(data, compact)
+    return write_text_atomic(file_path, text)
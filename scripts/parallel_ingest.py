@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Process-pool helpers shared by the CSV ingestion scripts.
+
+Rows are read in the main process and handed to workers in chunks. Results
+always come back in task order, so the single writer that consumes them
+produces exactly the same output as a serial run.
+
+Usage:
+    from parallel_ingest import chunked, ordered_map
+
+    for result in ordered_map(process_chunk, chunked(rows, 500), jobs=4):
+        ...
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List
+
+DEFAULT_CHUNK_SIZE = 500
+
+def resolve_jobs(jobs: int) -> int:
+    """Turn a --jobs value into a worker count (0 or less means one per CPU core)."""
+    if jobs is None or jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+def chunked(iterable: Iterable[Any], size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Any]]:
+    """Yield lists of at most `size` items from an iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def ordered_map(func: Callable[[Any], Any], tasks: Iterable[Any], jobs: int = 1) -> Iterator[Any]:
+    """
+    Apply `func` to every task and yield the results in task order.
+
+    With jobs > 1 the tasks run in a process pool, with at most two tasks per
+    worker in flight so large inputs are not buffered up front. `func` and the
+    tasks must be picklable.
+    """
+    if jobs <= 1:
+        for task in tasks:
+            yield func(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(func, task))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
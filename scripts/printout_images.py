@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Resized preview and thumbnail variants for printout images.
+
+For every PNG/JPEG in public/printOuts this writes, into public/printOuts/variants:
+- {name}.preview.webp and a fallback {name}.preview.jpg (at most 1200 px on the long side)
+- {name}.thumbnail.webp and a fallback {name}.thumbnail.jpg (at most 320 px on the long side)
+
+The fallback is a PNG instead of a JPEG when the image has transparent pixels.
+
+The returned metadata (keyed by the same "printOuts/..." paths that are stored
+in content.extra) records the size of the original and of every variant:
+
+    "printOuts/A0502_penger.png": {
+      "width": 2480, "height": 3508, "bytes": 3145728,
+      "variants": {
+        "preview": {"path": "printOuts/variants/A0502_penger.preview.jpg", "width": 848, "height": 1200, "bytes": 212345},
+        "preview_webp": {...}, "thumbnail": {...}, "thumbnail_webp": {...}
+      }
+    }
+
+Images are only re-rendered when their content hash changes; hashes and
+metadata are cached in variants/.variants_cache.json. Pillow is optional:
+without it, image_support_available() is False and no variants are built.
+
+The image helpers (hash_file, save_image_atomic, save_options,
+has_transparency) are shared with activity_pictures.py.
+
+Usage:
+    from printout_images import build_printout_images
+
+    image_metadata = build_printout_images("public/printOuts", jobs=4)
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from json_writer import hash_file, write_json_atomic
+from parallel_ingest import ordered_map
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional
+    Image = None
+
+VARIANTS_DIRNAME = "variants"
+CACHE_FILENAME = ".variants_cache.json"
+CACHE_VERSION = 1
+
+# Variant name -> maximum width/height in pixels
+IMAGE_VARIANTS = {
+    "preview": 1200,
+    "thumbnail": 320,
+}
+RASTER_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+def image_support_available() -> bool:
+    """Return True if Pillow is installed (with WebP support)."""
+    if Image is None:
+        return False
+    from PIL import features
+    return bool(features.check('webp'))
+
+def save_image_atomic(image, path: str, image_format: str, **options) -> None:
+    """Save a Pillow image atomically: into a temporary file next to the target, then renamed."""
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp",
+                                     dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            image.save(f, image_format, **options)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def save_options(image_format: str) -> Dict[str, Any]:
+    """Pillow save options for a variant format (JPEG, WEBP or PNG)."""
+    if image_format == "JPEG":
+        return {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}
+    if image_format == "WEBP":
+        return {"quality": WEBP_QUALITY, "method": 4}
+    return {"optimize": True}
+
+def has_transparency(image) -> bool:
+    """Return True if the image has any pixel that is not fully opaque."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        alpha = image.convert("RGBA").getchannel("A")
+        return alpha.getextrema()[0] < 255
+    return False
+
+def render_variants(task: Tuple[str, str, str]) -> Dict[str, Any]:
+    """
+    Render all variants of one image. Takes (source_path, variants_dir, relative_dir)
+    and returns the metadata for the image. Runs in worker processes.
+    """
+    source_path, variants_dir, relative_dir = task
+    name = os.path.splitext(os.path.basename(source_path))[0]
+
+    with Image.open(source_path) as original:
+        original.load()
+        metadata = {
+            "width": original.width,
+            "height": original.height,
+            "bytes": os.path.getsize(source_path),
+            "variants": {},
+        }
+        # Opaque images get a JPEG fallback, which is far smaller than PNG for drawings and photos
+        if has_transparency(original):
+            image_format, extension = "PNG", ".png"
+            original = original.convert("RGBA")
+        else:
+            image_format, extension = "JPEG", ".jpg"
+            original = original.convert("RGB")
+
+        for variant, max_size in IMAGE_VARIANTS.items():
+            resized = original.copy()
+            resized.thumbnail((max_size, max_size), Image.LANCZOS)
+            for key, fmt, ext in ((variant, image_format, extension),
+                                  (f"{variant}_webp", "WEBP", ".webp")):
+                filename = f"{name}.{variant}{ext}"
+                path = os.path.join(variants_dir, filename)
+                save_image_atomic(resized, path, fmt, **save_options(fmt))
+                metadata["variants"][key] = {
+                    "path": f"{relative_dir}/{VARIANTS_DIRNAME}/{filename}",
+                    "width": resized.width,
+                    "height": resized.height,
+                    "bytes": os.path.getsize(path),
+                }
+    return metadata
+
+def _variants_exist(metadata: Dict[str, Any], public_dir: str) -> bool:
+    return all(os.path.exists(os.path.join(public_dir, variant["path"]))
+               for variant in metadata.get("variants", {}).values())
+
+def load_variants_cache(cache_path: str) -> Dict[str, Any]:
+    """Load the hash cache, or return an empty one if it is missing or from another version."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != CACHE_VERSION or cache.get("variants") != IMAGE_VARIANTS:
+        return {}
+    return cache.get("images", {})
+
+def build_printout_images(printouts_dir: str = "public/printOuts", jobs: int = 1,
+                          filenames: Optional[Set[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Build variants for all raster printouts, re-rendering only images whose
+    content changed, and return their metadata keyed by "printOuts/{filename}".
+    Variants of images that no longer exist are removed.
+
+    With filenames, only those files are hashed (and rendered if changed);
+    the cache entries of all other images are kept and returned as they are.
+    """
+    public_dir = os.path.dirname(os.path.abspath(printouts_dir))
+    relative_dir = os.path.basename(os.path.abspath(printouts_dir))
+    variants_dir = os.path.join(printouts_dir, VARIANTS_DIRNAME)
+    os.makedirs(variants_dir, exist_ok=True)
+    cache_path = os.path.join(variants_dir, CACHE_FILENAME)
+    cache = load_variants_cache(cache_path)
+
+    if filenames is None:
+        images: Dict[str, Dict[str, Any]] = {}
+        candidates = sorted(os.listdir(printouts_dir))
+    else:
+        images = {filename: entry for filename, entry in cache.items() if filename not in filenames}
+        candidates = sorted(filenames)
+    to_render: List[Tuple[str, str]] = []
+    for filename in candidates:
+        source_path = os.path.join(printouts_dir, filename)
+        if not filename.lower().endswith(RASTER_EXTENSIONS) or not os.path.isfile(source_path):
+            continue
+        digest = hash_file(source_path)
+        cached = cache.get(filename)
+        if cached and cached.get("sha256") == digest and _variants_exist(cached["metadata"], public_dir):
+            images[filename] = cached
+        else:
+            to_render.append((filename, digest))
+
+    if to_render:
+        print(f"🖼️  Rendering variants for {len(to_render)} image(s), {len(images)} unchanged")
+    tasks = [(os.path.join(printouts_dir, filename), variants_dir, relative_dir) for filename, _ in to_render]
+    for (filename, digest), metadata in zip(to_render, ordered_map(render_variants, tasks, jobs)):
+        images[filename] = {"sha256": digest, "metadata": metadata}
+        saved = metadata["bytes"] - metadata["variants"]["preview_webp"]["bytes"]
+        print(f"   ✅ {filename}: {metadata['width']}x{metadata['height']}, "
+              f"preview.webp saves {saved / 1024:.0f} KB")
+
+    # Remove variants whose source image was deleted or renamed
+    expected = {os.path.basename(variant["path"])
+                for entry in images.values() for variant in entry["metadata"]["variants"].values()}
+    for filename in os.listdir(variants_dir):
+        if filename != CACHE_FILENAME and filename not in expected and not filename.startswith('.'):
+            os.remove(os.path.join(variants_dir, filename))
+
+    write_json_atomic(cache_path, {
+        "version": CACHE_VERSION,
+        "variants": IMAGE_VARIANTS,
+        "images": dict(sorted(images.items())),
+    })
+    return {f"{relative_dir}/{filename}": entry["metadata"] for filename, entry in sorted(images.items())}
+
+def get_image_metadata(printouts_dir: str = "public/printOuts", jobs: int = 1,
+                       filenames: Optional[Set[str]] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Like build_printout_images, but returns None (after a notice) when Pillow is not installed."""
+    if not image_support_available():
+        print("ℹ️  Pillow is not installed, skipping image variants (pip install Pillow)")
+        return None
+    return build_printout_images(printouts_dir, jobs, filenames)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Shared text-to-list parser for the CSV converters.
+
+Cell text from the activity sheets becomes an array of strings:
+- Numbered lists ("1. First 2. Second") split on the numbers
+- Bullet points ("- First - Second") split on "-"
+- Anything else becomes a single item
+
+The same cell values (tips, reflections, learning goals) repeat across rows
+and grades, so parsed results are memoized.
+
+Usage:
+    from text_parsing import parse_text_content
+
+    parse_text_content("1. Samle elevene 2. Del dem i grupper")
+    # ['Samle elevene', 'Del dem i grupper']
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+import instrumentation
+
+# Matches the number markers of an inline numbered list, e.g. "1. " or "12.  "
+NUMBERED_ITEM_PATTERN = re.compile(r'\d+\.\s+')
+
+PARSE_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _tokenize(text: str) -> Tuple[str, ...]:
+    """Split stripped, non-empty text into items in a single scan for number markers."""
+    # Splitting finds the number markers; a single part means there were none
+    instrumentation.count("regex_calls")
+    parts = NUMBERED_ITEM_PATTERN.split(text)
+    if len(parts) == 1:
+        if '-' not in text:
+            return (text,)
+        parts = text.split('-')
+    return tuple(item for item in (part.strip() for part in parts) if item)
+
+def parse_text_content(text: str) -> List[str]:
+    """
+    Parse text content and convert to appropriate format:
+    - Split on numbered patterns (1., 2., 3., etc.) for numbered lists
+    - Otherwise split on "-" for bullet points
+    - Return as array of strings
+    """
+    if not text:
+        return []
+    text = text.strip()
+    if not text:
+        return []
+    # Return a fresh list so callers can modify it without touching the cache
+    return list(_tokenize(text))
+
+def clear_parse_cache() -> None:
+    """Drop memoized results, e.g. between unrelated conversion runs."""
+    _tokenize.cache_clear()
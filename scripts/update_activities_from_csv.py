@@ -8,77 +8,65 @@ It can:
 2. Update existing activities with new data
 3. Merge multiple CSV files at once
 4. Backup original files before making changes
+5. Sync incrementally, only touching rows and files that changed since the last run
 
 Usage:
     python update_activities_from_csv.py activities.csv
     python update_activities_from_csv.py activities.csv --grade "Andre årstrinn"
     python update_activities_from_csv.py *.csv --backup
     python update_activities_from_csv.py activities.csv --dry-run
+    python update_activities_from_csv.py scripts/leker-Json-*.trinn.tsv --incremental
+    python update_activities_from_csv.py *.csv --metrics-json metrics/sync.json --profile cpu
 """
 
 import csv
+import hashlib
 import json
 import os
-import re
 import argparse
 import shutil
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 
-def parse_text_content(text: str) -> List[str]:
-    """Parse text content into array format for bullet points and numbered lists."""
-    if not text or text.strip() == "":
-        return []
-    
-    text = text.strip()
-    
-    # Check if text contains numbered list pattern (1. 2. 3. etc.)
-    numbered_pattern = r'\d+\.\s+'
-    if re.search(numbered_pattern, text):
-        items = re.split(numbered_pattern, text)
-        items = [item.strip() for item in items if item.strip()]
-        return items
-    
-    # Check if text contains bullet points (-)
-    elif '-' in text:
-        items = [item.strip() for item in text.split('-') if item.strip()]
-        return items
-    
-    # Single item text
-    else:
-        return [text]
+import instrumentation
+from activity_merge import build_changeset, diff_activity, index_by_id
+from curriculum_index import LEARNING_GOALS_FILE, match_learning_goal, with_learning_goal_id
+from grade_detection import detect_grade_in_text, grade_from_activity_id
+from grade_encoding import decode_grade_data, encode_grade_data, is_encoded
+from grade_shards import default_shards_dir, refresh_grade_shards, write_grade_shards
+from json_writer import has_content, hash_file, serialize_json, write_text_atomic
+from parallel_ingest import DEFAULT_CHUNK_SIZE, chunked, ordered_map, resolve_jobs
+from text_parsing import parse_text_content
+
+# Build cache for the incremental sync manifest, kept out of public/ so it is never deployed
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+MANIFEST_PREFIX = "sync_manifest"
+# Bump when row parsing, grade detection or goal matching changes, so that
+# --incremental parses every row again instead of keeping stale activities
+SYNC_VERSION = 2
+
+# Header spellings used by the activity sheets, mapped to the names read below
+HEADER_ALIASES = {
+    "id": "ID",
+    "tittel": "Title",
+    "kompetansemål": "Learning goal",
+    "example": "Examples",
+}
 
 def extract_grade_from_id_or_learning_goal(activity_id: str, learning_goal: str, force_grade: str = None) -> str:
     """Extract grade from activity ID or learning goal."""
     if force_grade:
         return force_grade
     
-    # Try to extract from activity ID first (assuming AXXYY format where A indicates grade 2)
-    if activity_id.startswith('A') and len(activity_id) >= 5:
-        # For now, assume all A-prefixed IDs are for 2nd grade
-        # You can expand this logic for other grades
-        return "Andre årstrinn"
+    # Try to extract from activity ID first (AXXYY format, A = 2nd grade ... F = 7th grade)
+    grade = grade_from_activity_id(activity_id)
+    if grade:
+        return grade
     
-    # Fallback to learning goal patterns
-    grade_patterns = {
-        'andre': 'Andre årstrinn',
-        'tredje': 'Tredje årstrinn', 
-        'fjerde': 'Fjerde årstrinn',
-        'femte': 'Femte årstrinn',
-        'sjette': 'Sjette årstrinn',
-        'syvende': 'Syvende årstrinn',
-        '2': 'Andre årstrinn',
-        '3': 'Tredje årstrinn',
-        '4': 'Fjerde årstrinn', 
-        '5': 'Femte årstrinn',
-        '6': 'Sjette årstrinn',
-        '7': 'Syvende årstrinn'
-    }
-    
-    learning_goal_lower = learning_goal.lower()
-    for pattern, grade in grade_patterns.items():
-        if pattern in learning_goal_lower:
-            return grade
+    # Fallback to explicit grade markers in the learning goal ("2. trinn", "år 3", ...)
+    grade = detect_grade_in_text(learning_goal)
+    if grade:
+        return grade
     
     return "Andre årstrinn"  # Default to 2nd grade
 
@@ -112,24 +100,10 @@ def show_activity_differences(old_activity: Dict[str, Any], new_activity: Dict[s
     """Show what fields are being updated in an activity."""
     changes = []
     
-    # Check top-level fields
-    for field in ['title', 'time', 'location', 'tools', 'groupsize', 'learning_goal', 'image']:
-        old_value = old_activity.get(field, '')
-        new_value = new_activity.get(field, '')
-        if old_value != new_value:
-            changes.append(f"    {field}: '{old_value}' → '{new_value}'")
-    
-    # Check content fields
-    old_content = old_activity.get('content', {})
-    new_content = new_activity.get('content', {})
-    
-    for content_field in ['introduction', 'main', 'examples', 'reflection', 'tips', 'extra']:
-        old_value = old_content.get(content_field, [])
-        new_value = new_content.get(content_field, [])
-        if old_value != new_value:
-            old_str = ' | '.join(old_value) if isinstance(old_value, list) else str(old_value)
-            new_str = ' | '.join(new_value) if isinstance(new_value, list) else str(new_value)
-            changes.append(f"    content.{content_field}: '{old_str}' → '{new_str}'")
+    for field, old_value, new_value in diff_activity(old_activity, new_activity):
+        old_str = ' | '.join(old_value) if isinstance(old_value, list) else str(old_value)
+        new_str = ' | '.join(new_value) if isinstance(new_value, list) else str(new_value)
+        changes.append(f"    {field}: '{old_str}' → '{new_str}'")
     
     if changes:
         print(f"  📝 Changes for {activity_id}:")
@@ -138,10 +112,30 @@ def show_activity_differences(old_activity: Dict[str, Any], new_activity: Dict[s
         if len(changes) > 5:
             print(f"    ... and {len(changes) - 5} more changes")
 
+def clean_csv_row(row: Dict[str, str]) -> Dict[str, str]:
+    """Strip whitespace from keys and values and drop unnamed columns."""
+    return {key.strip(): value.strip() if value else "" for key, value in row.items() if key}
+
+def read_csv_rows(csv_file: str) -> Iterator[Dict[str, str]]:
+    """Yield cleaned rows from a CSV file (or TSV file, based on the extension)."""
+    delimiter = '\t' if csv_file.lower().endswith('.tsv') else ','
+    with open(csv_file, 'r', encoding='utf-8') as csvfile:
+        # The header is the first non-blank row (the grade sheets start with empty lines)
+        header_reader = csv.reader(csvfile, delimiter=delimiter)
+        header = next((row for row in header_reader if any(cell.strip() for cell in row)), [])
+        
+        # Clean up column names and map alternative spellings ("Id", "Tittel", "Kompetansemål")
+        fieldnames = [field.strip() for field in header]
+        fieldnames = [HEADER_ALIASES.get(field.lower(), field) for field in fieldnames]
+        reader = csv.DictReader(csvfile, fieldnames=fieldnames, delimiter=delimiter)
+        
+        for row in reader:
+            yield clean_csv_row(row)
+
 def create_activity_from_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
     """Create activity object from CSV row data."""
     # Clean up the row data
-    cleaned_row = {key.strip(): value.strip() if value else "" for key, value in row.items() if key}
+    cleaned_row = clean_csv_row(row)
     
     activity = {
         "id": cleaned_row.get('ID', ''),
@@ -174,6 +168,11 @@ def create_activity_from_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
     
     return activity
 
+def build_activity(row: Dict[str, str], grade: str) -> Dict[str, Any]:
+    """Create the activity for a CSV row of a grade, with its curriculum goal ID."""
+    activity = create_activity_from_csv_row(row)
+    return with_learning_goal_id(activity, match_learning_goal(grade, activity.get('learning_goal', '')))
+
 def backup_file(file_path: str) -> str:
     """Create a backup of the file with timestamp."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -181,13 +180,131 @@ def backup_file(file_path: str) -> str:
     shutil.copy2(file_path, backup_path)
     return backup_path
 
+def process_csv_chunk(task: Tuple[str, List[Dict[str, str]], Optional[str], Optional[Dict[str, Dict[str, str]]]]
+                      ) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Turn a chunk of cleaned CSV rows into records for the merge stage.
+    
+    May run in a worker process, so warnings are returned instead of printed.
+    When row hashes from the sync manifest are given, rows with a matching hash
+    are returned unparsed.
+    """
+    csv_file, rows, force_grade, known_hashes = task
+    records = []
+    
+    for row in rows:
+        try:
+            activity_id = row.get('ID', '')
+            
+            # Skip rows with missing essential data
+            if not activity_id or not row.get('Title', ''):
+                records.append({"warning": f"⚠️  Skipping row with missing ID or Title: {row}"})
+                continue
+            
+            # Determine grade
+            grade = extract_grade_from_id_or_learning_goal(
+                activity_id, 
+                row.get('Learning goal', ''), 
+                force_grade
+            )
+            
+            record = {"grade": grade, "id": activity_id, "hash": None, "activity": None, "row": None}
+            if known_hashes is not None:
+                record["hash"] = hash_row(row)
+                if known_hashes.get(grade, {}).get(activity_id) == record["hash"]:
+                    record["row"] = row
+                    records.append(record)
+                    continue
+            
+            record["activity"] = build_activity(row, grade)
+            records.append(record)
+            
+        except Exception as e:
+            records.append({"warning": f"❌ Error processing row: {e}"})
+    
+    return csv_file, records
+
+def iter_csv_tasks(csv_files: List[str], force_grade: Optional[str],
+                   known_hashes: Optional[Dict[str, Dict[str, str]]],
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple]:
+    """Yield process_csv_chunk tasks, at least one per file so every file is reported."""
+    for csv_file in csv_files:
+        emitted = False
+        for chunk in chunked(instrumentation.timed_iter("read", read_csv_rows(csv_file)), chunk_size):
+            emitted = True
+            yield csv_file, chunk, force_grade, known_hashes
+        if not emitted:
+            yield csv_file, [], force_grade, known_hashes
+
+def get_manifest_path(output_dir: str) -> str:
+    """Return the path of the incremental sync manifest for a grades directory (one per directory)."""
+    key = hashlib.sha256(os.path.abspath(output_dir).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"{MANIFEST_PREFIX}.{key}.json")
+
+def sync_fingerprint() -> Dict[str, Any]:
+    """The parser version and learning goal list that the row hashes of a manifest were made with."""
+    return {"version": SYNC_VERSION, "learning_goals": hash_file(LEARNING_GOALS_FILE)}
+
+def load_sync_manifest(manifest_path: str) -> Dict[str, Any]:
+    """Load the incremental sync manifest, or an empty one if none exists yet or it is outdated."""
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("fingerprint") == sync_fingerprint():
+            return manifest
+        print("ℹ️  Sync manifest was made by another parser version or goal list, doing a full sync")
+    return {"files": {}, "rows": {}}
+
+def save_sync_manifest(manifest_path: str, manifest: Dict[str, Any]) -> None:
+    """Write the incremental sync manifest."""
+    manifest = {**manifest, "fingerprint": sync_fingerprint()}
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    write_text_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True))
+
+def record_grade_file(grade_file_path: str, manifest: Dict[str, Any]) -> None:
+    """Store the hash of a grade file as the sync left it."""
+    manifest.setdefault("grade_files", {})[os.path.basename(grade_file_path)] = hash_file(grade_file_path)
+
+def grade_file_matches_manifest(grade_file_path: str, manifest: Dict[str, Any]) -> bool:
+    """Return True if the grade file exists and is the one the last sync left."""
+    recorded = manifest.get("grade_files", {}).get(os.path.basename(grade_file_path))
+    return recorded is not None and os.path.exists(grade_file_path) and hash_file(grade_file_path) == recorded
+
+def hash_row(row: Dict[str, str]) -> str:
+    """Return a content hash of a cleaned CSV row, independent of column order."""
+    serialized = json.dumps(row, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
 def update_activities_from_csv(csv_files: List[str], 
                              output_dir: str = "./public/activityData/grades", 
                              force_grade: str = None,
                              create_backup: bool = False,
                              dry_run: bool = False,
-                             allow_deletion: bool = True) -> None:
-    """Update JSON files with activities from CSV files."""
+                             allow_deletion: bool = True,
+                             incremental: bool = False,
+                             jobs: int = 1,
+                             compact: bool = False,
+                             shards_dir: Optional[str] = None,
+                             encoded: bool = False) -> None:
+    """Update JSON files with activities from CSV files.
+    
+    In incremental mode a manifest of per-row content hashes (keyed by grade and
+    activity ID) is kept in scripts/.cache/. It is discarded when SYNC_VERSION
+    or the learning goal list changes. It also records the hash of every grade
+    file it wrote; a grade file that is missing or has another hash is rebuilt
+    from all rows instead of being skipped. Unchanged CSV files and rows
+    are not parsed, and grade files without changes are neither loaded nor written.
+    
+    With jobs > 1 row parsing and grade detection run in a process pool; results
+    are merged in file and row order, so the output matches a serial run.
+    
+    Grade files are replaced atomically and only when their bytes change. With
+    compact=True they are written without indentation, for deployment builds.
+    With shards_dir set, the summary and detail files of every grade file in
+    output_dir are written there too (see grade_shards.py). With encoded=True repeated
+    fields are stored in a string table per file (see grade_encoding.py);
+    existing files are read in either format.
+    """
     
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
@@ -197,120 +314,167 @@ def update_activities_from_csv(csv_files: List[str],
     # Track all activity IDs found in CSV files by grade
     csv_activity_ids_by_grade: Dict[str, set] = {}
     
-    # Process each CSV file
+    # Incremental sync state
+    manifest_path = get_manifest_path(output_dir)
+    manifest = load_sync_manifest(manifest_path) if incremental else {"files": {}, "rows": {}}
+    row_hashes_by_grade: Dict[str, Dict[str, str]] = {}
+    # Unchanged rows by grade and ID: the cleaned row, or the CSV path if the whole file was skipped
+    unchanged_by_grade: Dict[str, Dict[str, Any]] = {}
+    file_entries: Dict[str, Dict[str, Any]] = {}
+    file_hashes: Dict[str, str] = {}
+    files_to_process: List[str] = []
+    
+    # Decide which CSV files need parsing
     for csv_file in csv_files:
         if not os.path.exists(csv_file):
             print(f"⚠️  Warning: CSV file '{csv_file}' not found, skipping...")
             continue
-            
-        print(f"📄 Processing {csv_file}...")
         
-        with open(csv_file, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
+        file_key = os.path.normpath(csv_file)
+        if incremental:
+            with instrumentation.stage("hash"):
+                file_hash = hash_file(csv_file)
+            previous_entry = manifest["files"].get(file_key)
+            if previous_entry and previous_entry["sha256"] == file_hash:
+                print(f"⏭️  Skipping unchanged {csv_file}")
+                instrumentation.count("files_skipped")
+                for grade, activity_ids in previous_entry["activities"].items():
+                    grade_hashes = manifest["rows"].get(grade, {})
+                    changes_by_grade.setdefault(grade, {"new": [], "updated": []})
+                    for activity_id in activity_ids:
+                        csv_activity_ids_by_grade.setdefault(grade, set()).add(activity_id)
+                        unchanged_by_grade.setdefault(grade, {})[activity_id] = csv_file
+                        if activity_id in grade_hashes:
+                            row_hashes_by_grade.setdefault(grade, {})[activity_id] = grade_hashes[activity_id]
+                file_entries[file_key] = previous_entry
+                continue
+            file_hashes[file_key] = file_hash
+        
+        files_to_process.append(csv_file)
+    
+    # Parse rows in chunks (in a process pool with --jobs) and merge the results in file order
+    known_hashes = manifest["rows"] if incremental else None
+    tasks = iter_csv_tasks(files_to_process, force_grade, known_hashes)
+    current_file = None
+    file_activity_ids: Dict[str, List[str]] = {}
+    
+    for csv_file, records in instrumentation.timed_iter("parse", ordered_map(process_csv_chunk, tasks, jobs)):
+        if csv_file != current_file:
+            print(f"📄 Processing {csv_file}...")
+            current_file = csv_file
+            file_activity_ids = {}
+            if incremental:
+                file_key = os.path.normpath(csv_file)
+                file_entries[file_key] = {"sha256": file_hashes[file_key], "activities": file_activity_ids}
+        
+        for record in records:
+            if "warning" in record:
+                print(record["warning"])
+                instrumentation.count("rows_skipped")
+                continue
             
-            # Clean up column names
-            reader.fieldnames = [field.strip() if field else field for field in reader.fieldnames]
+            instrumentation.count("rows")
+            grade = record["grade"]
+            activity_id = record["id"]
             
-            for row in reader:
-                try:
-                    activity = create_activity_from_csv_row(row)
-                    
-                    # Skip rows with missing essential data
-                    if not activity['id'] or not activity['title']:
-                        print(f"⚠️  Skipping row with missing ID or Title: {activity}")
-                        continue
-                    
-                    # Determine grade
-                    grade = extract_grade_from_id_or_learning_goal(
-                        activity['id'], 
-                        activity['learning_goal'], 
-                        force_grade
-                    )
-                    
-                    # Initialize grade in changes dict
-                    if grade not in changes_by_grade:
-                        changes_by_grade[grade] = {"new": [], "updated": []}
-                    if grade not in csv_activity_ids_by_grade:
-                        csv_activity_ids_by_grade[grade] = set()
-                    
-                    # Track this activity ID as present in CSV
-                    csv_activity_ids_by_grade[grade].add(activity['id'])
-                    
-                    changes_by_grade[grade]["new"].append(activity)
-                    
-                except Exception as e:
-                    print(f"❌ Error processing row: {e}")
-                    continue
+            # Initialize grade in changes dict
+            if grade not in changes_by_grade:
+                changes_by_grade[grade] = {"new": [], "updated": []}
+            if grade not in csv_activity_ids_by_grade:
+                csv_activity_ids_by_grade[grade] = set()
+            
+            # Track this activity ID as present in CSV
+            csv_activity_ids_by_grade[grade].add(activity_id)
+            file_activity_ids.setdefault(grade, []).append(activity_id)
+            
+            if record["hash"] is not None:
+                row_hashes_by_grade.setdefault(grade, {})[activity_id] = record["hash"]
+            if record["activity"] is None:
+                instrumentation.count("rows_unchanged")
+                unchanged_by_grade.setdefault(grade, {})[activity_id] = record["row"]
+            else:
+                changes_by_grade[grade]["new"].append(record["activity"])
+    
+    # Rows re-read from skipped CSV files, only needed when a grade file lost an unchanged activity
+    reread_rows: Dict[str, Dict[str, Dict[str, str]]] = {}
+    # Grade files whose shards were written in this run
+    sharded_files: set = set()
     
     # Process changes for each grade
     for grade, changes in changes_by_grade.items():
         grade_filename = get_grade_filename(grade)
         grade_file_path = os.path.join(output_dir, grade_filename)
+        csv_ids = csv_activity_ids_by_grade.get(grade, set())
+        
+        # A grade file that is missing or differs from the one the last sync wrote is rebuilt
+        # from all rows, so deleted, reverted or corrupted files are repaired
+        grade_file_intact = (not incremental or grade_file_matches_manifest(grade_file_path, manifest))
+        if incremental and not grade_file_intact:
+            print(f"\n🩹 {grade}: {grade_file_path} is missing or changed since last sync, rebuilding it")
+            instrumentation.count("grades_repaired")
+        
+        if incremental and grade_file_intact and not changes["new"] and (
+                not allow_deletion or csv_ids == set(manifest["rows"].get(grade, {}))):
+            print(f"\n⏭️  {grade}: no changes since last sync, leaving {grade_file_path} untouched")
+            instrumentation.count("grades_skipped")
+            continue
         
         # Load existing data
-        existing_data = load_existing_grade_data(grade_file_path)
+        with instrumentation.stage("load"):
+            try:
+                existing_data = load_existing_grade_data(grade_file_path)
+            except json.JSONDecodeError as e:
+                if grade_file_intact:
+                    raise
+                print(f"⚠️  {grade_file_path} is not valid JSON ({e}), rebuilding it from the CSV rows")
+                existing_data = {"grade": grade, "total_activities": 0, "activities": []}
+            existing_encoded = is_encoded(existing_data)
+            existing_data = decode_grade_data(existing_data)
         existing_activities = existing_data.get("activities", [])
         
-        # Create a map of existing activities by ID for quick lookup
-        existing_by_id = {activity["id"]: activity for activity in existing_activities}
+        with instrumentation.stage("merge"):
+            # Index existing activities once by ID for quick lookup
+            existing_by_id = index_by_id(existing_activities)
+            
+            # Unchanged rows are only parsed if their activity is missing from the grade file
+            # (or the whole file is being repaired)
+            for activity_id, source in unchanged_by_grade.get(grade, {}).items():
+                if activity_id in existing_by_id and grade_file_intact:
+                    continue
+                if isinstance(source, str):
+                    if source not in reread_rows:
+                        reread_rows[source] = {row.get('ID', ''): row for row in read_csv_rows(source)}
+                    row = reread_rows[source].get(activity_id)
+                else:
+                    row = source
+                if row:
+                    changes["new"].append(build_activity(row, grade))
         
         print(f"\n🎯 Processing grade: {grade}")
         print(f"   📁 File: {grade_file_path}")
         print(f"   📊 Existing activities: {len(existing_activities)}")
-        print(f"   📄 CSV activities: {len(csv_activity_ids_by_grade.get(grade, set()))}")
+        print(f"   📄 CSV activities: {len(csv_ids)}")
         
-        # Separate new activities from updates
-        new_activities = []
-        updated_activities = []
-        deleted_activities = []
+        with instrumentation.stage("merge"):
+            changeset = build_changeset(existing_activities, changes["new"], csv_ids, allow_deletion)
         
-        for activity in changes["new"]:
-            if activity["id"] in existing_by_id:
-                # This is an update to an existing activity
-                updated_activities.append(activity)
-                print(f"🔄 Found existing activity to update: {activity['id']} - {activity['title']}")
-            else:
-                # This is a new activity
-                new_activities.append(activity)
-                print(f"➕ Found new activity to add: {activity['id']} - {activity['title']}")
-        
-        # Find activities that exist in JSON but not in CSV (these should be deleted)
-        csv_ids = csv_activity_ids_by_grade.get(grade, set())
-        if allow_deletion:
-            for existing_activity in existing_activities:
-                if existing_activity["id"] not in csv_ids:
-                    deleted_activities.append(existing_activity)
-                    print(f"🗑️  Found activity to delete: {existing_activity['id']} - {existing_activity.get('title', 'No Title')}")
-        else:
+        for old_activity, new_activity in changeset.updated:
+            print(f"🔄 Updated activity {new_activity['id']}: {new_activity['title']}")
+            if not dry_run:  # Only show detailed changes in non-dry-run mode to avoid spam
+                show_activity_differences(old_activity, new_activity, new_activity['id'])
+        for new_activity in changeset.added:
+            print(f"➕ Added new activity {new_activity['id']}: {new_activity['title']}")
+        for deleted in changeset.deleted:
+            print(f"🗑️  Found activity to delete: {deleted['id']} - {deleted.get('title', 'No Title')}")
+        for duplicate in changeset.duplicates:
+            print(f"⚠️  Ignoring duplicate CSV row for {duplicate['id']}: {duplicate.get('title', 'No Title')}")
+        for duplicate in changeset.existing_duplicates:
+            print(f"⚠️  Duplicate ID {duplicate['id']} in {grade_file_path}, keeping both: "
+                  f"{duplicate.get('title', 'No Title')}")
+        if not allow_deletion:
             print(f"ℹ️  Deletion disabled - keeping all existing activities")
         
-        # Update existing activities and add new ones
-        final_activities = []
-        
-        # Process existing activities, replace with updated version if available, skip deleted ones
-        for existing_activity in existing_activities:
-            activity_id = existing_activity["id"]
-            
-            # Skip activities that should be deleted (only if deletion is allowed)
-            if allow_deletion and activity_id not in csv_ids:
-                continue
-            
-            updated_activity = next((a for a in updated_activities if a["id"] == activity_id), None)
-            
-            if updated_activity:
-                # Replace existing activity with updated data from CSV
-                final_activities.append(updated_activity)
-                print(f"🔄 Updated activity {activity_id}: {updated_activity['title']}")
-                if not dry_run:  # Only show detailed changes in non-dry-run mode to avoid spam
-                    show_activity_differences(existing_activity, updated_activity, activity_id)
-            else:
-                # Keep existing activity as-is (it exists in CSV but wasn't changed, or deletion is disabled)
-                final_activities.append(existing_activity)
-        
-        # Add all new activities
-        for new_activity in new_activities:
-            final_activities.append(new_activity)
-            print(f"➕ Added new activity {new_activity['id']}: {new_activity['title']}")
+        final_activities = changeset.final_activities
         
         # Create updated grade data
         updated_grade_data = {
@@ -320,34 +484,76 @@ def update_activities_from_csv(csv_files: List[str],
         }
         
         # Show summary
+        summary = changeset.summary()
         print(f"\n📊 Summary for {grade}:")
-        print(f"   📈 New activities: {len(new_activities)}")
-        print(f"   🔄 Updated activities: {len(updated_activities)}")
-        print(f"   �️  Deleted activities: {len(deleted_activities)}")
-        print(f"   �📝 Total activities: {len(final_activities)} (was {len(existing_activities)})")
+        print(f"   📈 New activities: {summary['added']}")
+        print(f"   🔄 Updated activities: {summary['updated']}")
+        print(f"   ✔️  Unchanged activities: {summary['unchanged']}")
+        print(f"   🗑️  Deleted activities: {summary['deleted']}")
+        if summary['duplicates'] or summary['existing_duplicates']:
+            print(f"   ⚠️  Duplicate IDs: {summary['duplicates']} in CSV (ignored), "
+                  f"{summary['existing_duplicates']} in grade file (kept)")
+        print(f"   📝 Total activities: {summary['total']} (was {len(existing_activities)})")
         
-        if deleted_activities:
+        if changeset.deleted:
             print(f"   📋 Deleted activity details:")
-            for deleted in deleted_activities[:5]:  # Show first 5 deleted activities
+            for deleted in changeset.deleted[:5]:  # Show first 5 deleted activities
                 print(f"      - {deleted['id']}: {deleted.get('title', 'No Title')}")
-            if len(deleted_activities) > 5:
-                print(f"      ... and {len(deleted_activities) - 5} more")
+            if len(changeset.deleted) > 5:
+                print(f"      ... and {len(changeset.deleted) - 5} more")
         
         if dry_run:
             print(f"   🧪 [DRY RUN] Would save to: {grade_file_path}")
             continue
         
+        if shards_dir:
+            with instrumentation.stage("shards"):
+                write_grade_shards(updated_grade_data, os.path.basename(grade_file_path), shards_dir, compact)
+            sharded_files.add(grade_filename)
+        
+        if incremental:
+            grade_hashes = manifest["rows"].setdefault(grade, {})
+            grade_hashes.update(row_hashes_by_grade.get(grade, {}))
+            if allow_deletion:
+                for activity_id in [a for a in grade_hashes if a not in csv_ids]:
+                    del grade_hashes[activity_id]
+            
+            if updated_grade_data == existing_data and existing_encoded == encoded and os.path.exists(grade_file_path):
+                print(f"   ⏭️  No changes, leaving {grade_file_path} untouched")
+                record_grade_file(grade_file_path, manifest)
+                continue
+        
+        with instrumentation.stage("serialize"):
+            serialized = serialize_json(encode_grade_data(updated_grade_data) if encoded else updated_grade_data, compact)
+        if has_content(grade_file_path, serialized.encode('utf-8')):
+            print(f"   ⏭️  File content unchanged, leaving {grade_file_path} untouched")
+            instrumentation.count("files_unchanged")
+            if incremental:
+                record_grade_file(grade_file_path, manifest)
+            continue
+        
         # Create backup if requested
         if create_backup and os.path.exists(grade_file_path):
             backup_path = backup_file(grade_file_path)
             print(f"   💾 Backup created: {backup_path}")
         
-        # Write updated data
-        with open(grade_file_path, 'w', encoding='utf-8') as f:
-            json.dump(updated_grade_data, f, ensure_ascii=False, indent=2)
+        # Write updated data (atomically, so a crash never leaves a truncated file)
+        write_text_atomic(grade_file_path, serialized)
+        if incremental:
+            record_grade_file(grade_file_path, manifest)
         
         print(f"   ✅ Updated {grade_file_path}")
     
+    if shards_dir and not dry_run:
+        # Grades skipped above (unchanged or not in the CSV files) still get their shards
+        with instrumentation.stage("shards"):
+            refresh_grade_shards(output_dir, shards_dir, compact, sharded_files)
+    
+    if incremental and not dry_run:
+        manifest["files"].update(file_entries)
+        save_sync_manifest(manifest_path, manifest)
+        print(f"\n🧾 Sync manifest saved: {manifest_path}")
+    
     if dry_run:
         print(f"\n🧪 DRY RUN completed. No files were modified.")
     else:
@@ -361,6 +567,7 @@ Examples:
   python update_activities_from_csv.py activities.csv
   python update_activities_from_csv.py *.csv --backup
   python update_activities_from_csv.py activities.csv --grade "Andre årstrinn" --dry-run
+  python update_activities_from_csv.py scripts/leker-Json-*.trinn.tsv --incremental
         ''',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
@@ -376,6 +583,18 @@ Examples:
                        help='Show what would be changed without making actual changes')
     parser.add_argument('--no-delete', action='store_true',
                        help='Prevent deletion of activities not found in CSV (only add/update)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only parse and write rows and files that changed since the last incremental sync')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Parse rows in N worker processes (0 = one per CPU core, default: 1)')
+    parser.add_argument('--compact', action='store_true',
+                       help='Write grade files without indentation or spaces (for deployment builds)')
+    parser.add_argument('--sharded', action='store_true',
+                       help='Also write a summary per grade and a content-hashed detail file per activity '
+                            '(to the shards folder next to the output directory)')
+    parser.add_argument('--encoded', action='store_true',
+                       help='Store learning goal, location, tools and groupsize in a string table per grade file')
+    instrumentation.add_instrumentation_arguments(parser)
     
     args = parser.parse_args()
     
@@ -396,15 +615,27 @@ Examples:
         print(f"🧪 DRY RUN mode - no files will be modified")
     if args.no_delete:
         print(f"🚫 Deletion disabled - will only add and update activities")
+    if args.incremental:
+        print(f"⚡ Incremental mode - unchanged rows and files are skipped")
+    jobs = resolve_jobs(args.jobs)
+    if jobs > 1:
+        print(f"🧵 Parsing with {jobs} worker processes")
     print()
     
-    update_activities_from_csv(
+    instrumentation.run_instrumented(
+        "update_activities_from_csv", args,
+        update_activities_from_csv,
         args.csv_files,
         args.output_dir,
         args.force_grade,
         args.backup,
         args.dry_run,
-        not args.no_delete  # allow_deletion is opposite of no_delete
+        not args.no_delete,  # allow_deletion is opposite of no_delete
+        args.incremental,
+        jobs,
+        args.compact,
+        default_shards_dir(args.output_dir) if args.sharded else None,
+        args.encoded
     )
 
 if __name__ == "__main__":
@@ -5,113 +5,214 @@ The script maps printout files to activities based on activity IDs found in the
 
 Supported file formats:
 - Images: .png, .jpg, .jpeg, .gif, .svg
-- Documents: .docx
+- Documents: .docx, .pdf
+
+For PNG/JPEG printouts, resized preview and thumbnail variants (plus WebP
+versions) are built in public/printOuts/variants when Pillow is installed.
+Their dimensions and byte sizes are stored per file in content.extra_meta,
+keyed by the same paths as content.extra. See printout_images.py.
+
+For .docx printouts an HTML preview is rendered in public/printOuts/previews
+and listed in content.extra right after the .docx. See docx_previews.py.
 
 File naming convention:
 - With descriptor: {activityId}_{descriptor}.{extension} (e.g., 20502_bamse.png)
 - Without descriptor: {activityId}.{extension} (e.g., 20301.png)
 
+All grade files are updated in one batch from a single scan of the folder;
+only files in which an activity's printouts actually changed are rewritten.
+
 Run command in terminal: python3 scripts/update_printouts.py
+                          python3 scripts/update_printouts.py --jobs 4      # render variants in parallel
+                          python3 scripts/update_printouts.py --no-images   # skip image variants
+                          python3 scripts/update_printouts.py --no-previews # skip .docx previews
+                          python3 scripts/update_printouts.py --metrics-json metrics/printouts.json
 """
 
 import os
 import json
 import glob
-from typing import Dict, List
+import argparse
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import instrumentation
+from docx_previews import build_docx_previews, is_lock_file
+from grade_encoding import decode_grade_data, encode_grade_data, is_encoded
+from json_writer import is_compact_json, write_json_atomic
+from parallel_ingest import resolve_jobs
+from printout_images import get_image_metadata
+
+PRINTOUTS_DIR = "public/printOuts"
+GRADES_GLOB = "public/activityData/grades/*.json"
+SUPPORTED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.docx', '.pdf')
+
+def get_activity_id(filename: str) -> str:
+    """Return the activity ID of a printout file name ("A0502_bamse.png" -> "A0502")."""
+    # Number before "_" or entire filename without extension if no "_"
+    if "_" in filename:
+        return filename.split("_")[0]
+    return os.path.splitext(filename)[0]
 
-def get_printout_files() -> Dict[str, List[str]]:
+def is_printout_file(filename: str) -> bool:
+    """Return True for printout file types, leaving out Office lock files (~$name.docx)."""
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS) and not is_lock_file(filename)
+
+def get_printout_files(printouts_dir: str = PRINTOUTS_DIR) -> Dict[str, List[str]]:
     """
-    Scan the printOuts folder and group files by activity ID.
-    Returns a dictionary mapping activity IDs to lists of relative file paths.
+    Scan the printOuts folder once and index the files by activity ID.
+    Returns a dictionary mapping activity IDs to sorted lists of relative file paths.
     """
-    printouts_dir = "public/printOuts"
-    printout_mapping = {}
+    printout_mapping = defaultdict(list)
+    relative_dir = os.path.basename(os.path.normpath(printouts_dir))
     
-    # Get all files in the printOuts directory
-    printout_files = glob.glob(os.path.join(printouts_dir, "*"))
+    with os.scandir(printouts_dir) as entries:
+        filenames = sorted(entry.name for entry in entries
+                           if entry.is_file() and is_printout_file(entry.name))
     
-    for file_path in printout_files:
-        filename = os.path.basename(file_path)
-        
-        # Skip if not a supported file type (images or docx)
-        if not filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.docx')):
+    for filename in filenames:
+        # Relative path from the public folder
+        printout_mapping[get_activity_id(filename)].append(f"{relative_dir}/{filename}")
+    
+    return dict(printout_mapping)
+
+def add_docx_previews(printout_mapping: Dict[str, List[str]], previews: Dict[str, str]) -> Dict[str, List[str]]:
+    """Return a copy of the mapping with each .docx preview listed right after its .docx."""
+    with_previews = {}
+    for activity_id, files in printout_mapping.items():
+        with_previews[activity_id] = []
+        for path in files:
+            with_previews[activity_id].append(path)
+            if path in previews:
+                with_previews[activity_id].append(previews[path])
+    return with_previews
+
+def apply_printouts(data: Dict[str, Any], printout_mapping: Dict[str, List[str]],
+                    image_metadata: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+    """
+    Set content.extra (and content.extra_meta, with image_metadata) of the
+    activities in one loaded grade file. Returns the IDs of the activities
+    that actually changed.
+    """
+    changed_ids = []
+    
+    for activity in data.get('activities', []):
+        activity_id = activity.get('id', '')
+        if activity_id not in printout_mapping:
             continue
-            
-        # Extract activity ID (number before "_" or entire filename without extension if no "_")
-        if "_" in filename:
-            activity_id = filename.split("_")[0]
-        else:
-            activity_id = os.path.splitext(filename)[0]
         
-        # Create relative path from public folder
-        relative_path = f"printOuts/{filename}"
+        content = activity.setdefault('content', {})
+        new_extra = printout_mapping[activity_id]
+        changed = content.get('extra') != new_extra
+        content['extra'] = list(new_extra)
         
-        if activity_id not in printout_mapping:
-            printout_mapping[activity_id] = []
+        if image_metadata is not None:
+            extra_meta = {path: image_metadata[path] for path in new_extra if path in image_metadata}
+            changed = changed or content.get('extra_meta') != (extra_meta or None)
+            if extra_meta:
+                content['extra_meta'] = extra_meta
+            else:
+                content.pop('extra_meta', None)
         
-        printout_mapping[activity_id].append(relative_path)
+        if changed:
+            changed_ids.append(activity_id)
     
-    return printout_mapping
+    return changed_ids
 
-def update_grade_file(file_path: str, printout_mapping: Dict[str, List[str]]) -> int:
+def update_grade_files(grade_files: List[str], printout_mapping: Dict[str, List[str]], compact: bool = False,
+                       image_metadata: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, List[str]]:
     """
-    Update a single grade JSON file with printout paths.
-    Returns the number of activities updated.
+    Apply the printout index to all grade files in one batch and rewrite only
+    the files with changed activities. Files that are already compact stay
+    compact; compact=True compacts the others too. Returns the changed
+    activity IDs per file.
     """
-    print(f"Processing {file_path}...")
+    changes = {}
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    updated_count = 0
-    
-    for activity in data.get('activities', []):
-        activity_id = activity.get('id', '')
+    for file_path in sorted(grade_files):
+        with instrumentation.stage("load"):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            data = json.loads(text)
+            file_compact = compact or is_compact_json(text)
+            encoded = is_encoded(data)
+            data = decode_grade_data(data)
         
-        if activity_id in printout_mapping:
-            # Update the extra field with printout paths
-            old_extra = activity.get('content', {}).get('extra', [])
-            new_extra = printout_mapping[activity_id]
-            
-            if 'content' not in activity:
-                activity['content'] = {}
-            
-            activity['content']['extra'] = new_extra
-            updated_count += 1
-            
-            print(f"  Updated activity {activity_id}: {activity.get('title', 'Unknown')}")
-            print(f"    Old extra: {old_extra}")
-            print(f"    New extra: {new_extra}")
-    
-    # Write the updated data back to the file
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        with instrumentation.stage("apply"):
+            changed_ids = apply_printouts(data, printout_mapping, image_metadata)
+        instrumentation.count("activities_changed", len(changed_ids))
+        if not changed_ids:
+            instrumentation.count("files_unchanged")
+            continue
+        
+        titles = {activity.get('id'): activity.get('title', 'Unknown') for activity in data.get('activities', [])}
+        print(f"📝 {file_path}: {len(changed_ids)} activities changed")
+        for activity_id in changed_ids:
+            print(f"  Updated activity {activity_id}: {titles.get(activity_id)} ({len(printout_mapping[activity_id])} files)")
+        
+        # Encoded grade files stay encoded
+        write_json_atomic(file_path, encode_grade_data(data) if encoded else data, file_compact)
+        changes[file_path] = changed_ids
     
-    return updated_count
+    return changes
 
-def main():
-    """Main function to update all grade files."""
+def update_grade_file(file_path: str, printout_mapping: Dict[str, List[str]], compact: bool = False,
+                      image_metadata: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+    """
+    Update a single grade JSON file with printout paths.
+    Returns the number of activities updated.
+    """
+    return len(update_grade_files([file_path], printout_mapping, compact, image_metadata).get(file_path, []))
+
+def update_printouts(args: argparse.Namespace) -> Dict[str, List[str]]:
+    """Scan printouts, build previews and image variants, and update all grade files."""
     print("Starting printout mapping update...")
     
-    # Get mapping of activity IDs to printout files
-    printout_mapping = get_printout_files()
+    # One scan of the printOuts folder: activity ID -> printout files
+    with instrumentation.stage("scan"):
+        printout_mapping = get_printout_files()
     
-    print(f"Found printouts for {len(printout_mapping)} activities:")
-    for activity_id, files in printout_mapping.items():
-        print(f"  Activity {activity_id}: {len(files)} files")
-        for file in files:
-            print(f"    - {file}")
+    total_files = sum(len(files) for files in printout_mapping.values())
+    instrumentation.count("printouts", total_files)
+    print(f"Found {total_files} printouts for {len(printout_mapping)} activities")
+    if args.verbose:
+        for activity_id, files in printout_mapping.items():
+            print(f"  Activity {activity_id}: {', '.join(files)}")
+    
+    jobs = resolve_jobs(args.jobs)
+    if not args.no_previews:
+        with instrumentation.stage("previews"):
+            printout_mapping = add_docx_previews(printout_mapping, build_docx_previews(PRINTOUTS_DIR, jobs))
     
-    # Find all grade JSON files
-    grade_files = glob.glob("public/activityData/grades/*.json")
+    image_metadata = None
+    if not args.no_images:
+        with instrumentation.stage("images"):
+            image_metadata = get_image_metadata(PRINTOUTS_DIR, jobs)
     
-    total_updated = 0
+    grade_files = glob.glob(GRADES_GLOB)
+    changes = update_grade_files(grade_files, printout_mapping, args.compact, image_metadata)
     
-    for grade_file in grade_files:
-        updated_count = update_grade_file(grade_file, printout_mapping)
-        total_updated += updated_count
+    total_updated = sum(len(ids) for ids in changes.values())
+    print(f"\nCompleted! Updated {total_updated} activities, rewrote {len(changes)} of {len(grade_files)} grade files.")
+    return changes
+
+def main():
+    """Main function to update all grade files."""
+    parser = argparse.ArgumentParser(description='Update the extra field of activities with printout file paths')
+    parser.add_argument('--compact', action='store_true',
+                       help='Write grade files without indentation or spaces (for deployment builds)')
+    parser.add_argument('--no-images', action='store_true',
+                       help='Do not build preview/thumbnail variants of printout images')
+    parser.add_argument('--no-previews', action='store_true',
+                       help='Do not render HTML previews of .docx printouts')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Worker processes for rendering variants and previews (0 = one per CPU core, default: 1)')
+    parser.add_argument('--verbose', action='store_true',
+                       help='List every printout file found')
+    instrumentation.add_instrumentation_arguments(parser)
+    args = parser.parse_args()
     
-    print(f"\nCompleted! Updated {total_updated} activities across {len(grade_files)} grade files.")
+    instrumentation.run_instrumented("update_printouts", args, update_printouts, args)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Validate the grade JSON files in one pass.
+
+Checks every public/activityData/grades/*.json file for:
+- schema: the GradeData/GradeActivity shape in public/activityData/types.ts
+  (required fields, field types); a total_activities that does not match the
+  activity count is a warning, since the app counts the activities itself
+- duplicate activity IDs, within and across grades
+- learning goals: the grade must be in learning_goals_by_grade.json and the
+  goal number in the activity ID (A0301 -> goal 3, BA01 -> goal 10, as read
+  by GetActivity.tsx) must exist for that grade
+- dangling printouts: paths in content.extra (and variant paths in
+  content.extra_meta) that do not exist under public/
+- time: must be a whole number of minutes ("15")
+
+Files are checked in parallel when the dataset is large (or with --jobs).
+Exits with status 1 if there are errors (or warnings, with --strict).
+
+Run command in terminal: python3 scripts/validate_grades.py
+                          python3 scripts/validate_grades.py --format json > validation.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from curriculum_index import LEARNING_GOALS_FILE
+from grade_detection import goal_number_from_id
+from grade_encoding import decode_grade_data
+from parallel_ingest import ordered_map, resolve_jobs
+
+GRADES_GLOB = "public/activityData/grades/*.json"
+PUBLIC_DIR = "public"
+# Below this many bytes of grade data, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# GradeActivity in public/activityData/types.ts
+REQUIRED_STRING_FIELDS = ["id", "title", "time", "location", "tools", "groupsize", "learning_goal"]
+REQUIRED_CONTENT_FIELDS = ["introduction", "main", "examples", "reflection", "tips"]
+OPTIONAL_CONTENT_FIELDS = ["extra"]
+
+TIME_PATTERN = re.compile(r'^\d+$')
+# A content.extra entry that names a file (printOuts/A0502_bamse.png) rather than free text
+FILE_PATH_PATTERN = re.compile(r'^/?[\w./-]+\.[A-Za-z0-9]{2,5}$')
+
+def make_issue(severity: str, code: str, file_path: str, message: str,
+               activity_id: Optional[str] = None, field: Optional[str] = None) -> Dict[str, Any]:
+    return {"severity": severity, "code": code, "file": file_path,
+            "activity_id": activity_id, "field": field, "message": message}
+
+def is_text_list(value: Any) -> bool:
+    """string[] | string"""
+    return isinstance(value, str) or (isinstance(value, list) and all(isinstance(item, str) for item in value))
+
+def check_printout(path: str, public_dir: str) -> bool:
+    return os.path.exists(os.path.join(public_dir, path.lstrip('/')))
+
+def validate_activity(activity: Any, file_path: str, goals: Optional[List[str]], public_dir: str) -> List[Dict[str, Any]]:
+    """Check one activity; returns its issues."""
+    if not isinstance(activity, dict):
+        return [make_issue("error", "schema", file_path, "Activity is not an object")]
+
+    issues = []
+    activity_id = activity.get("id") if isinstance(activity.get("id"), str) else None
+
+    for field in REQUIRED_STRING_FIELDS:
+        if field not in activity:
+            issues.append(make_issue("error", "schema", file_path, f"Missing field '{field}'", activity_id, field))
+        elif not isinstance(activity[field], str):
+            issues.append(make_issue("error", "schema", file_path,
+                                     f"'{field}' must be a string, got {type(activity[field]).__name__}",
+                                     activity_id, field))
+        elif field in ("id", "title") and not activity[field].strip():
+            issues.append(make_issue("error", "schema", file_path, f"'{field}' is empty", activity_id, field))
+
+    content = activity.get("content")
+    if not isinstance(content, dict):
+        issues.append(make_issue("error", "schema", file_path, "Missing or invalid 'content' object", activity_id, "content"))
+        content = {}
+    for field in REQUIRED_CONTENT_FIELDS + OPTIONAL_CONTENT_FIELDS:
+        if field not in content:
+            if field in REQUIRED_CONTENT_FIELDS:
+                issues.append(make_issue("error", "schema", file_path, f"Missing content field '{field}'",
+                                         activity_id, f"content.{field}"))
+        elif not is_text_list(content[field]):
+            issues.append(make_issue("error", "schema", file_path,
+                                     f"content.{field} must be a string or a list of strings",
+                                     activity_id, f"content.{field}"))
+
+    time_value = activity.get("time")
+    if isinstance(time_value, str) and not TIME_PATTERN.match(time_value.strip()):
+        issues.append(make_issue("error", "time", file_path,
+                                 f"Time {time_value!r} is not a whole number of minutes", activity_id, "time"))
+
+    if isinstance(activity.get("learning_goal"), str) and not activity["learning_goal"].strip():
+        issues.append(make_issue("warning", "learning_goal", file_path, "Learning goal is empty",
+                                 activity_id, "learning_goal"))
+    if goals is not None and activity_id:
+        goal_number = goal_number_from_id(activity_id)
+        if goal_number is None:
+            issues.append(make_issue("warning", "learning_goal", file_path,
+                                     "Activity ID does not encode a learning goal number", activity_id, "id"))
+        elif goal_number > len(goals):
+            issues.append(make_issue("error", "learning_goal", file_path,
+                                     f"Learning goal {goal_number} does not exist for this grade "
+                                     f"({len(goals)} goals in learning_goals_by_grade.json)", activity_id, "id"))
+        goal_id = activity.get("learning_goal_id")
+        if goal_number is not None and isinstance(goal_id, str) and goal_id.rsplit('-', 1)[-1].isdigit() \
+                and int(goal_id.rsplit('-', 1)[-1]) != goal_number:
+            issues.append(make_issue("warning", "learning_goal", file_path,
+                                     f"Learning goal text is goal {goal_id}, but the ID says goal {goal_number}",
+                                     activity_id, "learning_goal_id"))
+
+    extra = content.get("extra", [])
+    for path in [extra] if isinstance(extra, str) else extra if isinstance(extra, list) else []:
+        if isinstance(path, str) and FILE_PATH_PATTERN.match(path) and not check_printout(path, public_dir):
+            issues.append(make_issue("error", "dangling_printout", file_path,
+                                     f"Printout {path} does not exist", activity_id, "content.extra"))
+    extra_meta = content.get("extra_meta", {})
+    if isinstance(extra_meta, dict):
+        for source, metadata in extra_meta.items():
+            variants = metadata.get("variants", {}) if isinstance(metadata, dict) else {}
+            for variant in variants.values():
+                path = variant.get("path", "") if isinstance(variant, dict) else ""
+                if path and not check_printout(path, public_dir):
+                    issues.append(make_issue("warning", "dangling_printout", file_path,
+                                             f"Image variant {path} of {source} does not exist "
+                                             f"(run scripts/update_printouts.py)", activity_id, "content.extra_meta"))
+    return issues
+
+def validate_grade_file(task: Tuple[str, Dict[str, List[str]], str]) -> Dict[str, Any]:
+    """
+    Validate one grade file. Takes (file_path, learning_goals_by_grade, public_dir)
+    and returns its grade, activity IDs and issues. Runs in worker processes.
+    """
+    file_path, goals_by_grade, public_dir = task
+    result = {"file": file_path, "grade": None, "activities": 0, "ids": [], "issues": []}
+    issues = result["issues"]
+
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        issues.append(make_issue("error", "json", file_path, f"Cannot read JSON: {e}"))
+        return result
+    try:
+        data = decode_grade_data(data) if isinstance(data, dict) else data
+    except (IndexError, KeyError, TypeError) as e:
+        issues.append(make_issue("error", "schema", file_path, f"Invalid string table in encoded grade file: {e}"))
+        return result
+    if not isinstance(data, dict):
+        issues.append(make_issue("error", "schema", file_path, "Grade file is not an object"))
+        return result
+
+    grade = data.get("grade")
+    activities = data.get("activities")
+    if not isinstance(grade, str):
+        issues.append(make_issue("error", "schema", file_path, "Missing or invalid 'grade'", field="grade"))
+    if not isinstance(activities, list):
+        issues.append(make_issue("error", "schema", file_path, "Missing or invalid 'activities' list", field="activities"))
+        activities = []
+    if not isinstance(data.get("total_activities"), int):
+        issues.append(make_issue("error", "schema", file_path, "Missing or invalid 'total_activities'",
+                                 field="total_activities"))
+    elif data["total_activities"] != len(activities):
+        issues.append(make_issue("warning", "total_activities", file_path,
+                                 f"File states {data['total_activities']} activities, but has {len(activities)}",
+                                 field="total_activities"))
+
+    goals = goals_by_grade.get(grade) if isinstance(grade, str) else None
+    if isinstance(grade, str) and goals is None:
+        issues.append(make_issue("error", "learning_goal", file_path,
+                                 f"Grade {grade!r} is not in learning_goals_by_grade.json", field="grade"))
+
+    result["grade"] = grade
+    result["activities"] = len(activities)
+    for activity in activities:
+        issues.extend(validate_activity(activity, file_path, goals, public_dir))
+        if isinstance(activity, dict) and isinstance(activity.get("id"), str):
+            result["ids"].append(activity["id"])
+    return result
+
+def find_duplicates(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Report activity IDs that occur more than once, within or across grade files."""
+    seen: Dict[str, str] = {}
+    issues = []
+    for result in results:
+        for activity_id in result["ids"]:
+            if activity_id in seen:
+                where = "twice in this file" if seen[activity_id] == result["file"] else f"also in {seen[activity_id]}"
+                issues.append(make_issue("error", "duplicate_id", result["file"],
+                                         f"Duplicate activity ID ({where})", activity_id, "id"))
+            else:
+                seen[activity_id] = result["file"]
+    return issues
+
+def validate(grade_files: List[str], goals_by_grade: Dict[str, List[str]], public_dir: str,
+             jobs: Optional[int] = None) -> Dict[str, Any]:
+    """Validate all grade files and return the machine-readable report."""
+    if jobs is None:
+        total_bytes = sum(os.path.getsize(path) for path in grade_files)
+        jobs = min(len(grade_files), resolve_jobs(0)) if total_bytes >= PARALLEL_MIN_BYTES else 1
+    tasks = [(path, goals_by_grade, public_dir) for path in grade_files]
+    results = list(ordered_map(validate_grade_file, tasks, max(jobs, 1)))
+
+    issues = [issue for result in results for issue in result["issues"]]
+    issues.extend(find_duplicates(results))
+    errors = sum(1 for issue in issues if issue["severity"] == "error")
+    return {
+        "ok": errors == 0,
+        "files": len(results),
+        "activities": sum(result["activities"] for result in results),
+        "counts": {result["grade"] or result["file"]: result["activities"] for result in results},
+        "errors": errors,
+        "warnings": len(issues) - errors,
+        "issues": issues,
+    }
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"🔎 Validated {report['activities']} activities in {report['files']} grade files")
+    for grade, count in report["counts"].items():
+        print(f"   {grade}: {count} activities")
+    for issue in report["issues"]:
+        icon = "❌" if issue["severity"] == "error" else "⚠️ "
+        location = f"{issue['file']}" + (f" [{issue['activity_id']}]" if issue["activity_id"] else "")
+        print(f"{icon} {location}: {issue['message']}")
+    if report["ok"]:
+        print(f"✅ No errors ({report['warnings']} warnings)")
+    else:
+        print(f"❌ {report['errors']} errors, {report['warnings']} warnings")
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate the grade JSON files')
+    parser.add_argument('--grades-glob', default=GRADES_GLOB,
+                       help=f'Grade files to check (default: {GRADES_GLOB})')
+    parser.add_argument('--learning-goals', default=LEARNING_GOALS_FILE,
+                       help=f'Learning goals per grade (default: {LEARNING_GOALS_FILE})')
+    parser.add_argument('--public-dir', default=PUBLIC_DIR,
+                       help=f'Folder printout paths are relative to (default: {PUBLIC_DIR})')
+    parser.add_argument('--format', choices=['text', 'json'], default='text',
+                       help='Output format (default: text)')
+    parser.add_argument('--jobs', type=int,
+                       help='Worker processes (0 = one per CPU core; default: parallel only for large datasets)')
+    parser.add_argument('--strict', action='store_true', help='Fail on warnings too')
+    args = parser.parse_args()
+
+    grade_files = sorted(glob.glob(args.grades_glob))
+    with open(args.learning_goals, 'r', encoding='utf-8') as f:
+        goals_by_grade = json.load(f)
+
+    jobs = resolve_jobs(args.jobs) if args.jobs is not None else None
+    report = validate(grade_files, goals_by_grade, args.public_dir, jobs)
+
+    if args.format == 'json':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report)
+
+    if not report["ok"] or (args.strict and report["warnings"]):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Watch the activity sources and rebuild only what a change affects.
+
+Watched sources:
+- public/printOuts/*                   -> updates content.extra (and extra_meta) of the
+                                          activities whose ID the changed files start with
+- scripts/leker-Json-{n}.trinn.tsv     -> incremental resync of that TSV, then printouts
+                                          are reapplied to {n}.grade.json
+
+A resync only adds and updates activities; activities missing from the sheet
+are kept unless --allow-delete is given, so saving a half-edited sheet never
+removes activities.
+
+The folders are polled (no external service or package needed). Changes are
+debounced: a rebuild starts once no file has changed for --debounce seconds,
+so copying a batch of printouts triggers one rebuild.
+
+Run command in terminal: python3 scripts/watch_sources.py
+                          python3 scripts/watch_sources.py --interval 0.2 --debounce 0.3
+Stop with Ctrl+C.
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from docx_previews import build_docx_previews
+from grade_detection import GRADE_NAMES, grade_from_activity_id
+from json_writer import is_compact_file
+from printout_images import get_image_metadata
+from update_activities_from_csv import get_grade_filename, update_activities_from_csv
+from update_printouts import (PRINTOUTS_DIR, add_docx_previews, get_activity_id, get_printout_files,
+                              is_printout_file, update_grade_files)
+
+TSV_PATTERN = "scripts/leker-Json-*.trinn.tsv"
+GRADES_DIR = "public/activityData/grades"
+TSV_GRADE_PATTERN = re.compile(r'-(\d+)\.trinn\.tsv$')
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.5
+
+# path -> (mtime_ns, size)
+Snapshot = Dict[str, Tuple[int, int]]
+
+def take_snapshot(printouts_dir: str, tsv_pattern: str) -> Snapshot:
+    """Record modification time and size of every watched file."""
+    snapshot = {}
+    paths = glob.glob(tsv_pattern)
+    if os.path.isdir(printouts_dir):
+        with os.scandir(printouts_dir) as entries:
+            paths.extend(entry.path for entry in entries
+                         if entry.is_file() and is_printout_file(entry.name))
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue  # removed between listing and stat
+        snapshot[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def changed_paths(before: Snapshot, after: Snapshot) -> Set[str]:
+    """Return paths that were added, modified or removed."""
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+def grade_file_for_tsv(tsv_path: str, grades_dir: str) -> Optional[str]:
+    """Return the grade file a leker-Json-{n}.trinn.tsv sheet syncs into, if known."""
+    match = TSV_GRADE_PATTERN.search(os.path.basename(tsv_path))
+    if match is None or int(match.group(1)) not in GRADE_NAMES:
+        return None
+    return os.path.join(grades_dir, get_grade_filename(GRADE_NAMES[int(match.group(1))]))
+
+def grade_file_for_activity(activity_id: str, grades_dir: str) -> Optional[str]:
+    """Return the grade file an activity ID belongs to (A -> 2.grade.json ... F -> 7.grade.json)."""
+    grade = grade_from_activity_id(activity_id)
+    return os.path.join(grades_dir, get_grade_filename(grade)) if grade else None
+
+def apply_printout_changes(activity_ids: Optional[Set[str]], grade_files: Set[str], args,
+                           changed_files: Set[str] = frozenset()) -> None:
+    """
+    Reapply printouts for the given activities (None = all) to the given grade
+    files. For given activities only their printouts and the changed files
+    (so removed files drop out of the caches) are hashed and rendered.
+    """
+    printout_mapping = get_printout_files(args.printouts_dir)
+    filenames = None
+    if activity_ids is not None:
+        # Activities whose last printout was removed get an empty list
+        printout_mapping = {activity_id: printout_mapping.get(activity_id, []) for activity_id in activity_ids}
+        filenames = {os.path.basename(path) for paths in printout_mapping.values() for path in paths}
+        filenames |= {os.path.basename(path) for path in changed_files}
+    if not args.no_previews:
+        printout_mapping = add_docx_previews(printout_mapping, build_docx_previews(args.printouts_dir,
+                                                                                   filenames=filenames))
+    image_metadata = None if args.no_images else get_image_metadata(args.printouts_dir, filenames=filenames)
+    existing = sorted(path for path in grade_files if os.path.exists(path))
+    update_grade_files(existing, printout_mapping, args.compact, image_metadata)
+
+def rebuild(paths: Set[str], args) -> None:
+    """Run only the stages affected by the changed paths."""
+    tsv_files = sorted(path for path in paths if path.endswith('.tsv'))
+    printouts = sorted(path for path in paths if not path.endswith('.tsv'))
+
+    for tsv_file in tsv_files:
+        if not os.path.exists(tsv_file):
+            print(f"⚠️  {tsv_file} was removed, leaving its grade file as it is")
+            continue
+        print(f"📄 {tsv_file} changed, resyncing")
+        grade_file = grade_file_for_tsv(tsv_file, args.grades_dir)
+        # A compact grade file stays compact
+        compact = args.compact or bool(grade_file and is_compact_file(grade_file))
+        update_activities_from_csv([tsv_file], args.grades_dir, allow_deletion=args.allow_delete,
+                                   incremental=True, compact=compact)
+        # The sync rebuilds content.extra from the sheet, so put the printouts back
+        grade_files = {grade_file} if grade_file else set(glob.glob(os.path.join(args.grades_dir, "*.json")))
+        apply_printout_changes(None, grade_files, args)
+
+    if printouts:
+        activity_ids = {get_activity_id(os.path.basename(path)) for path in printouts}
+        grade_files = {grade_file_for_activity(activity_id, args.grades_dir) for activity_id in activity_ids}
+        if None in grade_files:
+            grade_files = set(glob.glob(os.path.join(args.grades_dir, "*.json")))
+        print(f"🖨️  Printouts changed for {', '.join(sorted(activity_ids))}")
+        apply_printout_changes(activity_ids, grade_files, args, set(printouts))
+
+def watch(args) -> None:
+    """Poll the sources until interrupted, rebuilding after each debounced burst of changes."""
+    snapshot = take_snapshot(args.printouts_dir, args.tsv_pattern)
+    print(f"👀 Watching {len(snapshot)} files in {args.printouts_dir} and {args.tsv_pattern} (Ctrl+C to stop)")
+
+    pending: Set[str] = set()
+    last_change = 0.0
+    while True:
+        time.sleep(args.interval)
+        current = take_snapshot(args.printouts_dir, args.tsv_pattern)
+        changes = changed_paths(snapshot, current)
+        snapshot = current
+        if changes:
+            pending |= changes
+            last_change = time.monotonic()
+            continue
+        if pending and time.monotonic() - last_change >= args.debounce:
+            started = time.perf_counter()
+            try:
+                rebuild(pending, args)
+                print(f"⚡ Rebuilt {len(pending)} changed file(s) in {(time.perf_counter() - started) * 1000:.0f} ms\n")
+            except Exception as e:
+                # A half-saved sheet or a broken printout must not stop the watcher
+                print(f"❌ Rebuild failed: {type(e).__name__}: {e}; waiting for the next change\n")
+            pending = set()
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch printouts and activity sheets and rebuild affected grade files')
+    parser.add_argument('--printouts-dir', default=PRINTOUTS_DIR,
+                       help=f'Printout folder to watch (default: {PRINTOUTS_DIR})')
+    parser.add_argument('--tsv-pattern', default=TSV_PATTERN,
+                       help=f'Glob of activity sheets to watch (default: {TSV_PATTERN})')
+    parser.add_argument('--grades-dir', default=GRADES_DIR,
+                       help=f'Directory containing grade JSON files (default: {GRADES_DIR})')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                       help=f'Seconds between polls (default: {DEFAULT_INTERVAL})')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                       help=f'Seconds without changes before rebuilding (default: {DEFAULT_DEBOUNCE})')
+    parser.add_argument('--allow-delete', action='store_true',
+                       help='Remove activities that are no longer in an edited sheet')
+    parser.add_argument('--no-images', action='store_true',
+                       help='Do not build preview/thumbnail variants of printout images')
+    parser.add_argument('--no-previews', action='store_true',
+                       help='Do not render HTML previews of .docx printouts')
+    parser.add_argument('--compact', action='store_true',
+                       help='Write grade files without indentation or spaces (for deployment builds)')
+    args = parser.parse_args()
+
+    try:
+        watch(args)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { fetchAsset } from '../utils/assetManifest';
+import { decodeGradeData } from '../utils/decodeGradeData';
 
 interface Activity {
   id: string;
@@ -55,9 +57,9 @@ const ActivitySearch: React.FC<ActivitySearchProps> = ({
         const lists = await Promise.all(
           gradeFiles.map(async (file) => {
             try {
-              const response = await fetch(`/activityData/grades/${file}`);
+              const response = await fetchAsset(`/activityData/grades/${file}`);
               if (!response.ok) throw new Error(`Failed to load ${file}`);
-              return await response.json();
+              return decodeGradeData(await response.json());
             } catch (error) {
               console.warn(`Failed to load ${file}:`, error);
               return null;
@@ -56,6 +56,7 @@ function GameCard({
           src={image}
           alt={`Illustrasjon for aktiviteten ${title}`}
           className="w-full h-96 object-cover"
+          sizes="320px"
           placeholder="/logo.png"
           fallback=""
         />
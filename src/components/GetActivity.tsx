@@ -6,10 +6,15 @@ import {
   CombinedActivity,
   GradeData,
   GradeActivity,
+  GradeSummary,
 } from "../../public/activityData/types";
+import { fetchAsset } from "../utils/assetManifest";
+import { decodeGradeData } from "../utils/decodeGradeData";
 
 // Cache for grade-based activities
 const gradeCache = new Map<string, GradeData>();
+// Cache for sharded grade summaries (null when the grade has no shards)
+const summaryCache = new Map<string, GradeSummary | null>();
 
 // Map grade names to JSON filenames
 // Grade to file mapping
@@ -86,7 +91,7 @@ async function fetchGradeActivities(gradeName?: string | null): Promise<GradeAct
   try {
     const url = `/activityData/grades/${filename || "2.grade.json"}`;
     console.log(`Fetching from URL: ${url}`);
-    const response = await fetch(url);
+    const response = await fetchAsset(url);
     if (!response.ok) {
       // If the specific grade file doesn't exist, fall back to 2nd grade
       if (filename !== "2.grade.json") {
@@ -97,7 +102,7 @@ async function fetchGradeActivities(gradeName?: string | null): Promise<GradeAct
         `Failed to fetch grade activities: ${response.status}`
       );
     }
-    const data: GradeData = await response.json();
+    const data: GradeData = decodeGradeData(await response.json());
     console.log(`Successfully loaded ${data.activities.length} activities for ${data.grade}`);
     gradeCache.set(cacheKey, data);
     return data.activities;
@@ -107,6 +112,45 @@ async function fetchGradeActivities(gradeName?: string | null): Promise<GradeAct
   }
 }
 
+// Summary of a grade written with --sharded (activityData/shards/<n>.summary.json), or null
+async function fetchGradeSummary(filename: string): Promise<GradeSummary | null> {
+  if (summaryCache.has(filename)) {
+    return summaryCache.get(filename)!;
+  }
+  let summary: GradeSummary | null = null;
+  try {
+    const response = await fetchAsset(`/activityData/shards/${filename.split(".")[0]}.summary.json`);
+    if (response.ok) {
+      summary = await response.json();
+    }
+  } catch {
+    // No shards deployed (e.g. a dev server answering with index.html)
+  }
+  summaryCache.set(filename, summary);
+  return summary;
+}
+
+// Load one activity: from the loaded grade file if there is one, otherwise only its
+// content-hashed detail file from the shards, falling back to the whole grade file
+async function fetchGradeActivity(activityId: string, gradeName?: string | null): Promise<GradeActivity | null> {
+  const filename = (gradeName && gradeFileMap[gradeName]) || "2.grade.json";
+  if (!gradeCache.has(filename)) {
+    const entry = (await fetchGradeSummary(filename))?.activities.find(activity => activity.id === activityId);
+    if (entry) {
+      try {
+        const response = await fetchAsset(`/${entry.detail}`);
+        if (response.ok) {
+          return (await response.json()) as GradeActivity;
+        }
+      } catch (error) {
+        console.warn(`Failed to load detail file for ${activityId}, loading the grade file:`, error);
+      }
+    }
+  }
+  const gradeActivities = await fetchGradeActivities(gradeName);
+  return gradeActivities.find(activity => activity.id === activityId) ?? null;
+}
+
 // Convert GradeActivity to the old Activity format for compatibility
 function convertGradeActivityToActivity(gradeActivity: GradeActivity, gradeName?: string): Activity {
   const introText = Array.isArray(gradeActivity.content.introduction) ? gradeActivity.content.introduction.join(" ") : (gradeActivity.content.introduction || "");
@@ -153,8 +197,7 @@ export async function fetchActivityTasks(
   gradeName?: string | null
 ): Promise<ActivityTask | null> {
   try {
-    const gradeActivities = await fetchGradeActivities(gradeName);
-    const gradeActivity = gradeActivities.find(activity => activity.id === activityId);
+    const gradeActivity = await fetchGradeActivity(activityId, gradeName);
     
     if (!gradeActivity) {
       console.error(`Activity not found: ${activityId}`);
@@ -174,8 +217,7 @@ export async function fetchSingleActivity(
   selectedLearningGoal?: string
 ): Promise<CombinedActivity | null> {
   try {
-    const gradeActivities = await fetchGradeActivities(selectedGrade);
-    const gradeActivity = gradeActivities.find(activity => activity.id === activityId);
+    const gradeActivity = await fetchGradeActivity(activityId, selectedGrade);
     
     if (!gradeActivity) {
       console.error(`Activity not found: ${activityId}`);
@@ -1,4 +1,6 @@
 import { useEffect, useState } from 'react';
+import { PictureMetadata } from '../../public/activityData/types';
+import { getPictureMetadata, pictureSrcSet, pictureTypes } from '../utils/activityPictures';
 
 interface ImagePreloaderProps {
   src: string;
@@ -6,6 +8,7 @@ interface ImagePreloaderProps {
   className?: string;
   placeholder?: string;
   fallback?: string;
+  sizes?: string; // Rendered width, used to pick a variant when the picture has them
 }
 
 export const ImagePreloader: React.FC<ImagePreloaderProps> = ({
@@ -14,33 +17,87 @@ export const ImagePreloader: React.FC<ImagePreloaderProps> = ({
   className = '',
   placeholder = '/logo.png', // Default placeholder
   fallback = '.png', // Default fallback
+  sizes = '100vw',
 }) => {
   const [imageSrc, setImageSrc] = useState(placeholder);
   const [isLoaded, setIsLoaded] = useState(false);
+  // undefined while looking up the picture, null when it has no variants
+  const [metadata, setMetadata] = useState<PictureMetadata | null | undefined>(undefined);
+
+  useEffect(() => {
+    let cancelled = false;
+    setMetadata(undefined);
+    getPictureMetadata(src).then((result) => {
+      if (!cancelled) {
+        setMetadata(result);
+      }
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [src]);
 
   useEffect(() => {
     setIsLoaded(false);
     setImageSrc(placeholder);
 
+    // Pictures with variants are loaded by the <picture> element below
+    if (metadata !== null) {
+      return;
+    }
+
     const img = new Image();
-    
+
     img.onload = () => {
       setImageSrc(src);
       setIsLoaded(true);
     };
-    
+
     img.onerror = () => {
       setImageSrc(fallback);
       setIsLoaded(true);
     };
-    
+
     img.src = src;
-    
+
     return () => {
       img.onload = null;
       img.onerror = null;
     };
-  }, [src, placeholder, fallback]);
+  }, [src, placeholder, fallback, metadata]);
+
+  if (metadata) {
+    // WebP sources first; the last type (JPEG or PNG) is the <img> fallback
+    const types = pictureTypes(metadata);
+    const fallbackType = types[types.length - 1];
+    const fallbackVariant = metadata.variants.find((variant) => variant.type === fallbackType);
+    return (
+      <picture>
+        {types.slice(0, -1).map((type) => (
+          <source key={type} type={type} srcSet={pictureSrcSet(metadata, type)} sizes={sizes} />
+        ))}
+        <img
+          src={fallbackVariant ? `/${fallbackVariant.path}` : src}
+          srcSet={pictureSrcSet(metadata, fallbackType)}
+          sizes={sizes}
+          width={metadata.width}
+          height={metadata.height}
+          alt={alt}
+          className={className}
+          loading="lazy"
+          decoding="async"
+          onLoad={() => setIsLoaded(true)}
+          onError={() => setIsLoaded(true)}
+          style={{
+            // The inline placeholder shows until the variant has loaded
+            backgroundImage: isLoaded ? undefined : `url("${metadata.placeholder}")`,
+            backgroundSize: 'cover',
+            backgroundPosition: 'center',
+          }}
+        />
+      </picture>
+    );
+  }
 
   return (
     <img
@@ -8,6 +8,8 @@ import Breadcrumb from "../components/Breadcrumb";
 import GameCard from "../components/GameCard";
 import { Activity } from "../../public/activityData/types";
 import { useBreadcrumbs } from "../hooks/useBreadcrumbs";
+import { fetchAsset } from "../utils/assetManifest";
+import { decodeGradeData } from "../utils/decodeGradeData";
 
 const GRADES_BASE = "/activityData/grades";
 const gradeFiles = [
@@ -47,9 +49,9 @@ const FavoritesPage = () => {
       // Hent alle trinnfiler parallelt
       const lists = await Promise.all(
         gradeFiles.map((f) =>
-          fetch(`${GRADES_BASE}/${f}`).then((r) => {
+          fetchAsset(`${GRADES_BASE}/${f}`).then((r) => {
             if (!r.ok) throw new Error(`Failed to load ${f}`);
-            return r.json();
+            return r.json().then((data) => (Array.isArray(data) ? data : decodeGradeData(data)));
           })
         )
       );
@@ -0,0 +1,47 @@
+import { PictureMetadata, PictureMetadataTable } from '../../public/activityData/types';
+import { fetchAsset } from './assetManifest';
+
+// Responsive variants and inline placeholders of the activity pictures,
+// written by scripts/activity_pictures.py. Without the metadata file the
+// pictures are loaded at full size as before.
+
+const METADATA_URL = '/activityData/activityPictures.json';
+
+let tablePromise: Promise<PictureMetadataTable | null> | null = null;
+
+function loadPictureTable(): Promise<PictureMetadataTable | null> {
+  if (!tablePromise) {
+    tablePromise = fetchAsset(METADATA_URL)
+      .then((response) => (response.ok ? response.json() : null))
+      .catch(() => null);
+  }
+  return tablePromise;
+}
+
+// "/activityPictures/bingo.png" -> metadata of activityPictures/bingo.png, or null
+export async function getPictureMetadata(src: string): Promise<PictureMetadata | null> {
+  if (!src) {
+    return null;
+  }
+  const table = await loadPictureTable();
+  let key = src.replace(/^\//, '');
+  try {
+    key = decodeURI(key);
+  } catch {
+    // Not URI-encoded
+  }
+  return table?.pictures[key] ?? null;
+}
+
+// srcset value for the variants of one type, e.g. "/a.320.webp 320w, /a.640.webp 640w"
+export function pictureSrcSet(metadata: PictureMetadata, type: string): string {
+  return metadata.variants
+    .filter((variant) => variant.type === type)
+    .map((variant) => `/${variant.path} ${variant.width}w`)
+    .join(', ');
+}
+
+// Distinct variant types in the order they were written (WebP first)
+export function pictureTypes(metadata: PictureMetadata): string[] {
+  return Array.from(new Set(metadata.variants.map((variant) => variant.type)));
+}
@@ -0,0 +1,39 @@
+// Resolves static data paths through public/bundle/manifest.json, written by
+// scripts/build_asset_bundle.py. Bundled files have content-hashed names and
+// can be cached forever; without a bundle the original paths are used.
+
+interface BundledAsset {
+  path: string;
+  bytes: number;
+  integrity: string;
+  encodings: Record<string, { path: string; bytes: number }>;
+}
+
+interface AssetManifest {
+  version: number;
+  assets: Record<string, BundledAsset>;
+}
+
+const MANIFEST_URL = '/bundle/manifest.json';
+
+let manifestPromise: Promise<AssetManifest | null> | null = null;
+
+function loadManifest(): Promise<AssetManifest | null> {
+  if (!manifestPromise) {
+    manifestPromise = fetch(MANIFEST_URL, { cache: 'no-cache' })
+      .then((response) => (response.ok ? response.json() : null))
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+// fetch() a static data file, through the bundle when there is one:
+// "/activityData/grades/2.grade.json" -> "/bundle/activityData/grades/2.grade.<hash>.json"
+export async function fetchAsset(path: string): Promise<Response> {
+  const manifest = await loadManifest();
+  const asset = manifest?.assets[path.replace(/^\//, '')];
+  if (!asset) {
+    return fetch(path);
+  }
+  return fetch(`/${asset.path}`, { integrity: asset.integrity });
+}
@@ -0,0 +1,36 @@
+import { GradeActivity, GradeData } from '../../public/activityData/types';
+
+// Grade files written with --encoded store learning_goal, location, tools and
+// groupsize once per file in a string table (see scripts/grade_encoding.py)
+const ENCODING = 'string-table/1';
+const ENCODED_FIELDS = ['learning_goal', 'location', 'tools', 'groupsize'] as const;
+
+export interface EncodedGradeData {
+  grade: string;
+  total_activities: number;
+  encoding: typeof ENCODING;
+  strings: string[];
+  activities: Array<Omit<GradeActivity, typeof ENCODED_FIELDS[number]> & Record<typeof ENCODED_FIELDS[number], number>>;
+}
+
+// Return plain grade data for either format; plain files are returned as they are
+export function decodeGradeData(data: GradeData | EncodedGradeData): GradeData {
+  if (!('encoding' in data) || data.encoding !== ENCODING) {
+    return data as GradeData;
+  }
+  const { strings } = data;
+  return {
+    grade: data.grade,
+    total_activities: data.total_activities,
+    activities: data.activities.map((activity) => {
+      const decoded = { ...activity } as unknown as Record<string, unknown>;
+      ENCODED_FIELDS.forEach((field) => {
+        const value = activity[field];
+        if (typeof value === 'number') {
+          decoded[field] = strings[value];
+        }
+      });
+      return decoded as unknown as GradeActivity;
+    }),
+  };
+}